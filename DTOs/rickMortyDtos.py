@@ -11,7 +11,7 @@ Fecha: Enero 2026
 """
 
 from pydantic import BaseModel
-from typing import List
+from typing import Dict, List, Optional
 
 class CharacterResponseDTO(BaseModel):
     """DTO para la respuesta de un personaje"""
@@ -45,6 +45,81 @@ class CharacterResponseDTO(BaseModel):
             }
         }
 
+class LocationResponseDTO(BaseModel):
+    """DTO para la respuesta de una ubicación"""
+    
+    id: int
+    name: str
+    type: str
+    dimension: str
+    resident_count: int
+    residents: Optional[List[CharacterResponseDTO]] = None
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "id": 3,
+                "name": "Citadel of Ricks",
+                "type": "Space station",
+                "dimension": "unknown",
+                "resident_count": 101
+            }
+        }
+
+class EpisodeResponseDTO(BaseModel):
+    """DTO para la respuesta de un episodio"""
+    
+    id: int
+    name: str
+    air_date: str
+    episode: str
+    character_count: int
+    characters: Optional[List[CharacterResponseDTO]] = None
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "id": 1,
+                "name": "Pilot",
+                "air_date": "December 2, 2013",
+                "episode": "S01E01",
+                "character_count": 19
+            }
+        }
+
+class CharacterDetailResponseDTO(CharacterResponseDTO):
+    """DTO para el detalle de un personaje con sus recursos relacionados expandidos"""
+    
+    episodes: Optional[List[EpisodeResponseDTO]] = None
+    origin_detail: Optional[LocationResponseDTO] = None
+    location_detail: Optional[LocationResponseDTO] = None
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "id": 1,
+                "name": "Rick Sanchez",
+                "status": "Alive",
+                "species": "Human",
+                "type": "",
+                "gender": "Male",
+                "origin": "Earth (C-137)",
+                "location": "Citadel of Ricks",
+                "image": "https://rickandmortyapi.com/api/character/avatar/1.jpeg",
+                "episode_count": 51,
+                "created": "2017-11-04T18:48:46.250Z",
+                "episodes": [
+                    {
+                        "id": 1,
+                        "name": "Pilot",
+                        "air_date": "December 2, 2013",
+                        "episode": "S01E01",
+                        "character_count": 19
+                    }
+                ]
+            }
+        }
+
 class SearchResultDTO(BaseModel):
     """DTO para los resultados de búsqueda"""
     
@@ -73,6 +148,200 @@ class SearchResultDTO(BaseModel):
             }
         }
 
+class BatchResultDTO(BaseModel):
+    """DTO para los resultados de una consulta de varios personajes por ID"""
+    
+    total: int
+    result: List[CharacterResponseDTO]
+    missing: List[int]
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "total": 1,
+                "result": [
+                    {
+                        "id": 1,
+                        "name": "Rick Sanchez",
+                        "status": "Alive",
+                        "species": "Human",
+                        "type": "",
+                        "gender": "Male",
+                        "origin": "Earth (C-137)",
+                        "location": "Citadel of Ricks",
+                        "image": "https://rickandmortyapi.com/api/character/avatar/1.jpeg",
+                        "episode_count": 51,
+                        "created": "2017-11-04T18:48:46.250Z"
+                    }
+                ],
+                "missing": [99999]
+            }
+        }
+
+class ValueCountDTO(BaseModel):
+    """DTO para un valor y el número de personajes que lo tienen"""
+    
+    value: str
+    count: int
+
+class GroupCountDTO(BaseModel):
+    """DTO para una combinación de valores del group-by y su número de personajes"""
+    
+    values: Dict[str, str]
+    count: int
+
+class HistogramBucketDTO(BaseModel):
+    """DTO para un tramo del histograma (límites incluidos)"""
+    
+    min: int
+    max: int
+    count: int
+
+class EpisodeCountStatsDTO(BaseModel):
+    """DTO para la distribución del número de episodios por personaje"""
+    
+    min: Optional[int] = None
+    max: Optional[int] = None
+    mean: Optional[float] = None
+    median: Optional[float] = None
+    histogram: List[HistogramBucketDTO]
+
+class CharacterStatsDTO(BaseModel):
+    """DTO para las estadísticas agregadas del catálogo de personajes"""
+    
+    total: int
+    filters: Dict[str, str]
+    group_by: List[str]
+    groups: List[GroupCountDTO]
+    top_origins: List[ValueCountDTO]
+    top_locations: List[ValueCountDTO]
+    episode_counts: EpisodeCountStatsDTO
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "total": 826,
+                "filters": {},
+                "group_by": ["status", "species"],
+                "groups": [
+                    {"values": {"status": "Alive", "species": "Human"}, "count": 205}
+                ],
+                "top_origins": [{"value": "unknown", "count": 210}],
+                "top_locations": [{"value": "Citadel of Ricks", "count": 101}],
+                "episode_counts": {
+                    "min": 1, "max": 51, "mean": 2.08, "median": 1.0,
+                    "histogram": [{"min": 1, "max": 6, "count": 780}]
+                }
+            }
+        }
+
+class FilterResultDTO(BaseModel):
+    """DTO para los resultados del filtrado multicriterio con facetas"""
+    
+    total: int
+    offset: int
+    limit: int
+    sample: bool
+    result: List[CharacterResponseDTO]
+    facets: Dict[str, List[ValueCountDTO]]
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "total": 1,
+                "offset": 0,
+                "limit": 20,
+                "sample": False,
+                "result": [
+                    {
+                        "id": 1,
+                        "name": "Rick Sanchez",
+                        "status": "Alive",
+                        "species": "Human",
+                        "type": "",
+                        "gender": "Male",
+                        "origin": "Earth (C-137)",
+                        "location": "Citadel of Ricks",
+                        "image": "https://rickandmortyapi.com/api/character/avatar/1.jpeg",
+                        "episode_count": 51,
+                        "created": "2017-11-04T18:48:46.250Z"
+                    }
+                ],
+                "facets": {
+                    "type": [{"value": "", "count": 1}]
+                }
+            }
+        }
+
+class CostarDTO(BaseModel):
+    """DTO para un personaje que comparte episodios con otro"""
+    
+    character: CharacterResponseDTO
+    shared_episodes: int
+
+class CostarsResultDTO(BaseModel):
+    """DTO para los personajes que más episodios comparten con uno dado"""
+    
+    character_id: int
+    total: int
+    result: List[CostarDTO]
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "character_id": 1,
+                "total": 1,
+                "result": [
+                    {
+                        "character": {
+                            "id": 2,
+                            "name": "Morty Smith",
+                            "status": "Alive",
+                            "species": "Human",
+                            "type": "",
+                            "gender": "Male",
+                            "origin": "unknown",
+                            "location": "Citadel of Ricks",
+                            "image": "https://rickandmortyapi.com/api/character/avatar/2.jpeg",
+                            "episode_count": 51,
+                            "created": "2017-11-04T18:50:21.651Z"
+                        },
+                        "shared_episodes": 51
+                    }
+                ]
+            }
+        }
+
+class PathLinkDTO(BaseModel):
+    """DTO para un salto del camino: dos personajes y un episodio en el que coinciden"""
+    
+    source_id: int
+    target_id: int
+    episode_id: int
+    episode: Optional[str] = None
+
+class CharacterPathDTO(BaseModel):
+    """DTO para la conexión más corta entre dos personajes a través de episodios compartidos"""
+    
+    source_id: int
+    target_id: int
+    degrees: int
+    path: List[CharacterResponseDTO]
+    links: List[PathLinkDTO]
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "source_id": 1,
+                "target_id": 2,
+                "degrees": 1,
+                "path": [],
+                "links": [
+                    {"source_id": 1, "target_id": 2, "episode_id": 1, "episode": "S01E01 - Pilot"}
+                ]
+            }
+        }
+
 class StatusesResponseDTO(BaseModel):
     """DTO para la respuesta de estados de personajes"""
     
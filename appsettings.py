@@ -37,7 +37,7 @@ class AppSettings:
     # =============================================================================
     # RICK AND MORTY API (COMPLETAMENTE GRATUITA)
     # =============================================================================
-    RICK_MORTY_BASE_URL = "https://rickandmortyapi.com/api"
+    RICK_MORTY_BASE_URL = os.getenv("RICK_MORTY_BASE_URL", "https://rickandmortyapi.com/api")
     RICK_MORTY_CHARACTER_URL = f"{RICK_MORTY_BASE_URL}/character"
     RICK_MORTY_LOCATION_URL = f"{RICK_MORTY_BASE_URL}/location"
     RICK_MORTY_EPISODE_URL = f"{RICK_MORTY_BASE_URL}/episode"
@@ -49,6 +49,110 @@ class AppSettings:
     MAX_RETRIES = int(os.getenv("MAX_RETRIES", "3"))
     CONNECT_TIMEOUT = int(os.getenv("CONNECT_TIMEOUT", "10"))
     
+    # =============================================================================
+    # POOL DE CONEXIONES HTTP (CLIENTE COMPARTIDO)
+    # =============================================================================
+    HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+    HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+    HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "False").lower() == "true"
+    
+    # =============================================================================
+    # CACHÉ DE RESPUESTAS (TTL EN SEGUNDOS)
+    # =============================================================================
+    CACHE_ENABLED = os.getenv("CACHE_ENABLED", "True").lower() == "true"
+    CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "5000"))
+    CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    CACHE_TTL_CHARACTER = float(os.getenv("CACHE_TTL_CHARACTER", "3600"))
+    CACHE_TTL_STATUS = float(os.getenv("CACHE_TTL_STATUS", "600"))
+    CACHE_TTL_SEARCH = float(os.getenv("CACHE_TTL_SEARCH", "600"))
+    CACHE_TTL_RESOURCE = float(os.getenv("CACHE_TTL_RESOURCE", "3600"))
+    CACHE_STALE_TTL = float(os.getenv("CACHE_STALE_TTL", "86400"))
+    CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory").lower()
+    SHARED_CACHE_PATH = os.getenv("SHARED_CACHE_PATH", "data/response-cache.sqlite3")
+    
+    # =============================================================================
+    # SNAPSHOT DEL CATÁLOGO EN MEMORIA
+    # =============================================================================
+    SNAPSHOT_ENABLED = os.getenv("SNAPSHOT_ENABLED", "True").lower() == "true"
+    SNAPSHOT_FETCH_CONCURRENCY = int(os.getenv("SNAPSHOT_FETCH_CONCURRENCY", "8"))
+    SNAPSHOT_PATH = os.getenv("SNAPSHOT_PATH", "data/catalog.sqlite3")
+    SNAPSHOT_REFRESH_INTERVAL = float(os.getenv("SNAPSHOT_REFRESH_INTERVAL", "3600"))
+    # Sincronización incremental entre refrescos completos (solo recursos nuevos)
+    SYNC_INTERVAL = float(os.getenv("SYNC_INTERVAL", "300"))
+    # Personajes ya conocidos que se revisan en cada sincronización (ventana rotatoria)
+    SYNC_REVALIDATE_BATCH = int(os.getenv("SYNC_REVALIDATE_BATCH", "100"))
+    OFFLINE_MODE = os.getenv("OFFLINE_MODE", "False").lower() == "true"
+    
+    # =============================================================================
+    # BÚSQUEDA PAGINADA COMPLETA
+    # =============================================================================
+    SEARCH_PAGE_CONCURRENCY = int(os.getenv("SEARCH_PAGE_CONCURRENCY", "4"))
+    SEARCH_FUZZY_MIN_SCORE = float(os.getenv("SEARCH_FUZZY_MIN_SCORE", "0.5"))
+    
+    # =============================================================================
+    # CONSULTA DE VARIOS PERSONAJES POR ID
+    # =============================================================================
+    BATCH_MAX_IDS = int(os.getenv("BATCH_MAX_IDS", "500"))
+    BATCH_CHUNK_SIZE = int(os.getenv("BATCH_CHUNK_SIZE", "50"))
+    BATCH_FETCH_CONCURRENCY = int(os.getenv("BATCH_FETCH_CONCURRENCY", "4"))
+    
+    # =============================================================================
+    # EXPORTACIÓN MASIVA (NDJSON / CSV)
+    # =============================================================================
+    EXPORT_PAGE_CONCURRENCY = int(os.getenv("EXPORT_PAGE_CONCURRENCY", "4"))
+    EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", "200"))
+    
+    # =============================================================================
+    # RESILIENCIA (REINTENTOS, CIRCUIT BREAKER Y HEDGING)
+    # =============================================================================
+    RETRY_BACKOFF_BASE = float(os.getenv("RETRY_BACKOFF_BASE", "0.1"))
+    RETRY_BACKOFF_MAX = float(os.getenv("RETRY_BACKOFF_MAX", "2"))
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_BREAKER_FAILURE_THRESHOLD", "5"))
+    CIRCUIT_BREAKER_RESET_TIMEOUT = float(os.getenv("CIRCUIT_BREAKER_RESET_TIMEOUT", "30"))
+    HEDGE_ENABLED = os.getenv("HEDGE_ENABLED", "False").lower() == "true"
+    HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "0.95"))
+    HEDGE_MIN_DELAY = float(os.getenv("HEDGE_MIN_DELAY", "0.05"))
+    HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+    
+    # =============================================================================
+    # CONTROL DE ADMISIÓN HACIA LA API EXTERNA
+    # =============================================================================
+    UPSTREAM_MAX_CONCURRENCY = int(os.getenv("UPSTREAM_MAX_CONCURRENCY", "20"))
+    UPSTREAM_RATE_LIMIT = float(os.getenv("UPSTREAM_RATE_LIMIT", "20"))
+    UPSTREAM_RATE_BURST = int(os.getenv("UPSTREAM_RATE_BURST", "40"))
+    UPSTREAM_QUEUE_SIZE = int(os.getenv("UPSTREAM_QUEUE_SIZE", "200"))
+    UPSTREAM_QUEUE_TIMEOUT = float(os.getenv("UPSTREAM_QUEUE_TIMEOUT", "2"))
+    
+    # =============================================================================
+    # MÉTRICAS E INSTRUMENTACIÓN
+    # =============================================================================
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "True").lower() == "true"
+    SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "False").lower() == "true"
+    
+    # =============================================================================
+    # CACHÉ HTTP (ETAG / CACHE-CONTROL) Y COMPRESIÓN
+    # =============================================================================
+    HTTP_CACHE_MAX_ENTRIES = int(os.getenv("HTTP_CACHE_MAX_ENTRIES", "2000"))
+    HTTP_MAX_AGE_STATIC = int(os.getenv("HTTP_MAX_AGE_STATIC", "86400"))
+    HTTP_MAX_AGE_CATALOG = int(os.getenv("HTTP_MAX_AGE_CATALOG", "3600"))
+    HTTP_MAX_AGE_SEARCH = int(os.getenv("HTTP_MAX_AGE_SEARCH", "300"))
+    COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "True").lower() == "true"
+    COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+    COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+    COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+    
+    # =============================================================================
+    # PROXY DE AVATARES CON CACHÉ EN DISCO
+    # =============================================================================
+    AVATAR_CACHE_DIR = os.getenv("AVATAR_CACHE_DIR", "data/avatars")
+    AVATAR_CACHE_MAX_BYTES = int(os.getenv("AVATAR_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+    AVATAR_CACHE_TTL = float(os.getenv("AVATAR_CACHE_TTL", "86400"))
+    HTTP_MAX_AGE_AVATAR = int(os.getenv("HTTP_MAX_AGE_AVATAR", "86400"))
+    # Reescribe el campo image de los personajes para que apunte al proxy
+    AVATAR_PROXY_REWRITE = os.getenv("AVATAR_PROXY_REWRITE", "False").lower() == "true"
+    AVATAR_PUBLIC_BASE_URL = os.getenv("AVATAR_PUBLIC_BASE_URL", "")
+    
     # =============================================================================
     # CONFIGURACIÓN CORS
     # =============================================================================
@@ -70,7 +174,19 @@ class AppSettings:
         print(f"🔧 Debug: {'Activado' if cls.DEBUG else 'Desactivado'}")
         print("🧪 Rick and Morty API: disponible (gratuita)")
         print(f"⏱️  Timeout: {cls.REQUEST_TIMEOUT}s")
-        print(f"🔄 Reintentos: {cls.MAX_RETRIES}")
+        print(f"🔄 Reintentos: {cls.MAX_RETRIES} (hedging {'activado' if cls.HEDGE_ENABLED else 'desactivado'})")
+        print(f"🔌 Pool HTTP: {cls.HTTP_MAX_CONNECTIONS} conexiones ({cls.HTTP_MAX_KEEPALIVE_CONNECTIONS} keep-alive)")
+        print(f"🚦 Admisión: {cls.UPSTREAM_MAX_CONCURRENCY} llamadas en curso, {cls.UPSTREAM_RATE_LIMIT} req/s, cola {cls.UPSTREAM_QUEUE_SIZE}")
+        print(f"🚀 HTTP/2: {'Activado' if cls.HTTP2_ENABLED else 'Desactivado'}")
+        print(f"🗃️  Caché: {'Activada' if cls.CACHE_ENABLED else 'Desactivada'} ({cls.CACHE_MAX_ENTRIES} entradas, backend {cls.CACHE_BACKEND})")
+        print(f"📸 Snapshot en memoria: {'Activado' if cls.SNAPSHOT_ENABLED else 'Desactivado'}")
+        print(f"💾 Snapshot en disco: {cls.SNAPSHOT_PATH or 'desactivado'}")
+        print(f"🔄 Sincronización incremental: {f'cada {cls.SYNC_INTERVAL:g}s' if cls.SYNC_INTERVAL > 0 else 'desactivada'}")
+        print(f"📈 Métricas (/metrics): {'Activadas' if cls.METRICS_ENABLED else 'Desactivadas'}")
+        print(f"🗜️  Compresión: {'Activada' if cls.COMPRESSION_ENABLED else 'Desactivada'} (desde {cls.COMPRESSION_MIN_SIZE} bytes)")
+        print(f"🖼️  Avatares: {'caché en ' + cls.AVATAR_CACHE_DIR if cls.AVATAR_CACHE_DIR else 'sin caché en disco'}{' (URLs reescritas al proxy)' if cls.AVATAR_PROXY_REWRITE else ''}")
+        if cls.OFFLINE_MODE:
+            print("📴 Modo offline: solo se sirven datos del snapshot")
         print("=" * 60)
         print("✅ API completamente funcional sin configuración adicional")
         print("=" * 60)
@@ -0,0 +1,71 @@
+"""
+=============================================================================
+BENCHMARK: CLIENTE POR PETICIÓN VS CLIENTE COMPARTIDO
+=============================================================================
+
+Compara el patrón anterior (un httpx.AsyncClient nuevo por petición) con el
+cliente compartido con pool de conexiones contra el servidor simulado local.
+
+Uso:
+    python -m benchmarks.benchConnectionPool --requests 500 --concurrency 20
+
+Autor: Ing. Daniel Issac Cañas
+Fecha: Enero 2026
+=============================================================================
+"""
+
+import argparse
+import asyncio
+import time
+import httpx
+from benchmarks.mockUpstream import MockUpstreamServer, create_mock_app
+from clients.httpClientFactory import create_http_client
+
+async def run_per_request_client(url: str, total: int, concurrency: int) -> float:
+    """Abre un cliente nuevo (y una conexión nueva) en cada petición"""
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with semaphore:
+            async with httpx.AsyncClient() as http_client:
+                await http_client.get(f"{url}/character/{i % 826 + 1}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    return time.perf_counter() - start
+
+async def run_shared_client(url: str, total: int, concurrency: int) -> float:
+    """Reutiliza el cliente compartido y sus conexiones keep-alive"""
+
+    semaphore = asyncio.Semaphore(concurrency)
+    http_client = create_http_client()
+
+    async def one(i: int):
+        async with semaphore:
+            await http_client.get(f"{url}/character/{i % 826 + 1}")
+
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        return time.perf_counter() - start
+    finally:
+        await http_client.aclose()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del pool de conexiones")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    with MockUpstreamServer(create_mock_app(), port=args.port) as upstream:
+        per_request = asyncio.run(run_per_request_client(upstream.base_url, args.requests, args.concurrency))
+        shared = asyncio.run(run_shared_client(upstream.base_url, args.requests, args.concurrency))
+
+    print(f"Cliente por petición: {per_request:.3f}s ({args.requests / per_request:.0f} req/s)")
+    print(f"Cliente compartido:   {shared:.3f}s ({args.requests / shared:.0f} req/s)")
+    print(f"Mejora: x{per_request / shared:.2f}")
+
+if __name__ == "__main__":
+    main()
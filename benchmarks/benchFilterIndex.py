@@ -0,0 +1,80 @@
+"""
+=============================================================================
+BENCHMARK: FILTRADO MULTICRITERIO CON BITMAPS VS RECORRIDO LINEAL
+=============================================================================
+
+Mide la latencia de /character/filter resuelto con los bitmaps (coincidencias,
+primera página y facetas) para todas las combinaciones de campos filtrables,
+usando para cada campo su valor más frecuente, y la compara con recorrer el
+catálogo comprobando cada registro.
+
+Uso:
+    python -m benchmarks.benchFilterIndex --characters 826 --iterations 200
+
+Autor: Ing. Daniel Issac Cañas
+Fecha: Enero 2026
+=============================================================================
+"""
+
+import argparse
+import itertools
+import statistics
+import time
+from benchmarks.benchUtils import percentile
+from benchmarks.mockUpstream import make_character
+from catalog.bitmapIndex import FILTER_FIELDS, BitmapIndex, popcount
+from catalog.characterSnapshot import CharacterRecord, CharacterSnapshot
+
+def report(label: str, samples: list):
+    print(f"{label:<22} p50={statistics.median(samples) * 1000:9.3f}ms "
+          f"p95={percentile(samples, 0.95) * 1000:9.3f}ms max={max(samples) * 1000:9.3f}ms")
+
+def combinations(index: BitmapIndex) -> list:
+    """Todas las combinaciones de campos con el valor más frecuente de cada uno"""
+
+    top = {field: max(bitmaps, key=lambda key: popcount(bitmaps[key]))
+           for field, bitmaps in index.bitmaps.items()}
+    return [{field: [top[field]] for field in fields}
+            for size in range(1, len(FILTER_FIELDS) + 1)
+            for fields in itertools.combinations(FILTER_FIELDS, size)]
+
+def bench_bitmaps(index: BitmapIndex, queries: list, iterations: int) -> list:
+    samples = []
+    for i in range(iterations):
+        filters = queries[i % len(queries)]
+        start = time.perf_counter()
+        selection = index.match(filters)
+        index.positions(selection, 0, 20)
+        index.facets(selection, (field for field in FILTER_FIELDS if field not in filters), 20)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+def bench_linear(records: list, queries: list, iterations: int) -> list:
+    samples = []
+    for i in range(iterations):
+        filters = queries[i % len(queries)]
+        start = time.perf_counter()
+        [record for record in records
+         if all(getattr(record, field).lower() in values for field, values in filters.items())]
+        samples.append(time.perf_counter() - start)
+    return samples
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del filtrado con bitmaps")
+    parser.add_argument("--characters", type=int, default=826)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    snapshot = CharacterSnapshot(
+        CharacterRecord.from_api(make_character(i, "")) for i in range(1, args.characters + 1))
+    start = time.perf_counter()
+    index = BitmapIndex(snapshot.records)
+    print(f"Construcción de bitmaps: {(time.perf_counter() - start) * 1000:.2f}ms ({args.characters} personajes)")
+
+    queries = combinations(index)
+    print(f"Combinaciones de filtros: {len(queries)}")
+    report("Bitmaps + facetas", bench_bitmaps(index, queries, args.iterations))
+    report("Recorrido lineal", bench_linear(snapshot.records, queries, args.iterations))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+=============================================================================
+BENCHMARK: REINTENTOS, HEDGING Y CIRCUIT BREAKER
+=============================================================================
+
+Ejecuta la capa de resiliencia contra el servidor simulado con inyección de
+fallos y muestra su efecto en tres escenarios:
+
+1. Errores 503 intermitentes: tasa de éxito sin reintentos y con reintentos.
+2. Latencia de cola (algunas respuestas muy lentas): p50/p99 con y sin hedging.
+3. Caída total: el circuit breaker se abre y las llamadas fallan rápido.
+
+Uso:
+    python -m benchmarks.benchResilience --requests 300
+
+Autor: Ing. Daniel Issac Cañas
+Fecha: Enero 2026
+=============================================================================
+"""
+
+import argparse
+import asyncio
+import time
+from benchmarks.benchUtils import percentile
+from benchmarks.mockUpstream import MockUpstreamServer, create_mock_app
+from clients.httpClientFactory import create_http_client
+from clients.upstreamResilience import CircuitBreaker, ResilientUpstream, UpstreamUnavailableError
+
+def make_upstream(max_retries: int = 0, hedge: bool = False, failure_threshold: int = 1000) -> ResilientUpstream:
+    return ResilientUpstream(
+        max_retries=max_retries,
+        backoff_base=0.01,
+        backoff_max=0.1,
+        breaker=CircuitBreaker(failure_threshold=failure_threshold, reset_timeout=30),
+        hedge_enabled=hedge,
+        hedge_min_delay=0.005,
+        hedge_min_samples=10
+    )
+
+async def run(upstream: ResilientUpstream, url: str, total: int) -> dict:
+    """Lanza `total` peticiones secuenciales y resume éxitos y latencias"""
+
+    http_client = create_http_client()
+    samples, ok, fast_fail = [], 0, 0
+    try:
+        for i in range(total):
+            start = time.perf_counter()
+            try:
+                response = await upstream.get(http_client, f"{url}/character/{i % 826 + 1}")
+                ok += response.status_code == 200
+            except UpstreamUnavailableError:
+                fast_fail += 1
+            samples.append(time.perf_counter() - start)
+    finally:
+        await http_client.aclose()
+    return {
+        "success_rate": ok / total,
+        "fast_fail": fast_fail,
+        "p50_ms": percentile(samples, 0.50) * 1000,
+        "p99_ms": percentile(samples, 0.99) * 1000,
+        **upstream.stats()
+    }
+
+def show(label: str, result: dict):
+    print(f"{label:<28} éxito={result['success_rate']:6.1%} p50={result['p50_ms']:8.2f}ms "
+          f"p99={result['p99_ms']:8.2f}ms reintentos={result['retries']} "
+          f"hedged={result['hedged']}/{result['hedge_wins']} "
+          f"fallo_rápido={result['fast_fail']} circuito={result['circuit']['state']}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la capa de resiliencia")
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    app = create_mock_app(latency_ms=2)
+    with MockUpstreamServer(app, port=args.port) as upstream:
+        url = upstream.base_url
+
+        app.state.faults.update(error_rate=0.3, slow_rate=0.0)
+        show("503 al 30%, sin reintentos", asyncio.run(run(make_upstream(0), url, args.requests)))
+        show("503 al 30%, 3 reintentos", asyncio.run(run(make_upstream(3), url, args.requests)))
+
+        app.state.faults.update(error_rate=0.0, slow_rate=0.03, slow_ms=300)
+        show("cola lenta, sin hedging", asyncio.run(run(make_upstream(0), url, args.requests)))
+        show("cola lenta, con hedging", asyncio.run(run(make_upstream(0, hedge=True), url, args.requests)))
+
+        app.state.faults.update(error_rate=1.0, slow_rate=0.0)
+        show("caída total, breaker a 5", asyncio.run(run(make_upstream(1, failure_threshold=5), url, args.requests)))
+        print(f"Peticiones recibidas por el servidor simulado: {app.state.request_count}")
+
+if __name__ == "__main__":
+    main()
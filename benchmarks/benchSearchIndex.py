@@ -0,0 +1,75 @@
+"""
+=============================================================================
+BENCHMARK: ÍNDICE LOCAL DE TRIGRAMAS VS BÚSQUEDA REMOTA
+=============================================================================
+
+Compara la latencia de /character/search resuelta en el índice local con la
+búsqueda por el filtro name= de la API externa (servidor simulado con
+latencia configurable y caché desactivada).
+
+Uso:
+    python -m benchmarks.benchSearchIndex --latency-ms 50 --iterations 200
+
+Autor: Ing. Daniel Issac Cañas
+Fecha: Enero 2026
+=============================================================================
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from appsettings import settings
+from benchmarks.benchUtils import percentile
+from benchmarks.mockUpstream import MockUpstreamServer, create_mock_app, make_character
+from catalog.searchIndex import TrigramIndex
+from clients.httpClientFactory import create_http_client
+from clients.rickMortyClient import RickMortyClient
+
+QUERIES = ["rick", "smith", "mort", "pickle", "squanchy", "evil", "bird"]
+
+def report(label: str, samples: list):
+    print(f"{label:<22} p50={statistics.median(samples) * 1000:9.3f}ms "
+          f"p95={percentile(samples, 0.95) * 1000:9.3f}ms")
+
+def bench_local(iterations: int, fuzzy: bool) -> list:
+    index = TrigramIndex()
+    index.add_many((i, make_character(i, "")["name"]) for i in range(1, 827))
+    search = index.fuzzy_search if fuzzy else index.search
+    samples = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        search(QUERIES[i % len(QUERIES)])
+        samples.append(time.perf_counter() - start)
+    return samples
+
+async def bench_remote(iterations: int) -> list:
+    client = RickMortyClient()
+    client.cache = None  # medir siempre la llamada remota
+    http_client = create_http_client()
+    samples = []
+    try:
+        for i in range(iterations):
+            start = time.perf_counter()
+            await client.search_characters(QUERIES[i % len(QUERIES)], http_client)
+            samples.append(time.perf_counter() - start)
+    finally:
+        await http_client.aclose()
+    return samples
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del índice de búsqueda local")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    report("Índice (subcadena)", bench_local(args.iterations, fuzzy=False))
+    report("Índice (difusa)", bench_local(args.iterations, fuzzy=True))
+
+    with MockUpstreamServer(create_mock_app(latency_ms=args.latency_ms), port=args.port) as upstream:
+        settings.RICK_MORTY_CHARACTER_URL = f"{upstream.base_url}/character"
+        report("API remota", asyncio.run(bench_remote(args.iterations)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+=============================================================================
+BENCHMARK: RUTA DE SERIALIZACIÓN ANTERIOR VS RUTA RÁPIDA
+=============================================================================
+
+Mide la CPU por petición para construir y serializar un SearchResultDTO de
+20 y de 500 personajes:
+
+- Anterior: CharacterResponseDTO validado por cada personaje, y después lo
+  que hace FastAPI con response_model (volcar a dict, validar de nuevo,
+  serializar a dict y json.dumps en JSONResponse).
+- Rápida: DTOs del snapshot construidos sin validar y reutilizados, y
+  FastJSONResponse serializando directamente (pydantic-core / orjson).
+
+Uso:
+    python -m benchmarks.benchSerialization --iterations 200
+
+Autor: Ing. Daniel Issac Cañas
+Fecha: Enero 2026
+=============================================================================
+"""
+
+import argparse
+import json
+import time
+from pydantic import TypeAdapter
+from benchmarks.mockUpstream import make_character
+from catalog.characterSnapshot import CharacterRecord
+from controllers.fastResponses import FastJSONResponse
+from DTOs.rickMortyDtos import SearchResultDTO
+from services.rickMortyServices import RickMortyService
+
+def before(service: RickMortyService, raw_characters: list) -> bytes:
+    """Ruta anterior: validación al construir y revalidación de response_model"""
+
+    characters = [service._transform_character(data) for data in raw_characters]
+    dto = SearchResultDTO(total=len(characters), result=characters)
+    adapter = TypeAdapter(SearchResultDTO)
+    validated = adapter.validate_python(dto.model_dump())
+    content = adapter.dump_python(validated, mode="json")
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def after(service: RickMortyService, records: list) -> bytes:
+    """Ruta rápida: DTOs reutilizados y serialización directa"""
+
+    characters = [service._record_to_dto(record) for record in records]
+    dto = SearchResultDTO(total=len(characters), result=characters)
+    return FastJSONResponse(dto).body
+
+def measure(function, iterations: int, *args) -> float:
+    start = time.process_time()
+    for _ in range(iterations):
+        function(*args)
+    return (time.process_time() - start) / iterations
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la ruta de serialización")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    service = RickMortyService()
+    for size in (20, 500):
+        raw_characters = [make_character(i, "https://rickandmortyapi.com/api") for i in range(1, size + 1)]
+        records = [CharacterRecord.from_api(data) for data in raw_characters]
+        slow = measure(before, args.iterations, service, raw_characters)
+        fast = measure(after, args.iterations, service, records)
+        print(f"{size:>4} personajes: anterior={slow * 1000:8.3f}ms  rápida={fast * 1000:8.3f}ms  "
+              f"(x{slow / fast:.1f})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+=============================================================================
+BENCHMARK: LLAMADAS A LA API EXTERNA POR MÁQUINA SEGÚN EL NÚMERO DE WORKERS
+=============================================================================
+
+Lanza N procesos (como los workers de uvicorn/gunicorn) que piden los mismos
+personajes en distinto orden a través de RickMortyClient, contra el servidor
+simulado, y cuenta cuántas llamadas llegan a la API externa:
+
+- memory: cada worker tiene su propia caché, las llamadas crecen con N.
+- shared: caché SQLite compartida, las llamadas se mantienen planas.
+
+Uso:
+    python -m benchmarks.benchSharedCache --workers 1,2,4,8 --characters 200
+
+Autor: Ing. Daniel Issac Cañas
+Fecha: Enero 2026
+=============================================================================
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+from benchmarks.mockUpstream import MockUpstreamServer, create_mock_app
+
+def worker(index: int, characters: int, environment: dict):
+    """Proceso worker: pide todos los personajes uno a uno en orden aleatorio"""
+
+    # La configuración se lee al importar, así que se fija antes de importar el cliente
+    os.environ.update(environment)
+    from clients.httpClientFactory import create_http_client
+    from clients.rickMortyClient import RickMortyClient
+
+    async def run():
+        client = RickMortyClient()
+        ids = list(range(1, characters + 1))
+        random.Random(index).shuffle(ids)
+        async with create_http_client() as http_client:
+            for character_id in ids:
+                await client.get_characters_by_ids([character_id], http_client, chunk_size=1, concurrency=1)
+        await client.aclose()
+
+    asyncio.run(run())
+
+def run_workers(count: int, characters: int, environment: dict) -> float:
+    context = multiprocessing.get_context("spawn")
+    processes = [context.Process(target=worker, args=(i, characters, environment)) for i in range(count)]
+    start = time.perf_counter()
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Llamadas a la API externa por máquina según el número de workers")
+    parser.add_argument("--workers", default="1,2,4,8")
+    parser.add_argument("--characters", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    mock_app = create_mock_app(latency_ms=args.latency_ms)
+    with MockUpstreamServer(mock_app, args.port) as upstream, tempfile.TemporaryDirectory() as directory:
+        print(f"{'workers':>7} {'backend':>8} {'llamadas':>9} {'por worker':>11} {'tiempo':>8}")
+        for count in (int(value) for value in args.workers.split(",")):
+            for backend in ("memory", "shared"):
+                environment = {
+                    "RICK_MORTY_BASE_URL": upstream.base_url,
+                    "CACHE_BACKEND": backend,
+                    "SHARED_CACHE_PATH": os.path.join(directory, f"cache-{count}.sqlite3"),
+                    "SNAPSHOT_PATH": "",
+                    # Sin límite de ritmo: se mide la caché, no el control de admisión
+                    "UPSTREAM_RATE_LIMIT": "0",
+                    "DEBUG": "False"
+                }
+                before = mock_app.state.request_count
+                elapsed = run_workers(count, args.characters, environment)
+                calls = mock_app.state.request_count - before
+                print(f"{count:>7} {backend:>8} {calls:>9} {calls / count:>11.1f} {elapsed:>7.2f}s")
+
+if __name__ == "__main__":
+    main()
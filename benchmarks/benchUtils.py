@@ -0,0 +1,51 @@
+"""
+=============================================================================
+UTILIDADES COMUNES DE LOS BENCHMARKS
+=============================================================================
+
+Percentiles y un servidor uvicorn en segundo plano para levantar la API o
+el servidor simulado dentro del mismo proceso que el benchmark.
+
+Autor: Ing. Daniel Issac Cañas
+Fecha: Enero 2026
+=============================================================================
+"""
+
+import threading
+import time
+from typing import List
+import uvicorn
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """Percentil por rango más cercano (fraction entre 0 y 1)"""
+
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+class BackgroundServer:
+    """Ejecuta una aplicación ASGI con uvicorn en un hilo de fondo"""
+
+    def __init__(self, app, port: int, host: str = "127.0.0.1"):
+        self.app = app
+        self.host = host
+        self.port = port
+        self.server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="warning"))
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def __enter__(self):
+        self.thread.start()
+        while not self.server.started:
+            if not self.thread.is_alive():
+                raise RuntimeError(f"No se pudo arrancar el servidor en el puerto {self.port}")
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.should_exit = True
+        self.thread.join()
@@ -0,0 +1,158 @@
+"""
+=============================================================================
+COMPROBACIÓN DEL PROXY DE AVATARES CONTRA EL SERVIDOR SIMULADO
+=============================================================================
+
+Levanta el servidor simulado y la API apuntando a él, con la caché de
+avatares en un directorio temporal, un TTL corto y un límite de bytes
+pequeño, y comprueba el comportamiento de /api/character/{id}/avatar:
+
+- Primera petición miss (descarga) y la segunda hit, sin volver a la API
+  externa.
+- If-None-Match con el ETag recibido responde 304.
+- Pasado el TTL se revalida con una petición condicional (304 de la API
+  externa) y se sirve la copia guardada (revalidated).
+- Un avatar que la API externa no tiene responde 404.
+- Al superar AVATAR_CACHE_MAX_BYTES se expulsa el avatar usado hace más
+  tiempo, que vuelve a descargarse (miss) la siguiente vez.
+
+Termina con código distinto de 0 si alguna comprobación falla.
+
+Uso:
+    python -m benchmarks.checkAvatarProxy
+    python -m benchmarks.checkAvatarProxy --port 8767 --ttl 2
+
+Autor: Ing. Daniel Issac Cañas
+Fecha: Enero 2026
+=============================================================================
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from typing import List
+import httpx
+from benchmarks.benchUtils import BackgroundServer
+from benchmarks.mockUpstream import MockUpstreamServer, create_mock_app, make_avatar
+
+CHARACTERS = 20
+UNKNOWN_ID = 9999
+# Avatares del escenario LRU: caben tres; al pedir el cuarto sale el menos usado
+LRU_IDS = (11, 12, 13, 14)
+
+class Checker:
+    """Acumula el resultado de cada comprobación"""
+
+    def __init__(self):
+        self.failures: List[str] = []
+
+    def check(self, description: str, condition: bool, detail: str = ""):
+        print(f"{'✅' if condition else '❌'} {description}{'' if condition else f' ({detail})'}")
+        if not condition:
+            self.failures.append(description)
+
+def avatar(client: httpx.Client, character_id: int, headers: dict = None) -> httpx.Response:
+    return client.get(f"/api/character/{character_id}/avatar", headers=headers)
+
+def avatar_stats(client: httpx.Client) -> dict:
+    return client.get("/api/cache/stats").json()["avatars"]
+
+def run_checks(client: httpx.Client, mock_app, ttl: float) -> Checker:
+    checker = Checker()
+    state = mock_app.state
+
+    # Miss y después hit
+    before = state.avatar_requests
+    first = avatar(client, 1)
+    checker.check("Primera petición: miss", first.status_code == 200 and first.headers.get("x-avatar-cache") == "miss",
+                  f"{first.status_code} {first.headers.get('x-avatar-cache')}")
+    checker.check("El cuerpo es el avatar de la API externa", first.content == make_avatar(1, state.avatar_version))
+    second = avatar(client, 1)
+    checker.check("Segunda petición: hit", second.headers.get("x-avatar-cache") == "hit",
+                  str(second.headers.get("x-avatar-cache")))
+    checker.check("Una sola llamada a la API externa", state.avatar_requests - before == 1,
+                  f"{state.avatar_requests - before} llamadas")
+
+    # Petición condicional del cliente
+    etag = first.headers.get("etag")
+    conditional = avatar(client, 1, {"If-None-Match": etag})
+    checker.check("If-None-Match con el ETag responde 304", etag is not None and conditional.status_code == 304,
+                  f"ETag {etag}, {conditional.status_code}")
+
+    # Revalidación pasado el TTL
+    time.sleep(ttl + 0.2)
+    not_modified = state.avatar_not_modified
+    revalidated = avatar(client, 1)
+    checker.check("Pasado el TTL: revalidated", revalidated.headers.get("x-avatar-cache") == "revalidated",
+                  str(revalidated.headers.get("x-avatar-cache")))
+    checker.check("La revalidación recibe 304 de la API externa", state.avatar_not_modified - not_modified == 1,
+                  f"{state.avatar_not_modified - not_modified} respuestas 304")
+    checker.check("El ETag no cambia al revalidar", revalidated.headers.get("etag") == etag)
+    after = avatar(client, 1)
+    checker.check("Tras revalidar vuelve a ser hit", after.headers.get("x-avatar-cache") == "hit",
+                  str(after.headers.get("x-avatar-cache")))
+
+    # Avatar que no existe en la API externa
+    missing = avatar(client, UNKNOWN_ID)
+    checker.check("Avatar desconocido: 404", missing.status_code == 404, str(missing.status_code))
+
+    # Expulsión LRU: se usa el primero otra vez para que el menos usado sea el segundo
+    first_id, evicted_id, third_id, fourth_id = LRU_IDS
+    evictions = avatar_stats(client)["evictions"]
+    for character_id in (first_id, evicted_id, third_id):
+        avatar(client, character_id)
+    avatar(client, first_id)
+    avatar(client, fourth_id)
+    stats = avatar_stats(client)
+    checker.check("Se respeta AVATAR_CACHE_MAX_BYTES", stats["bytes"] <= stats["max_bytes"],
+                  f"{stats['bytes']} > {stats['max_bytes']}")
+    checker.check("Se expulsa al menos un avatar", stats["evictions"] > evictions,
+                  f"{stats['evictions'] - evictions} expulsiones")
+    kept = avatar(client, first_id)
+    checker.check("El avatar usado recientemente sigue en caché", kept.headers.get("x-avatar-cache") == "hit",
+                  str(kept.headers.get("x-avatar-cache")))
+    again = avatar(client, evicted_id)
+    checker.check("El avatar menos usado fue expulsado: miss", again.headers.get("x-avatar-cache") == "miss",
+                  str(again.headers.get("x-avatar-cache")))
+    return checker
+
+def main():
+    parser = argparse.ArgumentParser(description="Comprueba el proxy de avatares contra el servidor simulado")
+    parser.add_argument("--port", type=int, default=8767, help="Puerto del servidor simulado (la API usa el siguiente)")
+    parser.add_argument("--ttl", type=float, default=1.0, help="AVATAR_CACHE_TTL en segundos")
+    args = parser.parse_args()
+
+    mock_app = create_mock_app(character_count=CHARACTERS)
+    # Límite en el que caben los tres primeros avatares LRU o, quitando el segundo, el
+    # cuarto, pero nunca cuatro (cada avatar ocupa al menos 12 KB y difieren en menos de 6 KB)
+    first, second, third, fourth = (len(make_avatar(character_id, mock_app.state.avatar_version))
+                                    for character_id in LRU_IDS)
+    max_bytes = first + third + max(second, fourth)
+
+    with MockUpstreamServer(mock_app, args.port) as upstream, tempfile.TemporaryDirectory() as directory:
+        # La configuración se lee al importar, así que se fija antes de importar la API
+        os.environ.update({
+            "RICK_MORTY_BASE_URL": upstream.base_url,
+            "AVATAR_CACHE_DIR": directory,
+            "AVATAR_CACHE_MAX_BYTES": str(max_bytes),
+            "AVATAR_CACHE_TTL": str(args.ttl),
+            # Sin catálogo local el 404 lo decide la API externa, no el snapshot
+            "SNAPSHOT_ENABLED": "False",
+            "SNAPSHOT_PATH": "",
+            "UPSTREAM_RATE_LIMIT": "0",
+            "DEBUG": "False"
+        })
+        from main import app
+
+        with BackgroundServer(app, args.port + 1) as server, httpx.Client(base_url=server.url, timeout=10) as client:
+            checker = run_checks(client, mock_app, args.ttl)
+
+    if checker.failures:
+        print(f"\n{len(checker.failures)} comprobaciones fallidas")
+        sys.exit(1)
+    print("\nTodas las comprobaciones del proxy de avatares son correctas")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+=============================================================================
+COMPARACIÓN DE RESULTADOS DE CARGA
+=============================================================================
+
+Compara dos ficheros JSON generados por benchmarks/loadTest.py (línea base y
+versión nueva) endpoint a endpoint y nivel a nivel de concurrencia. Termina
+con código 1 si algún p95/p99 empeora o el throughput cae más del umbral,
+para poder usarlo como control de regresiones.
+
+Uso:
+    python -m benchmarks.compareResults base.json new.json --threshold 0.10
+
+Autor: Ing. Daniel Issac Cañas
+Fecha: Enero 2026
+=============================================================================
+"""
+
+import argparse
+import json
+import sys
+
+def load_results(path: str) -> dict:
+    """Indexa los resultados por (endpoint, concurrencia)"""
+
+    with open(path, encoding="utf-8") as file:
+        data = json.load(file)
+    return {(result["endpoint"], result["concurrency"]): result for result in data["results"]}
+
+def change(base: float, new: float) -> float:
+    """Variación relativa de new respecto a base"""
+
+    return (new - base) / base if base else 0.0
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara dos resultados de benchmarks/loadTest.py")
+    parser.add_argument("base")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Empeoramiento relativo tolerado")
+    args = parser.parse_args()
+
+    base = load_results(args.base)
+    new = load_results(args.new)
+    regressions = []
+    for key in sorted(base.keys() & new.keys()):
+        old_result, new_result = base[key], new[key]
+        rps = change(old_result["rps"], new_result["rps"])
+        p95 = change(old_result["p95_ms"], new_result["p95_ms"])
+        p99 = change(old_result["p99_ms"], new_result["p99_ms"])
+        regressed = rps < -args.threshold or p95 > args.threshold or p99 > args.threshold
+        print(f"{'✗' if regressed else '✓'} {key[0]:<11} c={key[1]:<4} rps {rps:+7.1%}  "
+              f"p95 {p95:+7.1%}  p99 {p99:+7.1%}")
+        if regressed:
+            regressions.append(key)
+
+    if regressions:
+        print(f"{len(regressions)} regresiones por encima del {args.threshold:.0%}")
+        sys.exit(1)
+    print("Sin regresiones")
+
+if __name__ == "__main__":
+    main()
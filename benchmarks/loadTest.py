@@ -0,0 +1,189 @@
+"""
+=============================================================================
+PRUEBA DE CARGA DE LA API
+=============================================================================
+
+Levanta el servidor simulado (sintético o reproduciendo fixtures grabados,
+con latencia y tasa de errores configurables) y la API en un proceso aparte
+apuntando a él. Después lanza carga en bucle cerrado contra cada endpoint
+con varios niveles de concurrencia y mide el throughput y los percentiles
+p50/p95/p99 de latencia.
+
+El resultado se escribe en JSON para compararlo entre versiones con
+benchmarks/compareResults.py. Con --target se mide una instancia ya
+desplegada en lugar de levantar la API y el servidor simulado.
+
+Uso:
+    python -m benchmarks.loadTest --concurrency 1,8,32 --duration 5 --output results.json
+    python -m benchmarks.loadTest --fixtures benchmarks/fixtures --latency-ms 50 --error-rate 0.05
+    python -m benchmarks.loadTest --target http://127.0.0.1:8000 --endpoints random,search
+
+Autor: Ing. Daniel Issac Cañas
+Fecha: Enero 2026
+=============================================================================
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List
+import httpx
+from benchmarks.benchUtils import percentile
+from benchmarks.mockUpstream import MockUpstreamServer, create_mock_app
+
+# Endpoints medidos: nombre -> generador de la ruta (IDs aleatorios por petición)
+ENDPOINTS: Dict[str, Callable[[int], str]] = {
+    "random": lambda count: "/api/character/random",
+    "statuses": lambda count: "/api/character/statuses",
+    "status": lambda count: "/api/character/status/alive",
+    "search": lambda count: "/api/character/search?q=rick",
+    "search_all": lambda count: "/api/character/search?q=smith&all=true&limit=100",
+    "batch": lambda count: "/api/character/batch?ids=" + ",".join(
+        str(random.randint(1, count)) for _ in range(20)),
+    "detail": lambda count: f"/api/character/{random.randint(1, count)}?expand=episodes,origin,location"
+}
+
+def start_api(port: int, upstream_url: str, snapshot: bool) -> subprocess.Popen:
+    """Arranca la API con uvicorn en un proceso aparte apuntando al servidor simulado"""
+
+    env = dict(os.environ)
+    env.update({
+        "RICK_MORTY_BASE_URL": upstream_url,
+        "SNAPSHOT_ENABLED": str(snapshot),
+        # Sin snapshot en disco: cada ejecución parte del mismo estado
+        "SNAPSHOT_PATH": "",
+        "DEBUG": "False"
+    })
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL
+    )
+
+async def wait_until_ready(client: httpx.AsyncClient, snapshot: bool, timeout: float = 60.0) -> int:
+    """Espera a que la API responda (y a que cargue el snapshot); devuelve el número de personajes"""
+
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            response = await client.get("/api/snapshot/stats")
+            stats = response.json()
+            if not snapshot or stats.get("loaded"):
+                return stats.get("characters") or 826
+        except (httpx.HTTPError, ValueError):
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("La API no estuvo lista a tiempo")
+
+async def run_level(client: httpx.AsyncClient, make_path: Callable[[int], str], character_count: int,
+                    concurrency: int, duration: float) -> dict:
+    """Mantiene `concurrency` peticiones en curso durante `duration` segundos"""
+
+    latencies: List[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                response = await client.get(make_path(character_count))
+                if response.status_code >= 500:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3)
+    }
+
+async def run_load(target: str, endpoints: List[str], levels: List[int], duration: float, snapshot: bool) -> list:
+    limits = httpx.Limits(max_connections=max(levels), max_keepalive_connections=max(levels))
+    async with httpx.AsyncClient(base_url=target, limits=limits, timeout=30.0) as client:
+        character_count = await wait_until_ready(client, snapshot)
+        results = []
+        for name in endpoints:
+            # Calentamiento: rellena cachés antes de medir
+            await run_level(client, ENDPOINTS[name], character_count, 1, min(duration, 0.5))
+            for concurrency in levels:
+                result = {"endpoint": name, **await run_level(
+                    client, ENDPOINTS[name], character_count, concurrency, duration)}
+                print(f"{name:<11} c={concurrency:<4} {result['rps']:>9.1f} req/s  "
+                      f"p50={result['p50_ms']:8.2f}ms p95={result['p95_ms']:8.2f}ms "
+                      f"p99={result['p99_ms']:8.2f}ms errores={result['errors']}")
+                results.append(result)
+        return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga de la API")
+    parser.add_argument("--target", default=None, help="URL de una API ya desplegada")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS))
+    parser.add_argument("--concurrency", default="1,8,32")
+    parser.add_argument("--duration", type=float, default=5.0, help="Segundos por nivel de concurrencia")
+    parser.add_argument("--output", default=None, help="Fichero JSON de resultados")
+    parser.add_argument("--api-port", type=int, default=8791)
+    parser.add_argument("--mock-port", type=int, default=8792)
+    parser.add_argument("--fixtures", default=None, help="Directorio con fixtures grabados")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--no-snapshot", action="store_true", help="Medir sin el snapshot en memoria")
+    args = parser.parse_args()
+
+    endpoints = [name for name in args.endpoints.split(",") if name]
+    unknown = [name for name in endpoints if name not in ENDPOINTS]
+    if unknown:
+        parser.error(f"Endpoints desconocidos: {', '.join(unknown)}")
+    levels = [int(level) for level in args.concurrency.split(",")]
+    snapshot = not args.no_snapshot
+
+    meta = {
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "duration": args.duration,
+        "latency_ms": args.latency_ms,
+        "error_rate": args.error_rate,
+        "fixtures": args.fixtures,
+        "snapshot": snapshot,
+        "target": args.target
+    }
+
+    if args.target:
+        results = asyncio.run(run_load(args.target, endpoints, levels, args.duration, snapshot))
+    else:
+        mock_app = create_mock_app(latency_ms=args.latency_ms, error_rate=args.error_rate,
+                                   fixtures_dir=args.fixtures)
+        with MockUpstreamServer(mock_app, args.mock_port) as upstream:
+            api = start_api(args.api_port, upstream.base_url, snapshot)
+            try:
+                results = asyncio.run(run_load(f"http://127.0.0.1:{args.api_port}", endpoints, levels,
+                                               args.duration, snapshot))
+            finally:
+                api.terminate()
+                api.wait()
+            meta["upstream_requests"] = mock_app.state.request_count
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump({"meta": meta, "results": results}, file, indent=2)
+        print(f"Resultados guardados en {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+"""
+=============================================================================
+SERVIDOR SIMULADO DE RICKANDMORTYAPI.COM
+=============================================================================
+
+Servidor local que imita los endpoints de personajes, ubicaciones y
+episodios de rickandmortyapi.com para poder medir la aplicación sin depender
+de la red. Los datos pueden venir de dos fuentes:
+
+- Fixtures grabados de la API real (ver benchmarks/recordFixtures.py): un
+  directorio con characters.json, locations.json y episodes.json cuyas URLs
+  se reescriben para apuntar al servidor simulado.
+- Datos sintéticos generados de forma determinista a partir del ID.
+
+Sirve también los avatares (/api/character/avatar/{id}.jpeg) con bytes
+deterministas, ETag y Last-Modified, respondiendo 304 a las peticiones
+condicionales. Cambiando app.state.avatar_version cambian todos los avatares.
+
+Permite inyectar fallos para probar la capa de resiliencia: una proporción
+de respuestas 503 (error_rate) y de respuestas lentas (slow_rate/slow_ms).
+La configuración puede cambiarse en caliente a través de app.state.faults.
+
+Uso:
+    python -m benchmarks.mockUpstream --port 8765 --latency-ms 20 --error-rate 0.1
+    python -m benchmarks.mockUpstream --fixtures benchmarks/fixtures
+
+Autor: Ing. Daniel Issac Cañas
+Fecha: Enero 2026
+=============================================================================
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+from typing import Dict, List, Optional
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+from benchmarks.benchUtils import BackgroundServer
+
+PAGE_SIZE = 20
+REAL_BASE_URL = "https://rickandmortyapi.com/api"
+RESOURCES = {"character": "characters", "location": "locations", "episode": "episodes"}
+NAMES = ["Rick Sanchez", "Morty Smith", "Summer Smith", "Beth Smith", "Jerry Smith",
+         "Birdperson", "Squanchy", "Mr. Meeseeks", "Pickle Rick", "Evil Morty"]
+STATUSES = ["Alive", "Dead", "unknown"]
+SPECIES = ["Human", "Alien", "Humanoid", "Robot", "Animal"]
+GENDERS = ["Male", "Female", "Genderless", "unknown"]
+LOCATIONS = ["Earth (C-137)", "Citadel of Ricks", "Earth (Replacement Dimension)",
+             "Anatomy Park", "Interdimensional Cable"]
+EPISODE_COUNT = 51
+AVATAR_LAST_MODIFIED = "Mon, 01 Jan 2018 00:00:00 GMT"
+
+def make_character(character_id: int, base_url: str) -> dict:
+    """Genera un personaje determinista con el formato de la API real"""
+
+    name = NAMES[character_id % len(NAMES)]
+    if character_id > len(NAMES):
+        name = f"{name} {character_id}"
+    origin = LOCATIONS[character_id % len(LOCATIONS)]
+    location = LOCATIONS[(character_id * 7) % len(LOCATIONS)]
+    episodes = [f"{base_url}/episode/{n}" for n in character_episode_ids(character_id)]
+    return {
+        "id": character_id,
+        "name": name,
+        "status": STATUSES[character_id % len(STATUSES)],
+        "species": SPECIES[character_id % len(SPECIES)],
+        "type": "",
+        "gender": GENDERS[character_id % len(GENDERS)],
+        "origin": {"name": origin, "url": f"{base_url}/location/{character_id % len(LOCATIONS) + 1}"},
+        "location": {"name": location, "url": f"{base_url}/location/{(character_id * 7) % len(LOCATIONS) + 1}"},
+        "image": f"{base_url}/character/avatar/{character_id}.jpeg",
+        "episode": episodes,
+        "url": f"{base_url}/character/{character_id}",
+        "created": "2017-11-04T18:48:46.250Z"
+    }
+
+def character_episode_ids(character_id: int) -> range:
+    """Episodios en los que aparece un personaje simulado"""
+
+    return range(1, character_id % EPISODE_COUNT + 2)
+
+def make_location(location_id: int, base_url: str, character_count: int) -> dict:
+    """Genera una ubicación con sus residentes (personajes cuya ubicación actual es esta)"""
+
+    residents = [
+        f"{base_url}/character/{character_id}" for character_id in range(1, character_count + 1)
+        if (character_id * 7) % len(LOCATIONS) + 1 == location_id
+    ]
+    return {
+        "id": location_id,
+        "name": LOCATIONS[location_id - 1],
+        "type": "Planet",
+        "dimension": "Dimension C-137",
+        "residents": residents,
+        "url": f"{base_url}/location/{location_id}",
+        "created": "2017-11-10T12:42:04.162Z"
+    }
+
+def make_episode(episode_id: int, base_url: str, character_count: int) -> dict:
+    """Genera un episodio con los personajes que aparecen en él"""
+
+    characters = [
+        f"{base_url}/character/{character_id}" for character_id in range(1, character_count + 1)
+        if episode_id in character_episode_ids(character_id)
+    ]
+    return {
+        "id": episode_id,
+        "name": f"Episode {episode_id}",
+        "air_date": "December 2, 2013",
+        "episode": f"S{(episode_id - 1) // 10 + 1:02d}E{(episode_id - 1) % 10 + 1:02d}",
+        "characters": characters,
+        "url": f"{base_url}/episode/{episode_id}",
+        "created": "2017-11-10T12:56:33.798Z"
+    }
+
+class MockDataset:
+    """Recursos servidos por el servidor simulado, indexados por tipo e ID"""
+
+    def __init__(self, characters: List[dict], locations: List[dict], episodes: List[dict]):
+        self.resources: Dict[str, Dict[int, dict]] = {
+            resource: {item["id"]: item for item in sorted(items, key=lambda item: item["id"])}
+            for resource, items in (("character", characters), ("location", locations), ("episode", episodes))
+        }
+
+    @classmethod
+    def synthetic(cls, base_url: str, character_count: int) -> "MockDataset":
+        """Genera el catálogo sintético completo"""
+
+        return cls(
+            [make_character(i, base_url) for i in range(1, character_count + 1)],
+            [make_location(i, base_url, character_count) for i in range(1, len(LOCATIONS) + 1)],
+            [make_episode(i, base_url, character_count) for i in range(1, EPISODE_COUNT + 1)]
+        )
+
+    @classmethod
+    def from_fixtures(cls, directory: str, base_url: str) -> "MockDataset":
+        """Carga fixtures grabados reescribiendo sus URLs hacia el servidor simulado"""
+
+        def load(resource: str) -> List[dict]:
+            path = os.path.join(directory, f"{RESOURCES[resource]}.json")
+            if not os.path.exists(path):
+                return []
+            with open(path, encoding="utf-8") as file:
+                return json.loads(file.read().replace(REAL_BASE_URL, base_url))
+
+        return cls(load("character"), load("location"), load("episode"))
+
+def make_avatar(character_id: int, version: int = 0) -> bytes:
+    """Bytes deterministas con forma de JPEG (marcadores SOI/EOI) de unos 15 KB"""
+
+    rng = random.Random(character_id * 1000 + version)
+    size = 12000 + rng.randrange(6000)
+    return b"\xff\xd8\xff\xe0" + rng.getrandbits(size * 8).to_bytes(size, "little") + b"\xff\xd9"
+
+def create_mock_app(character_count: int = 826, latency_ms: float = 0.0, error_rate: float = 0.0,
+                    slow_rate: float = 0.0, slow_ms: float = 0.0, fixtures_dir: Optional[str] = None) -> FastAPI:
+    """Crea la aplicación simulada con sus datos, latencia y fallos
+
+    Con fixtures_dir se reproducen los fixtures grabados en ese directorio;
+    si no, se genera un catálogo sintético de character_count personajes.
+    """
+
+    app = FastAPI()
+    app.state.request_count = 0
+    app.state.faults = {"error_rate": error_rate, "slow_rate": slow_rate, "slow_ms": slow_ms}
+    app.state.avatar_requests = 0
+    app.state.avatar_not_modified = 0
+    app.state.avatar_version = 0
+    datasets: Dict[str, MockDataset] = {}
+
+    def base_url(request: Request) -> str:
+        return str(request.base_url).rstrip("/") + "/api"
+
+    def dataset(request: Request) -> MockDataset:
+        """Datos para la dirección de la petición (las URLs internas dependen de ella)"""
+
+        url = base_url(request)
+        if url not in datasets:
+            if fixtures_dir:
+                datasets[url] = MockDataset.from_fixtures(fixtures_dir, url)
+            else:
+                datasets[url] = MockDataset.synthetic(url, character_count)
+        return datasets[url]
+
+    class InjectedFault(Exception):
+        pass
+
+    @app.exception_handler(InjectedFault)
+    async def injected_fault_handler(request: Request, exc: InjectedFault):
+        return JSONResponse({"error": "Injected fault"}, status_code=503)
+
+    async def simulate_latency():
+        app.state.request_count += 1
+        faults = app.state.faults
+        delay_ms = latency_ms
+        if faults["slow_rate"] and random.random() < faults["slow_rate"]:
+            delay_ms += faults["slow_ms"]
+        if delay_ms:
+            await asyncio.sleep(delay_ms / 1000)
+        if faults["error_rate"] and random.random() < faults["error_rate"]:
+            raise InjectedFault()
+
+    def resource_routes(resource: str):
+        """Registra el listado paginado (con filtros) y la consulta por ID(s) de un recurso"""
+
+        async def list_resources(request: Request, page: int = 1, name: str = "", status: str = ""):
+            await simulate_latency()
+            url = base_url(request)
+            items = list(dataset(request).resources[resource].values())
+            query = ""
+            if name:
+                items = [item for item in items if name.lower() in item["name"].lower()]
+                query += f"&name={name}"
+            if status:
+                items = [item for item in items if item.get("status", "").lower() == status.lower()]
+                query += f"&status={status}"
+            pages = (len(items) + PAGE_SIZE - 1) // PAGE_SIZE
+            if page < 1 or page > pages:
+                return JSONResponse({"error": "There is nothing here"}, status_code=404)
+            return {
+                "info": {
+                    "count": len(items),
+                    "pages": pages,
+                    "next": f"{url}/{resource}?page={page + 1}{query}" if page < pages else None,
+                    "prev": f"{url}/{resource}?page={page - 1}{query}" if page > 1 else None
+                },
+                "results": items[(page - 1) * PAGE_SIZE:page * PAGE_SIZE]
+            }
+
+        async def get_resources(request: Request, ids: str):
+            await simulate_latency()
+            items = dataset(request).resources[resource]
+            if "," in ids or ids.startswith("["):
+                wanted = [int(part) for part in ids.strip("[]").split(",") if part.strip().isdigit()]
+                return [items[i] for i in wanted if i in items]
+            if not ids.isdigit() or int(ids) not in items:
+                return JSONResponse({"error": f"{resource.capitalize()} not found"}, status_code=404)
+            return items[int(ids)]
+
+        app.get(f"/api/{resource}")(list_resources)
+        app.get(f"/api/{resource}/")(list_resources)
+        app.get(f"/api/{resource}/{{ids}}")(get_resources)
+
+    for resource in RESOURCES:
+        resource_routes(resource)
+
+    @app.get("/api/character/avatar/{filename}")
+    async def get_avatar(request: Request, filename: str):
+        await simulate_latency()
+        app.state.avatar_requests += 1
+        character_id = filename[:-len(".jpeg")] if filename.endswith(".jpeg") else filename
+        if not character_id.isdigit() or int(character_id) not in dataset(request).resources["character"]:
+            return JSONResponse({"error": "Avatar not found"}, status_code=404)
+
+        version = app.state.avatar_version
+        etag = f'"avatar-{character_id}-{version}"'
+        headers = {"ETag": etag, "Last-Modified": AVATAR_LAST_MODIFIED}
+        if request.headers.get("if-none-match") == etag or (
+                version == 0 and request.headers.get("if-modified-since") == AVATAR_LAST_MODIFIED):
+            app.state.avatar_not_modified += 1
+            return Response(status_code=304, headers=headers)
+        return Response(make_avatar(int(character_id), version), media_type="image/jpeg", headers=headers)
+
+    return app
+
+class MockUpstreamServer(BackgroundServer):
+    """Ejecuta el servidor simulado en un hilo de fondo (útil en benchmarks)"""
+
+    def __init__(self, app: FastAPI, port: int = 8765):
+        super().__init__(app, port)
+
+    @property
+    def base_url(self) -> str:
+        return f"{self.url}/api"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor simulado de rickandmortyapi.com")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--characters", type=int, default=826)
+    parser.add_argument("--fixtures", default=None, help="Directorio con fixtures grabados")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--slow-rate", type=float, default=0.0)
+    parser.add_argument("--slow-ms", type=float, default=0.0)
+    args = parser.parse_args()
+    app = create_mock_app(args.characters, args.latency_ms, args.error_rate, args.slow_rate, args.slow_ms,
+                          fixtures_dir=args.fixtures)
+    uvicorn.run(app, host="127.0.0.1", port=args.port)
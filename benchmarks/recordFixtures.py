@@ -0,0 +1,53 @@
+"""
+=============================================================================
+GRABACIÓN DE FIXTURES DE RICKANDMORTYAPI.COM
+=============================================================================
+
+Descarga el catálogo completo (personajes, ubicaciones y episodios) de la
+API real y lo guarda como JSON para que el servidor simulado lo reproduzca
+(python -m benchmarks.mockUpstream --fixtures DIR). Así los benchmarks
+trabajan con la forma y el tamaño reales de los datos sin depender de la red.
+
+Uso:
+    python -m benchmarks.recordFixtures --output benchmarks/fixtures
+
+Autor: Ing. Daniel Issac Cañas
+Fecha: Enero 2026
+=============================================================================
+"""
+
+import argparse
+import json
+import os
+import httpx
+from benchmarks.mockUpstream import REAL_BASE_URL, RESOURCES
+
+def record_resource(client: httpx.Client, resource: str) -> list:
+    """Recorre todas las páginas de un recurso y devuelve sus elementos"""
+
+    items = []
+    url = f"{REAL_BASE_URL}/{resource}"
+    while url:
+        response = client.get(url)
+        response.raise_for_status()
+        data = response.json()
+        items.extend(data["results"])
+        url = data["info"]["next"]
+    return items
+
+def main():
+    parser = argparse.ArgumentParser(description="Graba fixtures de la API real")
+    parser.add_argument("--output", default="benchmarks/fixtures")
+    args = parser.parse_args()
+
+    os.makedirs(args.output, exist_ok=True)
+    with httpx.Client(timeout=30.0) as client:
+        for resource, filename in RESOURCES.items():
+            items = record_resource(client, resource)
+            path = os.path.join(args.output, f"{filename}.json")
+            with open(path, "w", encoding="utf-8") as file:
+                json.dump(items, file, ensure_ascii=False)
+            print(f"{resource:<10} {len(items):>5} elementos -> {path}")
+
+if __name__ == "__main__":
+    main()
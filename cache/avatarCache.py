@@ -0,0 +1,284 @@
+"""
+=============================================================================
+CACHÉ EN DISCO DE AVATARES DE PERSONAJES
+=============================================================================
+
+Guarda en disco las imágenes de avatar que se sirven a través del proxy
+/api/character/{id}/avatar:
+
+- Los ficheros se nombran por el hash de su contenido (blake2b), así que dos
+  personajes con la misma imagen comparten fichero y el hash sirve de ETag.
+- Cada personaje tiene un fichero de metadatos <id>.json (fichero de
+  contenido, tipo, validadores de la API externa y caducidad) que se escribe
+  de forma atómica al guardar o revalidar su avatar. Así la caché sobrevive
+  a una caída del proceso y cada worker ve al arrancar lo que guardaron los
+  demás.
+- En memoria se lleva el orden LRU; al superar max_bytes se expulsan los
+  avatares usados hace más tiempo y se borran los ficheros que ya nadie
+  referencia. Al apagar, el orden LRU se guarda en la fecha de modificación
+  de los metadatos.
+- La imagen se descarga en un fichero temporal que solo se publica si la
+  descarga termina completa (AvatarWriter).
+- Al arrancar solo se borran ficheros con nombre de hash o temporales que
+  nadie referencia y que tienen más de ORPHAN_GRACE segundos (pueden ser
+  descargas en curso de otro worker); el resto del directorio no se toca.
+
+Las escrituras son síncronas: los avatares ocupan unos pocos KB y van a la
+caché de páginas del sistema operativo.
+
+Autor: Ing. Daniel Issac Cañas
+Fecha: Enero 2026
+=============================================================================
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+from collections import OrderedDict
+from email.utils import formatdate
+from typing import AsyncIterator, Dict, Optional
+
+DIGEST_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+METADATA_PATTERN = re.compile(r"^(\d+)\.json$")
+TEMP_SUFFIX = ".tmp"
+# Antigüedad a partir de la cual un fichero sin referencias se considera huérfano
+ORPHAN_GRACE = 3600
+
+class AvatarEntry:
+    """Avatar guardado en disco con sus validadores"""
+
+    __slots__ = ("digest", "size", "content_type", "last_modified", "upstream_etag", "fresh_until")
+
+    def __init__(self, digest: str, size: int, content_type: str, last_modified: str,
+                 upstream_etag: Optional[str], fresh_until: float):
+        self.digest = digest
+        self.size = size
+        self.content_type = content_type
+        # Last-Modified de la API externa (o instante de descarga si no lo envía)
+        self.last_modified = last_modified
+        self.upstream_etag = upstream_etag
+        # Instante de reloj (se guarda en los metadatos) a partir del cual hay que revalidar
+        self.fresh_until = fresh_until
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.digest}"'
+
+    def is_stale(self) -> bool:
+        return time.time() >= self.fresh_until
+
+    def to_dict(self) -> dict:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+class AvatarWriter:
+    """Fichero temporal en el que se va escribiendo (y hasheando) una descarga"""
+
+    def __init__(self, directory: str):
+        descriptor, self.temp_path = tempfile.mkstemp(dir=directory, suffix=TEMP_SUFFIX)
+        self.file = os.fdopen(descriptor, "wb")
+        self.hasher = hashlib.blake2b(digest_size=16)
+        self.size = 0
+
+    def write(self, chunk: bytes):
+        self.file.write(chunk)
+        self.hasher.update(chunk)
+        self.size += len(chunk)
+
+    def discard(self):
+        """Descarta una descarga incompleta"""
+
+        self.file.close()
+        if os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
+
+class AvatarResult:
+    """Resultado de pedir un avatar: fichero en disco (entry) o descarga en curso (body)"""
+
+    def __init__(self, status: str, entry: Optional[AvatarEntry] = None, path: Optional[str] = None,
+                 body: Optional[AsyncIterator[bytes]] = None, content_type: str = "image/jpeg",
+                 last_modified: Optional[str] = None):
+        # hit, revalidated, stale (la API externa falló), miss o bypass (sin caché en disco)
+        self.status = status
+        self.entry = entry
+        self.path = path
+        self.body = body
+        self.content_type = entry.content_type if entry is not None else content_type
+        self.last_modified = entry.last_modified if entry is not None else last_modified
+
+class AvatarCache:
+    """Caché LRU de avatares en disco, acotada por bytes y direccionada por contenido"""
+
+    def __init__(self, directory: str, max_bytes: int, ttl: float):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: "OrderedDict[int, AvatarEntry]" = OrderedDict()
+        self._references: Dict[str, int] = {}
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+        self.load()
+
+    def path(self, entry: AvatarEntry) -> str:
+        return os.path.join(self.directory, entry.digest)
+
+    def _metadata_path(self, key: int) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: int) -> Optional[AvatarEntry]:
+        """Devuelve la entrada (aunque haya caducado) y la marca como usada"""
+
+        entry = self._entries.get(key)
+        if entry is not None and not os.path.exists(self.path(entry)):
+            # El fichero desapareció (borrado a mano u otro worker): se trata como fallo
+            self._remove(key)
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def writer(self) -> AvatarWriter:
+        return AvatarWriter(self.directory)
+
+    def commit(self, key: int, writer: AvatarWriter, content_type: str, last_modified: Optional[str],
+               upstream_etag: Optional[str]) -> AvatarEntry:
+        """Publica una descarga completa y aplica el límite de tamaño"""
+
+        writer.file.close()
+        digest = writer.hasher.hexdigest()
+        final_path = os.path.join(self.directory, digest)
+        if os.path.exists(final_path):
+            os.remove(writer.temp_path)
+        else:
+            os.replace(writer.temp_path, final_path)
+
+        entry = AvatarEntry(digest, writer.size, content_type, last_modified or formatdate(usegmt=True),
+                            upstream_etag, time.time() + self.ttl)
+        # Se toma la referencia nueva antes de soltar la anterior: si el contenido
+        # no ha cambiado, el fichero compartido no llega a quedarse sin referencias
+        previous = self._entries.pop(key, None)
+        self._add(key, entry)
+        if previous is not None:
+            self._release(previous)
+        self._write_metadata(key, entry)
+        self._evict()
+        return entry
+
+    def refresh(self, key: int, entry: AvatarEntry):
+        """La API externa confirmó (304) que el avatar no ha cambiado"""
+
+        entry.fresh_until = time.time() + self.ttl
+        self.revalidations += 1
+        if self._entries.get(key) is entry:
+            self._write_metadata(key, entry)
+
+    def _write_metadata(self, key: int, entry: AvatarEntry):
+        descriptor, temp_path = tempfile.mkstemp(dir=self.directory, suffix=TEMP_SUFFIX)
+        with os.fdopen(descriptor, "w", encoding="utf-8") as file:
+            json.dump(entry.to_dict(), file)
+        os.replace(temp_path, self._metadata_path(key))
+
+    def _add(self, key: int, entry: AvatarEntry):
+        self._entries[key] = entry
+        self._references[entry.digest] = self._references.get(entry.digest, 0) + 1
+        if self._references[entry.digest] == 1:
+            self._bytes += entry.size
+
+    def _release(self, entry: AvatarEntry):
+        """Suelta una referencia al fichero y lo borra si era la última"""
+
+        self._references[entry.digest] -= 1
+        if self._references[entry.digest] == 0:
+            del self._references[entry.digest]
+            self._bytes -= entry.size
+            try:
+                os.remove(self.path(entry))
+            except FileNotFoundError:
+                pass
+
+    def _remove(self, key: int):
+        self._release(self._entries.pop(key))
+        try:
+            os.remove(self._metadata_path(key))
+        except FileNotFoundError:
+            pass
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and self._entries:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def load(self):
+        """Reconstruye las entradas a partir de los metadatos y borra los ficheros huérfanos"""
+
+        names = os.listdir(self.directory)
+        saved = []
+        for name in names:
+            match = METADATA_PATTERN.match(name)
+            if match is None:
+                continue
+            metadata_path = os.path.join(self.directory, name)
+            try:
+                with open(metadata_path, encoding="utf-8") as file:
+                    entry = AvatarEntry(**json.load(file))
+                modified = os.path.getmtime(metadata_path)
+            except (OSError, ValueError, TypeError):
+                continue
+            saved.append((modified, int(match.group(1)), entry))
+
+        # Orden LRU aproximado: fecha de la última escritura de los metadatos
+        for _, key, entry in sorted(saved, key=lambda item: item[0]):
+            if os.path.exists(self.path(entry)):
+                self._add(key, entry)
+
+        cutoff = time.time() - ORPHAN_GRACE
+        for name in names:
+            if name in self._references:
+                continue
+            if not (DIGEST_PATTERN.match(name) or name.endswith(TEMP_SUFFIX)):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
+        self._evict()
+
+    def save(self):
+        """Guarda el orden LRU en la fecha de modificación de los metadatos"""
+
+        now = time.time()
+        count = len(self._entries)
+        for position, key in enumerate(self._entries):
+            stamp = now - (count - position) * 0.001
+            try:
+                os.utime(self._metadata_path(key), (stamp, stamp))
+            except OSError:
+                pass
+
+    def stats(self) -> dict:
+        """Devuelve la ocupación y los contadores de la caché de avatares"""
+
+        lookups = self.hits + self.misses
+        return {
+            "directory": self.directory,
+            "entries": len(self._entries),
+            "files": len(self._references),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+        }
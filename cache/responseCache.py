@@ -0,0 +1,130 @@
+"""
+=============================================================================
+CACHÉ DE RESPUESTAS (TTL + LRU + STALE-WHILE-REVALIDATE)
+=============================================================================
+
+Caché en memoria para las respuestas de rickandmortyapi.com. Cada entrada
+tiene un TTL (fresca) y una ventana adicional en la que puede servirse
+caducada mientras se refresca en segundo plano. El tamaño está acotado por
+número de entradas y por bytes; al superarse se expulsan las entradas
+usadas hace más tiempo (LRU).
+
+Autor: Ing. Daniel Issac Cañas
+Fecha: Enero 2026
+=============================================================================
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+from urllib.parse import urlencode
+
+class CacheEntry:
+    """Entrada de la caché con sus instantes de caducidad"""
+
+    __slots__ = ("value", "size", "fresh_until", "stale_until")
+
+    def __init__(self, value: Any, size: int, fresh_until: float, stale_until: float):
+        self.value = value
+        self.size = size
+        self.fresh_until = fresh_until
+        self.stale_until = stale_until
+
+    def is_stale(self, now: Optional[float] = None) -> bool:
+        """Indica si la entrada superó su TTL (aunque aún pueda servirse)"""
+        return (now if now is not None else time.monotonic()) >= self.fresh_until
+
+class ResponseCache:
+    """Caché LRU acotada por entradas y bytes con TTL por entrada"""
+
+    def __init__(self, max_entries: int, max_bytes: int, stale_ttl: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.stale_ttl = stale_ttl
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(url: str, params: Optional[dict] = None) -> str:
+        """Construye la clave de caché a partir de la URL y los parámetros"""
+
+        if not params:
+            return url
+        return f"{url}?{urlencode(sorted(params.items()))}"
+
+    def get(self, key: str, allow_expired: bool = False) -> Optional[CacheEntry]:
+        """Devuelve la entrada si sigue siendo servible (fresca o caducada)
+
+        Con allow_expired=True se devuelve incluso pasada la ventana de
+        caducidad (se usa como último recurso cuando la API externa está caída).
+        """
+
+        entry = self._entries.get(key)
+        now = time.monotonic()
+        if entry is not None and allow_expired:
+            self._entries.move_to_end(key)
+            self.stale_hits += 1
+            return entry
+        if entry is None or now >= entry.stale_until:
+            # Las entradas vencidas no se borran aquí: se conservan como último
+            # recurso si la API externa cae y la LRU acaba expulsándolas
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        if entry.is_stale(now):
+            self.stale_hits += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def set(self, key: str, value: Any, ttl: float, size: int = 0):
+        """Guarda un valor con su TTL y aplica la política de expulsión"""
+
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+
+        now = time.monotonic()
+        self._entries[key] = CacheEntry(value, size, now + ttl, now + ttl + self.stale_ttl)
+        self._bytes += size
+
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.evictions += 1
+
+    def clear(self):
+        """Vacía la caché (los contadores se conservan)"""
+
+        self._entries.clear()
+        self._bytes = 0
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        """Devuelve los contadores de uso de la caché"""
+
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "backend": "memory",
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0
+        }
@@ -0,0 +1,282 @@
+"""
+=============================================================================
+CACHÉ DE RESPUESTAS COMPARTIDA ENTRE WORKERS (SQLITE WAL + MMAP)
+=============================================================================
+
+Backend alternativo a ResponseCache para despliegues con varios workers de
+uvicorn/gunicorn en la misma máquina: todas las respuestas se guardan en un
+único fichero SQLite local, así que lo que descarga un worker lo aprovechan
+los demás y los datos se guardan una sola vez (en la caché de páginas del
+sistema) en lugar de una copia por proceso.
+
+- Modo WAL y lectura mapeada en memoria: las lecturas no toman el lock de
+  escritura ni bloquean a quien escribe; solo se serializan las escrituras.
+- Misma interfaz que ResponseCache (get/set con TTL, ventana de caducidad,
+  clear y stats), así que el cliente no sabe qué backend usa.
+- Los instantes de caducidad se guardan en tiempo de reloj (compartido entre
+  procesos) y se traducen a time.monotonic() al leer.
+- La expulsión es aproximada: cada cierto número de escrituras se borran las
+  entradas que caducan antes hasta volver a los límites (las lecturas no
+  escriben, así que no hay orden LRU exacto).
+- Nada bloquea el event loop esperando al lock de otro worker: las lecturas
+  usan un busy timeout muy corto (si la base está ocupada cuentan como
+  fallo) y las escrituras y la expulsión se hacen en un hilo propio, con
+  una cola acotada (si se llena, las escrituras se descartan).
+
+Cada proceso abre sus propias conexiones y su hilo de escritura (también
+tras un fork).
+
+Autor: Ing. Daniel Issac Cañas
+Fecha: Enero 2026
+=============================================================================
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
+from cache.responseCache import CacheEntry, ResponseCache
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependencia opcional
+    orjson = None
+
+MMAP_SIZE = 256 * 1024 * 1024
+# Cada cuántas escrituras se comprueban los límites de tamaño
+EVICTION_INTERVAL = 64
+# Espera máxima por el lock en el event loop (lecturas) y en el hilo de escritura
+READ_BUSY_TIMEOUT = 0.005
+WRITE_BUSY_TIMEOUT = 5.0
+# Escrituras pendientes a partir de las cuales se descartan las nuevas
+MAX_PENDING_WRITES = 1000
+
+def encode(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+def decode(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+class SharedResponseCache:
+    """Caché con TTL en un fichero SQLite compartido por todos los procesos de la máquina"""
+
+    make_key = staticmethod(ResponseCache.make_key)
+
+    def __init__(self, path: str, max_entries: int, max_bytes: int, stale_ttl: float):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.stale_ttl = stale_ttl
+        # Conexión de lectura (hilo del event loop) y de escritura (hilo del writer)
+        self._connection: Optional[sqlite3.Connection] = None
+        self._write_connection: Optional[sqlite3.Connection] = None
+        self._writer: Optional[ThreadPoolExecutor] = None
+        self._pid: Optional[int] = None
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+        self._writes = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.dropped_writes = 0
+
+    def _connect(self, timeout: float) -> sqlite3.Connection:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=timeout, isolation_level=None, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute("PRAGMA synchronous = NORMAL")
+        connection.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, "
+            "fresh_until REAL NOT NULL, stale_until REAL NOT NULL)"
+        )
+        connection.execute("CREATE INDEX IF NOT EXISTS entries_stale_until ON entries (stale_until)")
+        return connection
+
+    def _check_process(self):
+        """Tras un fork las conexiones y el hilo de escritura del padre no sirven: se recrean"""
+
+        if self._pid != os.getpid():
+            self._connection = None
+            self._write_connection = None
+            self._writer = None
+            self._pending = 0
+            self._pid = os.getpid()
+
+    def _db(self) -> sqlite3.Connection:
+        """Conexión de lectura del proceso actual, con busy timeout corto"""
+
+        self._check_process()
+        if self._connection is None:
+            # Si la base está ocupada al abrirla se reintenta en la siguiente lectura
+            self._connection = self._connect(READ_BUSY_TIMEOUT)
+        return self._connection
+
+    def _write_db(self) -> sqlite3.Connection:
+        """Conexión de escritura (solo se usa desde el hilo de escritura)"""
+
+        if self._write_connection is None:
+            self._write_connection = self._connect(WRITE_BUSY_TIMEOUT)
+        return self._write_connection
+
+    def _submit(self, function, *args) -> bool:
+        """Encola una operación de escritura; False si la cola está llena"""
+
+        self._check_process()
+        with self._pending_lock:
+            if self._pending >= MAX_PENDING_WRITES:
+                self.dropped_writes += 1
+                return False
+            self._pending += 1
+        if self._writer is None:
+            self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shared-cache-writer")
+        self._writer.submit(self._run_write, function, *args)
+        return True
+
+    def _run_write(self, function, *args):
+        try:
+            function(self._write_db(), *args)
+        except sqlite3.Error:
+            # La caché es una optimización: si el fichero está ocupado o dañado se sigue sin ella
+            pass
+        finally:
+            with self._pending_lock:
+                self._pending -= 1
+
+    def get(self, key: str, allow_expired: bool = False) -> Optional[CacheEntry]:
+        """Devuelve la entrada si sigue siendo servible (igual que ResponseCache.get)"""
+
+        try:
+            row = self._db().execute(
+                "SELECT value, size, fresh_until, stale_until FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error:
+            row = None
+
+        wall_now = time.time()
+        if row is None or (not allow_expired and wall_now >= row[3]):
+            self.misses += 1
+            return None
+
+        try:
+            value = decode(row[0])
+        except ValueError:
+            self.misses += 1
+            return None
+
+        # Los instantes compartidos son de reloj; CacheEntry trabaja con monotonic
+        offset = time.monotonic() - wall_now
+        entry = CacheEntry(value, row[1], row[2] + offset, row[3] + offset)
+        if allow_expired or entry.is_stale():
+            self.stale_hits += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def set(self, key: str, value: Any, ttl: float, size: int = 0):
+        """Guarda un valor con su TTL en segundo plano; cada EVICTION_INTERVAL escrituras aplica los límites"""
+
+        data = encode(value)
+        size = size or len(data)
+        if size > self.max_bytes:
+            return
+
+        now = time.time()
+        self._submit(self._write, key, data, size, now + ttl, now + ttl + self.stale_ttl)
+
+    def _write(self, connection: sqlite3.Connection, key: str, data: bytes, size: int,
+               fresh_until: float, stale_until: float):
+        connection.execute(
+            "INSERT OR REPLACE INTO entries (key, value, size, fresh_until, stale_until) VALUES (?, ?, ?, ?, ?)",
+            (key, data, size, fresh_until, stale_until)
+        )
+        self._writes += 1
+        if self._writes % EVICTION_INTERVAL == 0:
+            self._evict(connection)
+
+    def _evict(self, connection: sqlite3.Connection):
+        """Borra las entradas que antes caducan hasta volver a los límites"""
+
+        count, total = connection.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+
+        excess_entries = max(0, count - self.max_entries)
+        removed = 0
+        freed = 0
+        keys = []
+        for key, size in connection.execute("SELECT key, size FROM entries ORDER BY stale_until"):
+            if removed >= excess_entries and total - freed <= self.max_bytes:
+                break
+            keys.append((key,))
+            removed += 1
+            freed += size
+        connection.executemany("DELETE FROM entries WHERE key = ?", keys)
+        self.evictions += len(keys)
+
+    def clear(self):
+        """Vacía la caché para todos los procesos (los contadores se conservan)"""
+
+        self._submit(lambda connection: connection.execute("DELETE FROM entries"))
+
+    def flush(self):
+        """Espera a que terminen las escrituras pendientes"""
+
+        if self._writer is not None and self._pid == os.getpid():
+            self._writer.submit(lambda: None).result()
+
+    def close(self):
+        """Termina las escrituras pendientes y cierra las conexiones"""
+
+        if self._pid == os.getpid():
+            if self._writer is not None:
+                self._writer.shutdown(wait=True)
+            for connection in (self._connection, self._write_connection):
+                if connection is not None:
+                    connection.close()
+        self._connection = None
+        self._write_connection = None
+        self._writer = None
+
+    def _occupancy(self):
+        """(entradas, bytes) del fichero compartido; (None, None) si la base está ocupada"""
+
+        try:
+            return self._db().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        except sqlite3.Error:
+            return None, None
+
+    def __len__(self) -> int:
+        return self._occupancy()[0] or 0
+
+    def stats(self) -> dict:
+        """Devuelve los contadores de este proceso y la ocupación del fichero compartido"""
+
+        count, total = self._occupancy()
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "backend": "shared",
+            "path": self.path,
+            "entries": count,
+            "bytes": total,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "pending_writes": self._pending,
+            "dropped_writes": self.dropped_writes,
+            "hit_ratio": round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0
+        }
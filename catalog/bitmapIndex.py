@@ -0,0 +1,123 @@
+"""
+=============================================================================
+ÍNDICES DE BITMAPS PARA FILTRADO MULTICRITERIO CON FACETAS
+=============================================================================
+
+Un bitmap por cada valor de cada campo filtrable (estado, especie, género,
+tipo, origen y ubicación): el bit i está activo si el personaje en la
+posición i del snapshot tiene ese valor. Los bitmaps son enteros de Python,
+así que combinar filtros es una operación de bits sobre palabras de máquina:
+
+- Varios valores de un mismo campo se combinan con OR.
+- Campos distintos se combinan con AND.
+- Las facetas de los campos no filtrados se cuentan con AND + popcount().
+
+Las posiciones coinciden con CharacterSnapshot.records (ordenado por ID),
+así que los resultados salen ordenados por ID. Se construye una vez por
+snapshot, igual que las columnas de estadísticas.
+
+Autor: Ing. Daniel Issac Cañas
+Fecha: Enero 2026
+=============================================================================
+"""
+
+import random
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from catalog.characterSnapshot import CharacterRecord
+
+FILTER_FIELDS = ("status", "species", "gender", "type", "origin", "location")
+
+# Número de bits activos de un bitmap (int.bit_count solo existe desde Python 3.10)
+if hasattr(int, "bit_count"):
+    popcount = int.bit_count
+else:  # pragma: no cover - Python < 3.10
+    def popcount(bitmap: int) -> int:
+        return bin(bitmap).count("1")
+
+class BitmapIndex:
+    """Bitmaps por valor (sin distinguir mayúsculas) de los campos filtrables"""
+
+    def __init__(self, records: Sequence[CharacterRecord]):
+        self.size = len(records)
+        self.all = (1 << self.size) - 1
+        self.bitmaps: Dict[str, Dict[str, int]] = {}
+        # Valor tal y como lo devuelve la API (el primero visto) para cada clave normalizada
+        self.labels: Dict[str, Dict[str, str]] = {}
+        for field in FILTER_FIELDS:
+            positions: Dict[str, List[int]] = {}
+            labels: Dict[str, str] = {}
+            for position, record in enumerate(records):
+                value = getattr(record, field)
+                key = value.lower()
+                labels.setdefault(key, value)
+                positions.setdefault(key, []).append(position)
+            self.bitmaps[field] = {key: self._from_positions(items) for key, items in positions.items()}
+            self.labels[field] = labels
+
+    @staticmethod
+    def _from_positions(positions: Iterable[int]) -> int:
+        bitmap = 0
+        for position in positions:
+            bitmap |= 1 << position
+        return bitmap
+
+    def match(self, filters: Dict[str, Sequence[str]]) -> int:
+        """Bitmap de los personajes que cumplen los filtros (OR dentro de un campo, AND entre campos)"""
+
+        selection = self.all
+        for field, values in filters.items():
+            bitmaps = self.bitmaps[field]
+            field_bitmap = 0
+            for value in values:
+                field_bitmap |= bitmaps.get(value.strip().lower(), 0)
+            selection &= field_bitmap
+            if not selection:
+                break
+        return selection
+
+    @staticmethod
+    def positions(bitmap: int, offset: int = 0, limit: Optional[int] = None) -> List[int]:
+        """Posiciones de los bits activos, en orden, con paginación"""
+
+        result = []
+        skipped = 0
+        while bitmap and (limit is None or len(result) < limit):
+            lowest = bitmap & -bitmap
+            if skipped < offset:
+                skipped += 1
+            else:
+                result.append(lowest.bit_length() - 1)
+            bitmap ^= lowest
+        return result
+
+    def sample(self, bitmap: int, count: int) -> List[int]:
+        """Muestra aleatoria uniforme (sin repetición) de las posiciones del bitmap"""
+
+        total = popcount(bitmap)
+        if count >= total:
+            positions = self.positions(bitmap)
+            random.shuffle(positions)
+            return positions
+        # Se eligen los rangos (k-ésimo bit activo) y se localizan en una sola pasada
+        ranks = sorted(random.sample(range(total), count))
+        positions = []
+        rank = 0
+        for wanted in ranks:
+            while rank < wanted:
+                bitmap &= bitmap - 1
+                rank += 1
+            positions.append((bitmap & -bitmap).bit_length() - 1)
+        random.shuffle(positions)
+        return positions
+
+    def facets(self, bitmap: int, fields: Iterable[str], limit: Optional[int] = None) -> Dict[str, List[Tuple[str, int]]]:
+        """Número de personajes de la selección por cada valor de los campos indicados"""
+
+        result = {}
+        for field in fields:
+            labels = self.labels[field]
+            counts = [(labels[key], popcount(bitmap & value_bitmap))
+                      for key, value_bitmap in self.bitmaps[field].items()]
+            ranked = sorted((item for item in counts if item[1]), key=lambda item: (-item[1], item[0]))
+            result[field] = ranked[:limit] if limit is not None else ranked
+        return result
@@ -0,0 +1,165 @@
+"""
+=============================================================================
+SNAPSHOT EN MEMORIA DEL CATÁLOGO DE PERSONAJES
+=============================================================================
+
+Guarda el catálogo completo de personajes en una representación compacta
+(registros con __slots__) junto con arrays de IDs precalculados por estado,
+de modo que el personaje aleatorio y el personaje por estado se resuelven en
+O(1) desde memoria y con muestreo uniforme sobre todo el catálogo.
+
+El snapshot no se modifica nunca: la sincronización incremental construye
+uno nuevo con with_records() y lo sustituye de una vez (copy-on-write), así
+que quien esté leyendo el anterior no se bloquea ni ve estados intermedios.
+
+Autor: Ing. Daniel Issac Cañas
+Fecha: Enero 2026
+=============================================================================
+"""
+
+import bisect
+import random
+import time
+from array import array
+from typing import Dict, Iterable, List, Optional
+
+def id_from_url(url: str) -> Optional[int]:
+    """Extrae el ID de una URL de recurso de la API (ej: .../episode/28 -> 28)"""
+
+    tail = url.rstrip("/").rsplit("/", 1)[-1] if url else ""
+    return int(tail) if tail.isdigit() else None
+
+class CharacterRecord:
+    """Registro compacto de un personaje
+
+    Además de los campos de CharacterResponseDTO guarda las referencias a
+    episodios y ubicaciones como IDs, para poder expandirlas sin volver a
+    descargar el personaje.
+    """
+
+    DTO_FIELDS = ("id", "name", "status", "species", "type", "gender", "origin",
+                  "location", "image", "episode_count", "created")
+
+    __slots__ = DTO_FIELDS + ("episode_ids", "origin_id", "location_id", "dto")
+
+    def __init__(self, id: int, name: str, status: str, species: str, type: str, gender: str,
+                 origin: str, location: str, image: str, episode_count: int, created: str,
+                 episode_ids: Optional[array] = None, origin_id: Optional[int] = None,
+                 location_id: Optional[int] = None):
+        self.id = id
+        self.name = name
+        self.status = status
+        self.species = species
+        self.type = type
+        self.gender = gender
+        self.origin = origin
+        self.location = location
+        self.image = image
+        self.episode_count = episode_count
+        self.created = created
+        self.episode_ids = episode_ids if episode_ids is not None else array("H")
+        self.origin_id = origin_id
+        self.location_id = location_id
+        # DTO ya construido para este registro (lo memoriza el servicio)
+        self.dto = None
+
+    @classmethod
+    def from_api(cls, character_data: dict) -> "CharacterRecord":
+        """Construye el registro a partir de un personaje de la API"""
+
+        episode_urls = character_data.get("episode", [])
+        return cls(
+            id=character_data["id"],
+            name=character_data["name"],
+            status=character_data["status"],
+            species=character_data["species"],
+            type=character_data.get("type", ""),
+            gender=character_data["gender"],
+            origin=character_data["origin"]["name"],
+            location=character_data["location"]["name"],
+            image=character_data["image"],
+            episode_count=len(episode_urls),
+            created=character_data["created"],
+            episode_ids=array("H", filter(None, map(id_from_url, episode_urls))),
+            origin_id=id_from_url(character_data["origin"].get("url", "")),
+            location_id=id_from_url(character_data["location"].get("url", ""))
+        )
+
+    def as_dict(self) -> dict:
+        """Devuelve los campos de CharacterResponseDTO como diccionario"""
+
+        return {field: getattr(self, field) for field in self.DTO_FIELDS}
+
+    def same_data(self, other: "CharacterRecord") -> bool:
+        """Indica si dos registros tienen los mismos datos (sin contar el DTO memorizado)"""
+
+        return (self.as_dict() == other.as_dict() and self.episode_ids == other.episode_ids
+                and self.origin_id == other.origin_id and self.location_id == other.location_id)
+
+class CharacterSnapshot:
+    """Catálogo de personajes inmutable con índices por estado"""
+
+    def __init__(self, records: Iterable[CharacterRecord]):
+        self.records: List[CharacterRecord] = sorted(records, key=lambda record: record.id)
+        self.by_id: Dict[int, CharacterRecord] = {record.id: record for record in self.records}
+        # IDs en el mismo orden que self.records (para búsquedas binarias por ID)
+        self.ids = array("I", (record.id for record in self.records))
+        self.loaded_at = time.time()
+
+        # Posiciones de cada personaje en self.records agrupadas por estado
+        status_positions: Dict[str, array] = {}
+        for position, record in enumerate(self.records):
+            status_positions.setdefault(record.status.lower(), array("I")).append(position)
+        self.status_positions = status_positions
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @property
+    def max_id(self) -> int:
+        return self.records[-1].id if self.records else 0
+
+    def with_records(self, records: Iterable[CharacterRecord]) -> "CharacterSnapshot":
+        """Devuelve un snapshot nuevo con esos registros añadidos o sustituidos
+
+        Los registros que no cambian se comparten con el snapshot actual (y
+        conservan su DTO ya construido).
+        """
+
+        by_id = dict(self.by_id)
+        by_id.update((record.id, record) for record in records)
+        return CharacterSnapshot(by_id.values())
+
+    def position_after(self, character_id: int) -> int:
+        """Posición en self.records del primer personaje con ID mayor que el indicado"""
+
+        return bisect.bisect_right(self.ids, character_id)
+
+    def get(self, character_id: int) -> Optional[CharacterRecord]:
+        """Obtiene un personaje por ID"""
+
+        return self.by_id.get(character_id)
+
+    def random_character(self) -> Optional[CharacterRecord]:
+        """Devuelve un personaje uniforme sobre todo el catálogo"""
+
+        if not self.records:
+            return None
+        return self.records[random.randrange(len(self.records))]
+
+    def random_by_status(self, status: str) -> Optional[CharacterRecord]:
+        """Devuelve un personaje uniforme entre los que tienen el estado indicado"""
+
+        positions = self.status_positions.get(status.lower())
+        if not positions:
+            return None
+        return self.records[positions[random.randrange(len(positions))]]
+
+    def stats(self) -> dict:
+        """Devuelve un resumen del snapshot"""
+
+        return {
+            "characters": len(self.records),
+            "by_status": {status: len(positions) for status, positions in self.status_positions.items()},
+            "loaded_at": self.loaded_at
+        }
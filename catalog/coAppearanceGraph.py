@@ -0,0 +1,172 @@
+"""
+=============================================================================
+GRAFO DE COAPARICIONES ENTRE PERSONAJES (CSR)
+=============================================================================
+
+Grafo no dirigido en el que dos personajes están conectados si comparten al
+menos un episodio; el peso de la arista es el número de episodios en común.
+Se construye a partir de la relación personaje -> episodios del snapshot y
+se guarda como matriz dispersa en formato CSR (compressed sparse row):
+
+- ids[i]: ID del personaje de la fila i.
+- indptr[i]:indptr[i + 1]: tramo de la fila i en indices/weights.
+- indices: ID de cada vecino; weights: episodios compartidos.
+
+Cada fila se guarda ordenada por peso (y por ID en caso de empate), así que
+los N personajes que más coinciden con uno son un simple corte de su fila.
+
+Cuando la sincronización cambia personajes, updated() solo recalcula las
+filas de los personajes que comparten episodio con los cambiados; el resto
+de filas se copian tal cual del grafo anterior.
+
+Autor: Ing. Daniel Issac Cañas
+Fecha: Enero 2026
+=============================================================================
+"""
+
+from array import array
+from collections import Counter, deque
+from operator import itemgetter
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from catalog.characterSnapshot import CharacterRecord
+
+class CoAppearanceGraph:
+    """Grafo ponderado de personajes que comparten episodios, en formato CSR"""
+
+    def __init__(self, ids: array, indptr: array, indices: array, weights: array,
+                 members: Dict[int, List[int]]):
+        self.ids = ids
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        # Personajes de cada episodio (relación inversa, para recalcular filas)
+        self.members = members
+        self.row_of: Dict[int, int] = {character_id: row for row, character_id in enumerate(ids)}
+
+    @staticmethod
+    def _episode_members(records: Iterable[CharacterRecord]) -> Dict[int, List[int]]:
+        members: Dict[int, List[int]] = {}
+        for record in records:
+            for episode_id in set(record.episode_ids):
+                members.setdefault(episode_id, []).append(record.id)
+        return members
+
+    @staticmethod
+    def _row(record: CharacterRecord, members: Dict[int, List[int]]) -> List[Tuple[int, int]]:
+        """Vecinos de un personaje con su peso, de mayor a menor peso"""
+
+        counts: Counter = Counter()
+        for episode_id in set(record.episode_ids):
+            counts.update(members.get(episode_id, ()))
+        counts.pop(record.id, None)
+        # Por ID y después por peso: la ordenación es estable, así que los empates quedan por ID
+        row = sorted(counts.items())
+        row.sort(key=itemgetter(1), reverse=True)
+        return row
+
+    @classmethod
+    def _split(cls, record: CharacterRecord, members: Dict[int, List[int]]):
+        """Fila de un personaje separada en vecinos y pesos"""
+
+        row = cls._row(record, members)
+        return (array("I", map(itemgetter(0), row)),
+                array("H", map(itemgetter(1), row)))
+
+    @classmethod
+    def _assemble(cls, records: Sequence[CharacterRecord], members: Dict[int, List[int]],
+                  row_for) -> "CoAppearanceGraph":
+        ids = array("I")
+        indptr = array("I", [0])
+        indices = array("I")
+        weights = array("H")
+        for record in records:
+            ids.append(record.id)
+            neighbors, neighbor_weights = row_for(record)
+            indices.extend(neighbors)
+            weights.extend(neighbor_weights)
+            indptr.append(len(indices))
+        return cls(ids, indptr, indices, weights, members)
+
+    @classmethod
+    def build(cls, records: Sequence[CharacterRecord]) -> "CoAppearanceGraph":
+        """Construye el grafo completo a partir de los personajes del snapshot"""
+
+        members = cls._episode_members(records)
+        return cls._assemble(records, members, lambda record: cls._split(record, members))
+
+    def updated(self, records: Sequence[CharacterRecord], changed: Iterable[CharacterRecord]) -> "CoAppearanceGraph":
+        """Grafo nuevo para el snapshot `records` tras cambiar los personajes `changed`
+
+        Solo se recalculan las filas de los personajes cambiados y de los que
+        comparten (o compartían) episodio con ellos.
+        """
+
+        changed = list(changed)
+        changed_ids = {record.id for record in changed}
+        members = self._episode_members(records)
+
+        affected: Set[int] = set(changed_ids)
+        for record in changed:
+            old_row = self.row_of.get(record.id)
+            if old_row is not None:
+                affected.update(self.indices[self.indptr[old_row]:self.indptr[old_row + 1]])
+            for episode_id in set(record.episode_ids):
+                affected.update(members.get(episode_id, ()))
+
+        def row_for(record: CharacterRecord):
+            row = self.row_of.get(record.id)
+            if record.id not in affected and row is not None:
+                start, end = self.indptr[row], self.indptr[row + 1]
+                return self.indices[start:end], self.weights[start:end]
+            return self._split(record, members)
+
+        return self._assemble(records, members, row_for)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.indices) // 2
+
+    def neighbors(self, character_id: int, limit: Optional[int] = None) -> List[Tuple[int, int]]:
+        """Personajes que comparten episodio con uno dado y cuántos, de más a menos"""
+
+        row = self.row_of.get(character_id)
+        if row is None:
+            return []
+        start, end = self.indptr[row], self.indptr[row + 1]
+        if limit is not None:
+            end = min(end, start + limit)
+        return list(zip(self.indices[start:end], self.weights[start:end]))
+
+    def degree(self, character_id: int) -> int:
+        row = self.row_of.get(character_id)
+        return self.indptr[row + 1] - self.indptr[row] if row is not None else 0
+
+    def shortest_path(self, source: int, target: int) -> Optional[List[int]]:
+        """Camino más corto (en saltos) entre dos personajes con BFS; None si no hay conexión"""
+
+        if source not in self.row_of or target not in self.row_of:
+            return None
+        if source == target:
+            return [source]
+
+        indptr, indices, row_of = self.indptr, self.indices, self.row_of
+        parents: Dict[int, int] = {source: source}
+        queue = deque([source])
+        while queue:
+            current = queue.popleft()
+            row = row_of[current]
+            for neighbor in indices[indptr[row]:indptr[row + 1]]:
+                if neighbor in parents:
+                    continue
+                parents[neighbor] = current
+                if neighbor == target:
+                    path = [target]
+                    while path[-1] != source:
+                        path.append(parents[path[-1]])
+                    path.reverse()
+                    return path
+                queue.append(neighbor)
+        return None
@@ -0,0 +1,194 @@
+"""
+=============================================================================
+CATÁLOGO DE PERSONAJES EN COLUMNAS PARA ESTADÍSTICAS AGREGADAS
+=============================================================================
+
+Representación por columnas del snapshot de personajes para calcular
+agregados (conteos por estado × especie × género, orígenes más frecuentes,
+distribución del número de episodios) sin llamar a la API externa:
+
+- Columnas categóricas codificadas por diccionario: cada valor distinto se
+  guarda una sola vez y la columna es un array de códigos enteros.
+- El número de episodios es una columna de enteros.
+- Los filtros se evalúan como máscaras booleanas sobre los códigos y el
+  group-by combina los códigos de varias columnas en una única clave entera
+  que se cuenta de una vez.
+
+Con NumPy las operaciones son vectorizadas; si no está instalado se aplica
+el mismo algoritmo en Python puro (más lento, mismos resultados).
+
+Se construye una vez por snapshot: como el snapshot no cambia nunca (la
+sincronización publica uno nuevo), las columnas tampoco.
+
+Autor: Ing. Daniel Issac Cañas
+Fecha: Enero 2026
+=============================================================================
+"""
+
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from catalog.characterSnapshot import CharacterRecord
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - dependencia opcional
+    np = None
+
+CATEGORICAL_COLUMNS = ("status", "species", "type", "gender", "origin", "location")
+
+class CategoricalColumn:
+    """Columna codificada por diccionario: valores distintos + un código por fila"""
+
+    __slots__ = ("name", "values", "codes", "_lookup")
+
+    def __init__(self, name: str, raw_values: Iterable[str]):
+        self.name = name
+        self.values: List[str] = []
+        codes_by_value: Dict[str, int] = {}
+        codes = array("I")
+        for value in raw_values:
+            code = codes_by_value.get(value)
+            if code is None:
+                code = codes_by_value[value] = len(self.values)
+                self.values.append(value)
+            codes.append(code)
+        self.codes = np.frombuffer(codes, dtype=np.uint32).astype(np.int64) if np is not None else codes
+
+        # Los filtros no distinguen mayúsculas ("alive" == "Alive")
+        self._lookup: Dict[str, List[int]] = {}
+        for code, value in enumerate(self.values):
+            self._lookup.setdefault(value.lower(), []).append(code)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def codes_for(self, value: str) -> List[int]:
+        """Códigos de los valores que coinciden con el filtro (sin distinguir mayúsculas)"""
+
+        return self._lookup.get(value.strip().lower(), [])
+
+class ColumnarCatalog:
+    """Columnas del catálogo de personajes con filtros, group-by e histogramas
+
+    Una selección de filas es una máscara booleana de NumPy o, sin NumPy,
+    una lista de posiciones; None significa todas las filas.
+    """
+
+    def __init__(self, records: Sequence[CharacterRecord]):
+        self.size = len(records)
+        self.columns: Dict[str, CategoricalColumn] = {
+            name: CategoricalColumn(name, (getattr(record, name) for record in records))
+            for name in CATEGORICAL_COLUMNS
+        }
+        episode_counts = array("I", (record.episode_count for record in records))
+        self.episode_counts = (np.frombuffer(episode_counts, dtype=np.uint32).astype(np.int64)
+                               if np is not None else episode_counts)
+
+    def select(self, filters: Dict[str, str]):
+        """Filas que cumplen todos los filtros (columna -> valor)"""
+
+        selection = None
+        for name, value in filters.items():
+            column = self.columns[name]
+            codes = column.codes_for(value)
+            if np is not None:
+                matches = np.isin(column.codes, codes) if len(codes) > 1 else column.codes == (codes[0] if codes else -1)
+                selection = matches if selection is None else selection & matches
+            else:
+                wanted = set(codes)
+                positions = range(self.size) if selection is None else selection
+                selection = [position for position in positions if column.codes[position] in wanted]
+        return selection
+
+    def count(self, selection) -> int:
+        if selection is None:
+            return self.size
+        return int(selection.sum()) if np is not None else len(selection)
+
+    def _selected(self, values, selection):
+        """Valores de una columna restringidos a la selección"""
+
+        if selection is None:
+            return values
+        if np is not None:
+            return values[selection]
+        return [values[position] for position in selection]
+
+    def group_by(self, names: Sequence[str], selection=None) -> List[Tuple[Tuple[str, ...], int]]:
+        """Cuenta las filas por combinación de valores, de mayor a menor
+
+        Los códigos de cada columna se combinan en una sola clave entera
+        (clave = clave * cardinalidad + código) y se cuentan todas a la vez.
+        """
+
+        columns = [self.columns[name] for name in names]
+        if np is not None:
+            keys = np.zeros(self.count(selection), dtype=np.int64)
+            for column in columns:
+                keys = keys * len(column) + self._selected(column.codes, selection)
+            unique_keys, counts = np.unique(keys, return_counts=True)
+            key_counts = zip(unique_keys.tolist(), counts.tolist())
+        else:
+            keys = [0] * self.count(selection)
+            for column in columns:
+                cardinality = len(column)
+                keys = [key * cardinality + code for key, code in zip(keys, self._selected(column.codes, selection))]
+            key_counts = Counter(keys).items()
+
+        groups = []
+        for key, count in key_counts:
+            values = []
+            for column in reversed(columns):
+                key, code = divmod(key, len(column))
+                values.append(column.values[code])
+            groups.append((tuple(reversed(values)), count))
+        groups.sort(key=lambda group: (-group[1], group[0]))
+        return groups
+
+    def value_counts(self, name: str, selection=None, limit: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Valores más frecuentes de una columna"""
+
+        column = self.columns[name]
+        codes = self._selected(column.codes, selection)
+        if np is not None:
+            counts = np.bincount(codes, minlength=len(column)).tolist()
+        else:
+            counts = [0] * len(column)
+            for code in codes:
+                counts[code] += 1
+        ranked = sorted(((column.values[code], count) for code, count in enumerate(counts) if count),
+                        key=lambda item: (-item[1], item[0]))
+        return ranked[:limit] if limit is not None else ranked
+
+    def episode_histogram(self, selection=None, bins: int = 10) -> dict:
+        """Resumen e histograma (tramos enteros de igual anchura) del número de episodios"""
+
+        values = self._selected(self.episode_counts, selection)
+        if len(values) == 0:
+            return {"min": None, "max": None, "mean": None, "median": None, "histogram": []}
+
+        if np is not None:
+            low, high = int(values.min()), int(values.max())
+            mean, median = float(values.mean()), float(np.median(values))
+        else:
+            ordered = sorted(values)
+            low, high = ordered[0], ordered[-1]
+            middle = len(ordered) // 2
+            mean = sum(ordered) / len(ordered)
+            median = float(ordered[middle]) if len(ordered) % 2 else (ordered[middle - 1] + ordered[middle]) / 2
+
+        width = -(-(high - low + 1) // max(1, bins))
+        bucket_count = -(-(high - low + 1) // width)
+        if np is not None:
+            counts = np.bincount((values - low) // width, minlength=bucket_count).tolist()
+        else:
+            counts = [0] * bucket_count
+            for value in values:
+                counts[(value - low) // width] += 1
+
+        histogram = [
+            {"min": low + index * width, "max": min(high, low + (index + 1) * width - 1), "count": count}
+            for index, count in enumerate(counts)
+        ]
+        return {"min": low, "max": high, "mean": round(mean, 3), "median": median, "histogram": histogram}
@@ -0,0 +1,135 @@
+"""
+=============================================================================
+ÍNDICE INVERTIDO DE TRIGRAMAS PARA BÚSQUEDA POR NOMBRE
+=============================================================================
+
+Índice local sobre los nombres del catálogo de personajes:
+
+- Búsqueda por subcadena: se intersectan las listas de trigramas de la
+  consulta y se verifica la subcadena sobre los candidatos.
+- Búsqueda difusa (tolerante a errores): se puntúan los candidatos por la
+  proporción de trigramas de la consulta que comparten con el nombre.
+
+El índice se actualiza de forma incremental: add() solo reindexa los
+personajes nuevos o cuyo nombre cambió.
+
+Autor: Ing. Daniel Issac Cañas
+Fecha: Enero 2026
+=============================================================================
+"""
+
+import unicodedata
+from collections import Counter
+from typing import Dict, Iterable, List, Set, Tuple
+
+def normalize(text: str) -> str:
+    """Pasa a minúsculas y elimina acentos para comparar nombres"""
+
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).strip()
+
+def padded_trigrams(text: str) -> Set[str]:
+    """Trigramas del texto con relleno para marcar inicio y fin de palabra"""
+
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def inner_trigrams(text: str) -> Set[str]:
+    """Trigramas del texto sin relleno (la consulta puede caer a mitad de palabra)"""
+
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+class TrigramIndex:
+    """Índice invertido trigrama -> IDs de personaje"""
+
+    def __init__(self, min_fuzzy_score: float = 0.5):
+        self.min_fuzzy_score = min_fuzzy_score
+        self.names: Dict[int, str] = {}
+        self.grams: Dict[int, Set[str]] = {}
+        self.postings: Dict[str, Set[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def add(self, character_id: int, name: str) -> bool:
+        """Indexa un personaje; devuelve False si ya estaba indexado sin cambios"""
+
+        normalized = normalize(name)
+        if self.names.get(character_id) == normalized:
+            return False
+        if character_id in self.names:
+            self.remove(character_id)
+
+        grams = padded_trigrams(normalized)
+        self.names[character_id] = normalized
+        self.grams[character_id] = grams
+        for gram in grams:
+            self.postings.setdefault(gram, set()).add(character_id)
+        return True
+
+    def add_many(self, items: Iterable[Tuple[int, str]]) -> int:
+        """Indexa varios personajes y devuelve cuántos eran nuevos o cambiaron"""
+
+        return sum(1 for character_id, name in items if self.add(character_id, name))
+
+    def remove(self, character_id: int):
+        """Elimina un personaje del índice"""
+
+        self.names.pop(character_id, None)
+        for gram in self.grams.pop(character_id, ()):
+            ids = self.postings.get(gram)
+            if ids is not None:
+                ids.discard(character_id)
+                if not ids:
+                    del self.postings[gram]
+
+    def search(self, query: str) -> List[int]:
+        """IDs (ordenados) cuyo nombre contiene la consulta"""
+
+        query = normalize(query)
+        if not query:
+            return []
+        if len(query) < 3:
+            return sorted(character_id for character_id, name in self.names.items() if query in name)
+
+        posting_lists = []
+        for gram in inner_trigrams(query):
+            ids = self.postings.get(gram)
+            if not ids:
+                return []
+            posting_lists.append(ids)
+
+        posting_lists.sort(key=len)
+        candidates = set(posting_lists[0])
+        for ids in posting_lists[1:]:
+            candidates &= ids
+            if not candidates:
+                return []
+
+        return sorted(character_id for character_id in candidates if query in self.names[character_id])
+
+    def fuzzy_search(self, query: str) -> List[Tuple[int, float]]:
+        """(ID, puntuación) ordenados por similitud, tolerando errores de escritura"""
+
+        query = normalize(query)
+        if not query:
+            return []
+
+        query_grams = padded_trigrams(query)
+        shared: Counter = Counter()
+        for gram in query_grams:
+            shared.update(self.postings.get(gram, ()))
+
+        scored = []
+        for character_id, common in shared.items():
+            score = common / len(query_grams)
+            if score < self.min_fuzzy_score:
+                continue
+            # Desempate: similitud de Jaccard (prefiere nombres de longitud parecida)
+            jaccard = common / (len(query_grams) + len(self.grams[character_id]) - common)
+            if query in self.names[character_id]:
+                score += 1.0
+            scored.append((character_id, score, jaccard))
+
+        scored.sort(key=lambda item: (-item[1], -item[2], item[0]))
+        return [(character_id, round(min(score, 1.0), 4)) for character_id, score, _ in scored]
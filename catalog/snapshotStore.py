@@ -0,0 +1,121 @@
+"""
+=============================================================================
+SNAPSHOT PERSISTENTE EN DISCO (SQLITE)
+=============================================================================
+
+Guarda en un fichero SQLite local el catálogo de personajes, ubicaciones y
+episodios tal como lo devuelve la API externa, para que un proceso nuevo
+arranque en caliente leyendo el fichero (mapeado en memoria) en lugar de
+volver a descargar todo.
+
+El fichero se escribe en uno temporal y se sustituye con os.replace, de modo
+que otros procesos nunca ven un snapshot a medio escribir. La sincronización
+incremental añade o actualiza filas sobre el fichero existente en una sola
+transacción (upsert).
+
+Autor: Ing. Daniel Issac Cañas
+Fecha: Enero 2026
+=============================================================================
+"""
+
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, List, Optional
+
+RESOURCES = ("characters", "locations", "episodes")
+MMAP_SIZE = 64 * 1024 * 1024
+
+class PersistedCatalog:
+    """Contenido de un snapshot leído de disco"""
+
+    def __init__(self, characters: List[dict], locations: List[dict], episodes: List[dict], saved_at: float):
+        self.characters = characters
+        self.locations = locations
+        self.episodes = episodes
+        self.saved_at = saved_at
+
+    @property
+    def age(self) -> float:
+        """Segundos desde que se guardó el snapshot"""
+        return time.time() - self.saved_at
+
+class SnapshotStore:
+    """Lectura y escritura atómica del catálogo en un fichero SQLite"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def exists(self) -> bool:
+        return bool(self.path) and os.path.exists(self.path)
+
+    def save(self, characters: List[dict], locations: List[dict], episodes: List[dict]) -> float:
+        """Escribe el catálogo completo y devuelve el instante de guardado"""
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        saved_at = time.time()
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        connection = sqlite3.connect(temp_path)
+        try:
+            connection.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            for table in RESOURCES:
+                connection.execute(f"CREATE TABLE {table} (id INTEGER PRIMARY KEY, data TEXT NOT NULL)")
+            data: Dict[str, List[dict]] = {"characters": characters, "locations": locations, "episodes": episodes}
+            for table, rows in data.items():
+                connection.executemany(
+                    f"INSERT OR REPLACE INTO {table} (id, data) VALUES (?, ?)",
+                    ((row["id"], json.dumps(row, separators=(",", ":"))) for row in rows)
+                )
+            connection.execute("INSERT INTO meta VALUES ('saved_at', ?)", (repr(saved_at),))
+            connection.commit()
+        finally:
+            connection.close()
+
+        os.replace(temp_path, self.path)
+        return saved_at
+
+    def upsert(self, characters: List[dict], locations: List[dict], episodes: List[dict]):
+        """Añade o actualiza recursos en el snapshot existente (sincronización incremental)"""
+
+        if not self.exists():
+            return
+        connection = sqlite3.connect(self.path)
+        try:
+            data: Dict[str, List[dict]] = {"characters": characters, "locations": locations, "episodes": episodes}
+            with connection:
+                for table, rows in data.items():
+                    connection.executemany(
+                        f"INSERT OR REPLACE INTO {table} (id, data) VALUES (?, ?)",
+                        ((row["id"], json.dumps(row, separators=(",", ":"))) for row in rows)
+                    )
+                connection.execute("INSERT OR REPLACE INTO meta VALUES ('synced_at', ?)", (repr(time.time()),))
+        finally:
+            connection.close()
+
+    def load(self) -> Optional[PersistedCatalog]:
+        """Lee el catálogo de disco; devuelve None si no existe o está dañado"""
+
+        if not self.exists():
+            return None
+
+        try:
+            connection = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+        except sqlite3.Error:
+            return None
+        try:
+            connection.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+            saved_at = float(connection.execute("SELECT value FROM meta WHERE key = 'saved_at'").fetchone()[0])
+            tables = {
+                table: [json.loads(data) for (data,) in connection.execute(f"SELECT data FROM {table} ORDER BY id")]
+                for table in RESOURCES
+            }
+        except (sqlite3.Error, TypeError, ValueError):
+            return None
+        finally:
+            connection.close()
+
+        return PersistedCatalog(tables["characters"], tables["locations"], tables["episodes"], saved_at)
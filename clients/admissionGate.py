@@ -0,0 +1,164 @@
+"""
+=============================================================================
+CONTROL DE ADMISIÓN HACIA LA API EXTERNA
+=============================================================================
+
+Puerta global por la que pasa cada intento de llamada a rickandmortyapi.com:
+
+- Token bucket: limita el ritmo de llamadas al límite de la API externa,
+  permitiendo ráfagas de hasta `burst` llamadas.
+- Límite de concurrencia: como mucho `max_concurrency` llamadas en curso.
+- Cola acotada con plazo: si hay que esperar, como mucho `max_queue`
+  peticiones esperan y ninguna más de `max_wait` segundos. Si la cola está
+  llena, o se sabe de antemano que la espera por token superará el plazo,
+  la petición se descarta al instante (UpstreamRejectedError) en lugar de
+  acumularse; el cliente responde entonces con la caché o con un 503 rápido.
+
+El token se reserva al entrar (el bucket puede quedar en negativo), así que
+la espera por ritmo se conoce de antemano y el orden de llegada se respeta.
+Los huecos de concurrencia se entregan en orden FIFO.
+
+Autor: Ing. Daniel Issac Cañas
+Fecha: Enero 2026
+=============================================================================
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Deque
+
+class UpstreamRejectedError(Exception):
+    """La petición se descartó por exceso de carga antes de llegar a la API externa"""
+
+    def __init__(self, reason: str):
+        super().__init__(f"Petición descartada por control de admisión ({reason})")
+        self.reason = reason
+
+class TokenBucket:
+    """Token bucket con reserva: reserve() descuenta un token y dice cuánto esperar"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self) -> float:
+        """Reserva un token y devuelve los segundos hasta que esté disponible"""
+
+        self._refill()
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def refund(self):
+        """Devuelve un token reservado que no se llegó a usar"""
+
+        self.tokens = min(self.burst, self.tokens + 1)
+
+    def available(self) -> float:
+        self._refill()
+        return self.tokens
+
+class AdmissionGate:
+    """Limitador de concurrencia y ritmo con cola acotada y descarte por plazo"""
+
+    def __init__(self, max_concurrency: int, rate: float, burst: int, max_queue: int, max_wait: float):
+        self.max_concurrency = max_concurrency
+        self.bucket = TokenBucket(rate, burst) if rate > 0 else None
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.active = 0
+        self.waiting = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.admitted = 0
+        self.delayed = 0
+        self.shed = {"queue_full": 0, "rate": 0, "deadline": 0}
+
+    def _reject(self, reason: str):
+        self.shed[reason] += 1
+        raise UpstreamRejectedError(reason)
+
+    async def acquire(self):
+        """Espera turno (ritmo y concurrencia) o lanza UpstreamRejectedError"""
+
+        slot_busy = self.max_concurrency > 0 and (self.active >= self.max_concurrency or bool(self._waiters))
+        token_wait = self.bucket.reserve() if self.bucket is not None else 0.0
+        if token_wait > self.max_wait:
+            # La espera por ritmo ya supera el plazo: mejor descartar ahora
+            self.bucket.refund()
+            self._reject("rate")
+        if (slot_busy or token_wait > 0) and self.waiting >= self.max_queue:
+            if self.bucket is not None:
+                self.bucket.refund()
+            self._reject("queue_full")
+
+        if not slot_busy and token_wait == 0:
+            self.active += 1
+            self.admitted += 1
+            return
+
+        self.delayed += 1
+        self.waiting += 1
+        deadline = time.monotonic() + self.max_wait
+        try:
+            if token_wait > 0:
+                await asyncio.sleep(token_wait)
+            if self.max_concurrency > 0 and (self.active >= self.max_concurrency or self._waiters):
+                await self._wait_for_slot(deadline)
+            else:
+                self.active += 1
+        except BaseException:
+            # Descartada por plazo o cancelada en la cola: el token reservado no se usó
+            if self.bucket is not None:
+                self.bucket.refund()
+            raise
+        finally:
+            self.waiting -= 1
+        self.admitted += 1
+
+    async def _wait_for_slot(self, deadline: float):
+        """Espera en la cola FIFO a que release() entregue un hueco (ya contado en self.active)"""
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout=max(0.0, deadline - time.monotonic()))
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                # Cancelada justo después de recibir el hueco: se pasa al siguiente
+                self.release()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                self._reject("deadline")
+            raise
+
+    def release(self):
+        """Libera un hueco y se lo entrega al primero de la cola que siga esperando"""
+
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def stats(self) -> dict:
+        """Devuelve la ocupación de la puerta y los descartes por motivo"""
+
+        return {
+            "active": self.active,
+            "max_concurrency": self.max_concurrency,
+            "queued": self.waiting,
+            "max_queue": self.max_queue,
+            "tokens": round(self.bucket.available(), 2) if self.bucket is not None else None,
+            "admitted": self.admitted,
+            "delayed": self.delayed,
+            "shed": dict(self.shed)
+        }
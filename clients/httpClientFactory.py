@@ -0,0 +1,54 @@
+"""
+=============================================================================
+FÁBRICA DEL CLIENTE HTTP COMPARTIDO
+=============================================================================
+
+Construye el único httpx.AsyncClient de la aplicación. Se crea en el
+lifespan de FastAPI y se reutiliza en todas las peticiones, de modo que las
+conexiones TCP/TLS con rickandmortyapi.com se mantienen abiertas (keep-alive)
+en lugar de negociarse de nuevo en cada llamada.
+
+Autor: Ing. Daniel Issac Cañas
+Fecha: Enero 2026
+=============================================================================
+"""
+
+import importlib.util
+import httpx
+from appsettings import settings
+
+def build_timeout() -> httpx.Timeout:
+    """Construye la configuración de timeouts a partir de AppSettings"""
+
+    return httpx.Timeout(
+        connect=settings.CONNECT_TIMEOUT,
+        read=settings.REQUEST_TIMEOUT,
+        write=settings.REQUEST_TIMEOUT,
+        pool=settings.REQUEST_TIMEOUT
+    )
+
+def build_limits() -> httpx.Limits:
+    """Construye los límites del pool de conexiones a partir de AppSettings"""
+
+    return httpx.Limits(
+        max_connections=settings.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY
+    )
+
+def http2_available() -> bool:
+    """Indica si HTTP/2 está activado y el paquete h2 está instalado"""
+
+    return settings.HTTP2_ENABLED and importlib.util.find_spec("h2") is not None
+
+def create_http_client() -> httpx.AsyncClient:
+    """Crea el cliente HTTP compartido con pool, keep-alive y HTTP/2 opcional"""
+
+    if settings.HTTP2_ENABLED and not http2_available():
+        print("⚠️  HTTP2_ENABLED=true pero falta el paquete h2 (pip install httpx[http2]); se usa HTTP/1.1")
+
+    return httpx.AsyncClient(
+        timeout=build_timeout(),
+        limits=build_limits(),
+        http2=http2_available()
+    )
@@ -10,41 +10,426 @@ Fecha: Enero 2026
 =============================================================================
 """
 
+import asyncio
+import random
+import time
+from collections import deque
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Union
 import httpx
 from fastapi import HTTPException
 from appsettings import settings
+from cache.responseCache import ResponseCache
+from cache.sharedCache import SharedResponseCache
+from clients.admissionGate import AdmissionGate, UpstreamRejectedError
+from clients.singleFlight import SingleFlight
+from clients.upstreamResilience import CircuitBreaker, ResilientUpstream, UpstreamUnavailableError
+from metrics import serverTiming
+from metrics.metricsRegistry import SIZE_BUCKETS, metrics
+
+def upstream_resource(url: str) -> str:
+    """Recurso de la API externa al que va una URL (character, location...), para etiquetar métricas"""
+
+    path = url[len(settings.RICK_MORTY_BASE_URL):] if url.startswith(settings.RICK_MORTY_BASE_URL) else url
+    return path.strip("/").split("/", 1)[0] or "root"
 
 class RickMortyClient:
     """Cliente HTTP para Rick and Morty API"""
 
+    def __init__(self, cache: Optional[Union[ResponseCache, SharedResponseCache]] = None):
+        if cache is None and settings.CACHE_ENABLED:
+            if settings.CACHE_BACKEND == "shared":
+                # Compartida por todos los workers de la máquina
+                cache = SharedResponseCache(
+                    path=settings.SHARED_CACHE_PATH,
+                    max_entries=settings.CACHE_MAX_ENTRIES,
+                    max_bytes=settings.CACHE_MAX_BYTES,
+                    stale_ttl=settings.CACHE_STALE_TTL
+                )
+            else:
+                cache = ResponseCache(
+                    max_entries=settings.CACHE_MAX_ENTRIES,
+                    max_bytes=settings.CACHE_MAX_BYTES,
+                    stale_ttl=settings.CACHE_STALE_TTL
+                )
+        self.cache = cache
+        self.flight = SingleFlight()
+        self.upstream = ResilientUpstream(
+            max_retries=settings.MAX_RETRIES,
+            backoff_base=settings.RETRY_BACKOFF_BASE,
+            backoff_max=settings.RETRY_BACKOFF_MAX,
+            breaker=CircuitBreaker(
+                failure_threshold=settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+                reset_timeout=settings.CIRCUIT_BREAKER_RESET_TIMEOUT
+            ),
+            hedge_enabled=settings.HEDGE_ENABLED,
+            hedge_percentile=settings.HEDGE_PERCENTILE,
+            hedge_min_delay=settings.HEDGE_MIN_DELAY,
+            hedge_min_samples=settings.HEDGE_MIN_SAMPLES,
+            gate=AdmissionGate(
+                max_concurrency=settings.UPSTREAM_MAX_CONCURRENCY,
+                rate=settings.UPSTREAM_RATE_LIMIT,
+                burst=settings.UPSTREAM_RATE_BURST,
+                max_queue=settings.UPSTREAM_QUEUE_SIZE,
+                max_wait=settings.UPSTREAM_QUEUE_TIMEOUT
+            )
+        )
+        self._refreshing: dict = {}
+        # Último info.count conocido de cada listado (URL del recurso -> total)
+        self.resource_counts: Dict[str, int] = {}
+        self._register_metrics()
+
+    def _register_metrics(self):
+        """Crea las métricas de las llamadas a la API externa y expone las de la caché"""
+
+        self.upstream_duration = metrics.histogram(
+            "rickmorty_upstream_request_duration_seconds",
+            "Duración de las llamadas a la API externa, reintentos incluidos", ("resource", "outcome"))
+        self.upstream_size = metrics.histogram(
+            "rickmorty_upstream_response_size_bytes", "Tamaño de las respuestas de la API externa",
+            ("resource",), SIZE_BUCKETS)
+        self.upstream_in_flight = metrics.gauge(
+            "rickmorty_upstream_requests_in_flight", "Llamadas a la API externa en curso")
+        self.pool_wait = metrics.histogram(
+            "rickmorty_upstream_pool_wait_seconds", "Espera por una conexión libre del pool HTTP")
+        self.upstream.pool_wait_observer = self._observe_pool_wait
+
+        def cache_stat(name: str):
+            return lambda: self.cache.stats()[name] if self.cache is not None else None
+
+        metrics.callback("rickmorty_cache_lookups_total", "Consultas a la caché de respuestas por resultado",
+                         lambda: {("hit",): self.cache.hits, ("stale_hit",): self.cache.stale_hits,
+                                  ("miss",): self.cache.misses} if self.cache is not None else None,
+                         type="counter", label_names=("result",))
+        metrics.callback("rickmorty_cache_hit_ratio", "Proporción de aciertos de la caché de respuestas",
+                         cache_stat("hit_ratio"))
+        metrics.callback("rickmorty_cache_entries", "Entradas en la caché de respuestas", cache_stat("entries"))
+        metrics.callback("rickmorty_cache_bytes", "Bytes ocupados por la caché de respuestas", cache_stat("bytes"))
+        metrics.callback("rickmorty_cache_evictions_total", "Entradas desalojadas de la caché",
+                         cache_stat("evictions"), type="counter")
+        metrics.callback("rickmorty_single_flight_coalesced_total",
+                         "Peticiones que se unieron a una llamada idéntica en curso",
+                         lambda: self.flight.coalesced, type="counter")
+        metrics.callback("rickmorty_upstream_retries_total", "Reintentos contra la API externa",
+                         lambda: self.upstream.retries, type="counter")
+        metrics.callback("rickmorty_upstream_hedged_total", "Peticiones de cobertura lanzadas",
+                         lambda: self.upstream.hedged, type="counter")
+        metrics.callback("rickmorty_upstream_circuit_open", "1 si el circuit breaker está abierto",
+                         lambda: int(self.upstream.breaker.state == CircuitBreaker.OPEN))
+        gate = self.upstream.gate
+        metrics.callback("rickmorty_upstream_queue_depth", "Llamadas esperando turno en el control de admisión",
+                         lambda: gate.waiting)
+        metrics.callback("rickmorty_upstream_admitted_active", "Llamadas admitidas en curso",
+                         lambda: gate.active)
+        metrics.callback("rickmorty_upstream_shed_total", "Llamadas descartadas por el control de admisión",
+                         lambda: {(reason,): count for reason, count in gate.shed.items()},
+                         type="counter", label_names=("reason",))
+
+    def _observe_pool_wait(self, seconds: float):
+        self.pool_wait.observe(seconds)
+        serverTiming.record("pool", seconds)
+
+    async def _fetch_json(self, http_client: httpx.AsyncClient, url: str, params: Optional[dict],
+                          error_detail: str):
+        """Hace la petición GET y devuelve el JSON junto con su tamaño en bytes"""
+
+        response = await self._upstream_get(http_client, url, params)
+
+        if response.status_code != 200:
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=error_detail
+            )
+
+        return response.json(), len(response.content)
+
+    async def _upstream_get(self, http_client: httpx.AsyncClient, url: str,
+                            params: Optional[dict] = None) -> httpx.Response:
+        """GET a la API externa a través de la capa de resiliencia"""
+
+        if settings.OFFLINE_MODE:
+            raise HTTPException(
+                status_code=503,
+                detail="Modo offline: solo se sirven datos del snapshot local"
+            )
+
+        resource = upstream_resource(url)
+        start = time.perf_counter()
+        outcome = "error"
+        self.upstream_in_flight.inc()
+        try:
+            response = await self.upstream.get(http_client, url, params)
+            outcome = f"{response.status_code // 100}xx"
+            self.upstream_size.labels(resource).observe(len(response.content))
+            return response
+        except UpstreamUnavailableError:
+            outcome = "rejected"
+            raise HTTPException(
+                status_code=503,
+                detail="La API de Rick and Morty no está disponible temporalmente. Intenta de nuevo."
+            )
+        except UpstreamRejectedError:
+            outcome = "shed"
+            raise HTTPException(
+                status_code=503,
+                detail="Demasiadas peticiones a la API de Rick and Morty en este momento. Intenta de nuevo.",
+                headers={"Retry-After": "1"}
+            )
+        finally:
+            elapsed = time.perf_counter() - start
+            self.upstream_in_flight.dec()
+            self.upstream_duration.labels(resource, outcome).observe(elapsed)
+            serverTiming.record("upstream", elapsed)
+
+    async def open_avatar(self, url: str, http_client: httpx.AsyncClient,
+                          headers: Optional[dict] = None) -> httpx.Response:
+        """Abre en streaming la descarga de un avatar (200) o su revalidación (304)
+
+        Pasa por el control de admisión, pero sin reintentos ni hedging: el
+        cuerpo se reenvía al cliente según llega. Quien llama debe cerrar la
+        respuesta (aclose) al terminar.
+        """
+
+        if settings.OFFLINE_MODE:
+            raise HTTPException(
+                status_code=503,
+                detail="Modo offline: solo se sirven datos del snapshot local"
+            )
+
+        gate = self.upstream.gate
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            await gate.acquire()
+        except UpstreamRejectedError:
+            self.upstream_duration.labels("avatar", "shed").observe(time.perf_counter() - start)
+            raise HTTPException(
+                status_code=503,
+                detail="Demasiadas peticiones a la API de Rick and Morty en este momento. Intenta de nuevo.",
+                headers={"Retry-After": "1"}
+            )
+        try:
+            request = http_client.build_request("GET", url, headers=headers)
+            response = await http_client.send(request, stream=True)
+            outcome = f"{response.status_code // 100}xx"
+        except httpx.ConnectTimeout:
+            raise HTTPException(
+                status_code=504,
+                detail="Timeout al conectar con la API de Rick and Morty. Intenta de nuevo."
+            )
+        except httpx.RequestError as e:
+            raise HTTPException(
+                status_code=503,
+                detail=f"Error de conexión: {str(e)}"
+            )
+        finally:
+            gate.release()
+            self.upstream_duration.labels("avatar", outcome).observe(time.perf_counter() - start)
+
+        if response.status_code not in (200, 304):
+            await response.aclose()
+            raise HTTPException(
+                status_code=404 if response.status_code == 404 else 502,
+                detail="No se encontró el avatar" if response.status_code == 404 else "Error al obtener el avatar"
+            )
+        return response
+
+    async def _fetch_and_store(self, key: str, http_client: httpx.AsyncClient, url: str,
+                               params: Optional[dict], ttl: float, error_detail: str):
+        """Descarga una respuesta y la guarda en la caché (si está activada)"""
+
+        data, size = await self._fetch_json(http_client, url, params, error_detail)
+        if self.cache is not None:
+            self.cache.set(key, data, ttl, size)
+        return data
+
+    async def _get_json(self, http_client: httpx.AsyncClient, url: str, params: Optional[dict],
+                        ttl: float, error_detail: str):
+        """GET con caché: sirve entradas frescas, y las caducadas mientras se refrescan"""
+
+        key = ResponseCache.make_key(url, params)
+        if self.cache is not None:
+            entry = self.cache.get(key)
+            if entry is not None:
+                if entry.is_stale():
+                    self._schedule_refresh(key, http_client, url, params, ttl, error_detail)
+                return entry.value
+
+        # Las peticiones concurrentes idénticas comparten una sola llamada
+        try:
+            return await self.flight.do(
+                key,
+                lambda: self._fetch_and_store(key, http_client, url, params, ttl, error_detail)
+            )
+        except (HTTPException, httpx.RequestError) as e:
+            # Si la API externa falla, se sirve la última copia conocida aunque haya caducado
+            if isinstance(e, HTTPException) and e.status_code < 500:
+                raise
+            entry = self.cache.get(key, allow_expired=True) if self.cache is not None else None
+            if entry is None:
+                raise
+            return entry.value
+
+    def _schedule_refresh(self, key: str, http_client: httpx.AsyncClient, url: str,
+                          params: Optional[dict], ttl: float, error_detail: str):
+        """Lanza (una sola vez por clave) el refresco en segundo plano de una entrada"""
+
+        if key in self._refreshing:
+            return
+
+        async def refresh():
+            try:
+                await self.flight.do(
+                    key,
+                    lambda: self._fetch_and_store(key, http_client, url, params, ttl, error_detail)
+                )
+            except Exception:
+                # Si el refresco falla se sigue sirviendo el valor caducado
+                pass
+            finally:
+                self._refreshing.pop(key, None)
+
+        self._refreshing[key] = asyncio.create_task(refresh())
+
+    async def aclose(self):
+        """Cancela los refrescos y llamadas pendientes (se llama al apagar la aplicación)"""
+
+        tasks = list(self._refreshing.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._refreshing.clear()
+        await self.flight.cancel_all()
+        if isinstance(self.cache, SharedResponseCache):
+            self.cache.close()
+
+    def upstream_stats(self) -> dict:
+        """Devuelve los contadores de reintentos, hedging y del circuit breaker"""
+
+        return self.upstream.stats()
+
+    def cache_stats(self) -> dict:
+        """Devuelve los contadores de la caché de respuestas y de la coalescencia"""
+
+        if self.cache is None:
+            return {"enabled": False, "single_flight": self.flight.stats()}
+        return {
+            "enabled": True,
+            "refreshing": len(self._refreshing),
+            **self.cache.stats(),
+            "single_flight": self.flight.stats()
+        }
+
+    async def get_all_resources(self, url: str, http_client: httpx.AsyncClient, concurrency: int) -> list:
+        """Descarga todas las páginas de un recurso (personajes, ubicaciones o episodios) en paralelo"""
+
+        error_detail = "Error al descargar el catálogo de Rick and Morty"
+        first_page, _ = await self._fetch_json(http_client, url, {"page": 1}, error_detail)
+        pages = first_page["info"]["pages"]
+        self.resource_counts[url] = first_page["info"]["count"]
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def fetch_page(page: int) -> list:
+            async with semaphore:
+                data, _ = await self._fetch_json(http_client, url, {"page": page}, error_detail)
+                return data["results"]
+
+        remaining = await asyncio.gather(*(fetch_page(page) for page in range(2, pages + 1)))
+
+        resources = list(first_page["results"])
+        for results in remaining:
+            resources.extend(results)
+        return resources
+
+    async def get_page(self, url: str, page: int, http_client: httpx.AsyncClient) -> dict:
+        """Obtiene una página de un recurso sin pasar por la caché (exportación)"""
+
+        try:
+            data, _ = await self._fetch_json(
+                http_client, url, {"page": page}, "Error al exportar el catálogo de Rick and Morty"
+            )
+            return data
+
+        except httpx.ConnectTimeout:
+            raise HTTPException(
+                status_code=504,
+                detail="Timeout al conectar con la API de Rick and Morty. Intenta de nuevo."
+            )
+        except httpx.RequestError as e:
+            raise HTTPException(
+                status_code=503,
+                detail=f"Error de conexión: {str(e)}"
+            )
+
+    async def iter_resource_pages(self, url: str, pages: Iterable[int], http_client: httpx.AsyncClient,
+                                  concurrency: int) -> AsyncIterator[list]:
+        """Descarga páginas de un recurso en paralelo y las entrega en orden de página
+
+        Hay como mucho `concurrency` páginas en vuelo: en cuanto se consume la
+        más antigua se lanza la siguiente, así que la memoria no crece con el
+        tamaño del catálogo.
+        """
+
+        error_detail = "Error al exportar el catálogo de Rick and Morty"
+        page_iter = iter(pages)
+        window: deque = deque()
+
+        def launch():
+            while len(window) < max(1, concurrency):
+                page = next(page_iter, None)
+                if page is None:
+                    return
+                window.append(asyncio.create_task(self._fetch_json(http_client, url, {"page": page}, error_detail)))
+
+        launch()
+        try:
+            while window:
+                data, _ = await window.popleft()
+                launch()
+                yield data.get("results", [])
+        finally:
+            for task in window:
+                task.cancel()
+
+    async def get_resource_count(self, url: str, http_client: httpx.AsyncClient, fresh: bool = False) -> int:
+        """Obtiene el total (info.count) de un recurso a partir de su primera página
+
+        Con fresh=True se consulta la API sin pasar por la caché (sincronización).
+        """
+
+        error_detail = "Error al consultar el total de recursos de Rick and Morty"
+        if fresh:
+            data, _ = await self._fetch_json(http_client, url, {"page": 1}, error_detail)
+        else:
+            data = await self._get_json(http_client, url, {"page": 1}, settings.CACHE_TTL_STATUS, error_detail)
+        count = data["info"]["count"]
+        self.resource_counts[url] = count
+        return count
+
+    async def get_all_characters(self, http_client: httpx.AsyncClient, concurrency: int) -> list:
+        """Descarga el catálogo completo de personajes paginando en paralelo"""
+
+        return await self.get_all_resources(settings.RICK_MORTY_CHARACTER_URL, http_client, concurrency)
+
     async def get_random_character(self, http_client: httpx.AsyncClient) -> dict:
         """Obtiene un personaje aleatorio de Rick and Morty"""
-        
+
         try:
-            # Obtener un personaje aleatorio (hay 826 personajes)
-            import random
-            character_id = random.randint(1, 826)
-            
-            timeout_config = httpx.Timeout(
-                connect=settings.CONNECT_TIMEOUT,
-                read=settings.REQUEST_TIMEOUT,
-                write=settings.REQUEST_TIMEOUT,
-                pool=settings.REQUEST_TIMEOUT
-            )
-            
-            response = await http_client.get(
+            # El total de personajes se toma de la API (info.count), no de un valor fijo
+            character_count = self.resource_counts.get(settings.RICK_MORTY_CHARACTER_URL)
+            if character_count is None:
+                character_count = await self.get_resource_count(settings.RICK_MORTY_CHARACTER_URL, http_client)
+            character_id = random.randint(1, character_count)
+
+            return await self._get_json(
+                http_client,
                 f"{settings.RICK_MORTY_CHARACTER_URL}/{character_id}",
-                timeout=timeout_config
+                None,
+                settings.CACHE_TTL_CHARACTER,
+                "Error al obtener personaje de Rick and Morty"
             )
 
-            if response.status_code != 200:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail="Error al obtener personaje de Rick and Morty"
-                )
-
-            return response.json()
-        
+        except HTTPException:
+            raise
         except httpx.ConnectTimeout:
             raise HTTPException(
                 status_code=504,
@@ -61,39 +446,136 @@ class RickMortyClient:
                 detail=f"Error inesperado: {str(e)}"
             )
 
-    async def get_character_by_status(self, status: str, http_client: httpx.AsyncClient) -> dict:
-        """Obtiene personajes filtrados por estado (alive, dead, unknown)"""
-        
-        try:
-            timeout_config = httpx.Timeout(
-                connect=settings.CONNECT_TIMEOUT,
-                read=settings.REQUEST_TIMEOUT,
-                write=settings.REQUEST_TIMEOUT,
-                pool=settings.REQUEST_TIMEOUT
-            )
-            
-            response = await http_client.get(
-                settings.RICK_MORTY_CHARACTER_URL,
-                params={"status": status},
-                timeout=timeout_config
-            )
+    async def _get_many(self, resource_url: str, ids: List[int], http_client: httpx.AsyncClient,
+                        chunk_size: int, concurrency: int, ttl: float, error_detail: str,
+                        fresh: bool = False) -> Dict[int, dict]:
+        """Obtiene varios recursos por ID usando la forma multi-ID de la API (/recurso/1,2,3)
 
+        Los IDs presentes en la caché de entidades se sirven desde memoria; el
+        resto se piden en bloques de `chunk_size` IDs, con hasta `concurrency`
+        bloques en paralelo. Los IDs que no existen no aparecen en el resultado.
+        Con fresh=True se piden todos a la API (y se actualiza la caché).
+        """
+
+        found: Dict[int, dict] = {}
+        missing: List[int] = []
+        for resource_id in dict.fromkeys(ids):
+            entry = self.cache.get(f"{resource_url}/{resource_id}") if self.cache is not None and not fresh else None
+            if entry is not None:
+                found[resource_id] = entry.value
+            else:
+                missing.append(resource_id)
+
+        chunk_size = max(1, chunk_size)
+        chunks = [missing[i:i + chunk_size] for i in range(0, len(missing), chunk_size)]
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def fetch_chunk(chunk: List[int]) -> list:
+            url = f"{resource_url}/{','.join(map(str, chunk))}"
+            async with semaphore:
+                response = await self._upstream_get(http_client, url)
+
+            if response.status_code == 404:
+                return []
             if response.status_code != 200:
                 raise HTTPException(
                     status_code=response.status_code,
-                    detail=f"Error al obtener personajes con estado {status}"
+                    detail=error_detail
                 )
 
             data = response.json()
-            if data.get("results"):
-                import random
-                return random.choice(data["results"])
-            else:
+            # Con un único ID la API devuelve el objeto en lugar de una lista
+            resources = data if isinstance(data, list) else [data]
+            if self.cache is not None:
+                size = len(response.content) // max(1, len(resources))
+                for resource_data in resources:
+                    self.cache.set(f"{resource_url}/{resource_data['id']}", resource_data, ttl, size)
+            return resources
+
+        try:
+            # Espacio de claves propio: "/character/5" ya lo usa _get_json (que devuelve
+            # un dict, no una lista) y no deben compartir llamada
+            results = await asyncio.gather(*(
+                self.flight.do(f"many:{resource_url}/{','.join(map(str, chunk))}", lambda chunk=chunk: fetch_chunk(chunk))
+                for chunk in chunks
+            ))
+        except httpx.ConnectTimeout:
+            raise HTTPException(
+                status_code=504,
+                detail="Timeout al conectar con la API de Rick and Morty. Intenta de nuevo."
+            )
+        except httpx.RequestError as e:
+            raise HTTPException(
+                status_code=503,
+                detail=f"Error de conexión: {str(e)}"
+            )
+
+        for resources in results:
+            for resource_data in resources:
+                found[resource_data["id"]] = resource_data
+        return found
+
+    async def get_characters_by_ids(self, ids: List[int], http_client: httpx.AsyncClient,
+                                    chunk_size: int, concurrency: int, fresh: bool = False) -> Dict[int, dict]:
+        """Obtiene varios personajes por ID (/character/1,2,3)"""
+
+        return await self._get_many(
+            settings.RICK_MORTY_CHARACTER_URL, ids, http_client, chunk_size, concurrency,
+            settings.CACHE_TTL_CHARACTER, "Error al obtener personajes por ID", fresh
+        )
+
+    async def get_locations_by_ids(self, ids: List[int], http_client: httpx.AsyncClient,
+                                   chunk_size: int, concurrency: int, fresh: bool = False) -> Dict[int, dict]:
+        """Obtiene varias ubicaciones por ID (/location/1,2,3)"""
+
+        return await self._get_many(
+            settings.RICK_MORTY_LOCATION_URL, ids, http_client, chunk_size, concurrency,
+            settings.CACHE_TTL_RESOURCE, "Error al obtener ubicaciones por ID", fresh
+        )
+
+    async def get_episodes_by_ids(self, ids: List[int], http_client: httpx.AsyncClient,
+                                  chunk_size: int, concurrency: int, fresh: bool = False) -> Dict[int, dict]:
+        """Obtiene varios episodios por ID (/episode/1,2,3)"""
+
+        return await self._get_many(
+            settings.RICK_MORTY_EPISODE_URL, ids, http_client, chunk_size, concurrency,
+            settings.CACHE_TTL_RESOURCE, "Error al obtener episodios por ID", fresh
+        )
+
+    async def get_character_by_status(self, status: str, http_client: httpx.AsyncClient) -> dict:
+        """Obtiene personajes filtrados por estado (alive, dead, unknown)"""
+
+        try:
+            data = await self._get_json(
+                http_client,
+                settings.RICK_MORTY_CHARACTER_URL,
+                {"status": status},
+                settings.CACHE_TTL_STATUS,
+                f"Error al obtener personajes con estado {status}"
+            )
+
+            results = data.get("results")
+            if not results:
                 raise HTTPException(
                     status_code=404,
                     detail=f"No se encontraron personajes con estado {status}"
                 )
-        
+
+            # Muestreo uniforme sobre todas las páginas, no solo sobre la primera
+            index = random.randrange(data.get("info", {}).get("count", len(results)))
+            page_size = len(results)
+            page = index // page_size + 1
+            if page > 1:
+                data = await self._get_json(
+                    http_client,
+                    settings.RICK_MORTY_CHARACTER_URL,
+                    {"status": status, "page": page},
+                    settings.CACHE_TTL_STATUS,
+                    f"Error al obtener personajes con estado {status}"
+                )
+                results = data.get("results") or results
+            return results[min(index % page_size, len(results) - 1)]
+
         except httpx.ConnectTimeout:
             raise HTTPException(
                 status_code=504,
@@ -107,41 +589,32 @@ class RickMortyClient:
 
     async def get_character_statuses(self, http_client: httpx.AsyncClient) -> list:
         """Obtiene las categorías disponibles (estados de personajes)"""
-        
+
         # Rick and Morty API tiene estados fijos
         return ["alive", "dead", "unknown"]
 
-    async def search_characters(self, query: str, http_client: httpx.AsyncClient) -> dict:
+    async def search_characters(self, query: str, http_client: httpx.AsyncClient, page: int = 1) -> dict:
         """Busca personajes que contengan una palabra específica en el nombre"""
-        
+
         if not query or len(query.strip()) < 2:
             raise HTTPException(
                 status_code=400,
                 detail="La búsqueda debe tener al menos 2 caracteres"
             )
-        
+
         try:
-            timeout_config = httpx.Timeout(
-                connect=settings.CONNECT_TIMEOUT,
-                read=settings.REQUEST_TIMEOUT,
-                write=settings.REQUEST_TIMEOUT,
-                pool=settings.REQUEST_TIMEOUT
-            )
-            
-            response = await http_client.get(
+            params = {"name": query.strip()}
+            if page > 1:
+                params["page"] = page
+
+            return await self._get_json(
+                http_client,
                 settings.RICK_MORTY_CHARACTER_URL,
-                params={"name": query.strip()},
-                timeout=timeout_config
+                params,
+                settings.CACHE_TTL_SEARCH,
+                "Error al buscar personajes"
             )
 
-            if response.status_code != 200:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail="Error al buscar personajes"
-                )
-
-            return response.json()
-        
         except httpx.ConnectTimeout:
             raise HTTPException(
                 status_code=504,
@@ -151,4 +624,34 @@ class RickMortyClient:
             raise HTTPException(
                 status_code=503,
                 detail=f"Error de conexión: {str(e)}"
-            )
\ No newline at end of file
+            )
+
+    async def iter_search_pages(self, query: str, pages: Iterable[int], http_client: httpx.AsyncClient,
+                                concurrency: int) -> AsyncIterator[list]:
+        """Descarga páginas de una búsqueda en paralelo y las entrega según llegan
+
+        Como mucho hay `concurrency` páginas en vuelo o pendientes de consumir,
+        así que la memoria no crece con el número de resultados.
+        """
+
+        page_iter = iter(pages)
+        pending = set()
+
+        def launch():
+            while len(pending) < max(1, concurrency):
+                page = next(page_iter, None)
+                if page is None:
+                    return
+                pending.add(asyncio.create_task(self.search_characters(query, http_client, page)))
+
+        launch()
+        try:
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    pending.discard(task)
+                    yield task.result().get("results", [])
+                launch()
+        finally:
+            for task in pending:
+                task.cancel()
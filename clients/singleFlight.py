@@ -0,0 +1,71 @@
+"""
+=============================================================================
+COALESCENCIA DE PETICIONES (SINGLE-FLIGHT)
+=============================================================================
+
+Garantiza que para una misma clave solo haya una llamada en curso a la API
+externa. Las peticiones concurrentes idénticas esperan a esa única llamada y
+comparten su resultado o su excepción.
+
+La llamada compartida se ejecuta en su propia tarea y cada espera está
+protegida con asyncio.shield: si un cliente se desconecta, solo se cancela
+su espera, nunca la petición que comparten los demás.
+
+Autor: Ing. Daniel Issac Cañas
+Fecha: Enero 2026
+=============================================================================
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+class SingleFlight:
+    """Agrupa llamadas concurrentes con la misma clave en una sola"""
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Ejecuta factory() una sola vez por clave y comparte el resultado"""
+
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.create_task(factory())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Marcar la excepción como recuperada aunque todos los que esperaban
+        # se hayan cancelado, para no ensuciar el log de asyncio
+        if not task.cancelled():
+            task.exception()
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    async def cancel_all(self):
+        """Cancela las llamadas en curso (se usa al apagar la aplicación)"""
+
+        tasks = list(self._calls.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        """Devuelve los contadores de coalescencia"""
+
+        return {
+            "in_flight": self.in_flight,
+            "leaders": self.leaders,
+            "coalesced": self.coalesced
+        }
@@ -0,0 +1,249 @@
+"""
+=============================================================================
+CAPA DE RESILIENCIA PARA LA API EXTERNA
+=============================================================================
+
+Envuelve todas las peticiones GET (idempotentes) a rickandmortyapi.com con:
+
+- Reintentos acotados con backoff exponencial y jitter completo.
+- Circuit breaker: tras varios fallos seguidos deja de llamar a la API
+  durante un tiempo y falla rápido (el cliente sirve la caché si puede).
+  Pasado ese tiempo deja pasar una única petición de prueba.
+- Peticiones de cobertura (hedging) opcionales: si la respuesta tarda más
+  que el p95 reciente se lanza un segundo intento y gana el primero.
+- Control de admisión opcional (ver clients/admissionGate.py): cada intento
+  pasa por la puerta global de concurrencia y ritmo; si se descarta no se
+  reintenta.
+
+Autor: Ing. Daniel Issac Cañas
+Fecha: Enero 2026
+=============================================================================
+"""
+
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Callable, Optional
+import httpx
+from clients.admissionGate import AdmissionGate
+from clients.httpClientFactory import build_timeout
+
+# Respuestas de la API que merece la pena reintentar
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+class UpstreamUnavailableError(Exception):
+    """La API externa se considera caída (circuito abierto)"""
+
+class CircuitBreaker:
+    """Circuit breaker clásico: cerrado -> abierto -> semiabierto"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._state = self.CLOSED
+        # En semiabierto solo pasa una petición de prueba a la vez
+        self._probe_in_flight = False
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+        return self._state
+
+    def allow(self) -> bool:
+        """Indica si se puede llamar a la API (en semiabierto solo se deja pasar una prueba)"""
+
+        state = self.state
+        if state == self.OPEN or (state == self.HALF_OPEN and self._probe_in_flight):
+            self.rejected += 1
+            return False
+        if state == self.HALF_OPEN:
+            self._probe_in_flight = True
+        return True
+
+    def end_probe(self):
+        """Libera la prueba en curso (también si terminó sin resultado, p. ej. cancelada)"""
+
+        self._probe_in_flight = False
+
+    def record_success(self):
+        self.consecutive_failures = 0
+        self._state = self.CLOSED
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self._state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self._state = self.OPEN
+            self.opened_at = time.monotonic()
+
+class LatencyTracker:
+    """Ventana deslizante de latencias recientes para calcular percentiles"""
+
+    def __init__(self, window: int = 200):
+        self.samples = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+class ResilientUpstream:
+    """Ejecuta GETs contra la API externa con reintentos, circuit breaker y hedging"""
+
+    def __init__(self, max_retries: int, backoff_base: float, backoff_max: float,
+                 breaker: CircuitBreaker, hedge_enabled: bool = False, hedge_percentile: float = 0.95,
+                 hedge_min_delay: float = 0.05, hedge_min_samples: int = 20,
+                 gate: Optional[AdmissionGate] = None):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker
+        self.hedge_enabled = hedge_enabled
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_min_samples = hedge_min_samples
+        self.gate = gate
+        self.latency = LatencyTracker()
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        # Si se asigna, recibe los segundos que cada intento espera por una
+        # conexión libre del pool (se mide con las trazas de httpcore)
+        self.pool_wait_observer: Optional[Callable[[float], None]] = None
+
+    def backoff(self, attempt: int) -> float:
+        """Backoff exponencial con jitter completo (AWS "full jitter")"""
+
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    async def get(self, http_client: httpx.AsyncClient, url: str, params: Optional[dict] = None) -> httpx.Response:
+        """GET resiliente; devuelve la última respuesta o relanza el último error de red"""
+
+        probe = self.breaker.state == CircuitBreaker.HALF_OPEN
+        if not self.breaker.allow():
+            raise UpstreamUnavailableError("Circuito abierto: la API de Rick and Morty no responde")
+
+        self.calls += 1
+        try:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    response = await self._send(http_client, url, params)
+                except httpx.RequestError:
+                    if attempt == self.max_retries:
+                        self._record_failure()
+                        raise
+                else:
+                    if response.status_code not in RETRYABLE_STATUS_CODES:
+                        self.breaker.record_success()
+                        return response
+                    if attempt == self.max_retries:
+                        self._record_failure()
+                        return response
+
+                self.retries += 1
+                await asyncio.sleep(self.backoff(attempt))
+        finally:
+            if probe:
+                self.breaker.end_probe()
+
+    def _record_failure(self):
+        self.failures += 1
+        self.breaker.record_failure()
+
+    def _pool_wait_trace(self, start: float):
+        """Traza de httpcore que mide la espera hasta conectar o enviar la petición"""
+
+        observer = self.pool_wait_observer
+        measured = False
+
+        async def trace(event_name: str, info: dict):
+            nonlocal measured
+            if not measured and (event_name == "connection.connect_tcp.started"
+                                 or event_name.endswith("send_request_headers.started")):
+                measured = True
+                observer(time.monotonic() - start)
+
+        return trace
+
+    async def _attempt(self, http_client: httpx.AsyncClient, url: str, params: Optional[dict]) -> httpx.Response:
+        if self.gate is not None:
+            await self.gate.acquire()
+        try:
+            start = time.monotonic()
+            extensions = {"trace": self._pool_wait_trace(start)} if self.pool_wait_observer is not None else None
+            response = await http_client.get(url, params=params, timeout=build_timeout(), extensions=extensions)
+        finally:
+            if self.gate is not None:
+                self.gate.release()
+        if response.status_code not in RETRYABLE_STATUS_CODES:
+            self.latency.record(time.monotonic() - start)
+        return response
+
+    def _hedge_delay(self) -> Optional[float]:
+        if not self.hedge_enabled or len(self.latency.samples) < self.hedge_min_samples:
+            return None
+        return max(self.hedge_min_delay, self.latency.percentile(self.hedge_percentile))
+
+    async def _send(self, http_client: httpx.AsyncClient, url: str, params: Optional[dict]) -> httpx.Response:
+        """Un intento, con petición de cobertura si el primario tarda más que el p95"""
+
+        delay = self._hedge_delay()
+        if delay is None:
+            return await self._attempt(http_client, url, params)
+
+        primary = asyncio.create_task(self._attempt(http_client, url, params))
+        pending = {primary}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if done:
+                return primary.result()
+
+            self.hedged += 1
+            hedge = asyncio.create_task(self._attempt(http_client, url, params))
+            pending.add(hedge)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> dict:
+        """Devuelve los contadores de la capa de resiliencia"""
+
+        p95 = self.latency.percentile(0.95)
+        return {
+            "calls": self.calls,
+            "retries": self.retries,
+            "failures": self.failures,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "latency_p95_ms": round(p95 * 1000, 2) if p95 is not None else None,
+            "circuit": {
+                "state": self.breaker.state,
+                "consecutive_failures": self.breaker.consecutive_failures,
+                "rejected": self.breaker.rejected
+            },
+            "admission": self.gate.stats() if self.gate is not None else None
+        }
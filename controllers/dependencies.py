@@ -0,0 +1,32 @@
+"""
+=============================================================================
+DEPENDENCIAS DE LOS CONTROLADORES
+=============================================================================
+
+Dependencias de FastAPI que exponen a los endpoints los recursos de larga
+vida creados en el lifespan de la aplicación (ver main.py).
+
+Autor: Ing. Daniel Issac Cañas
+Fecha: Enero 2026
+=============================================================================
+"""
+
+import httpx
+from fastapi import Request
+from controllers.httpCaching import HttpCache
+from services.rickMortyServices import RickMortyService
+
+def get_http_client(request: Request) -> httpx.AsyncClient:
+    """Devuelve el cliente HTTP compartido (pool de conexiones)"""
+
+    return request.app.state.http_client
+
+def get_rick_service(request: Request) -> RickMortyService:
+    """Devuelve la instancia compartida del servicio de Rick and Morty"""
+
+    return request.app.state.rick_service
+
+def get_http_cache(request: Request) -> HttpCache:
+    """Devuelve la caché de respuestas HTTP (ETag y cuerpos comprimidos)"""
+
+    return request.app.state.http_cache
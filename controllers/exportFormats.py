@@ -0,0 +1,56 @@
+"""
+=============================================================================
+FORMATOS DE LA EXPORTACIÓN MASIVA (NDJSON / CSV)
+=============================================================================
+
+Convierten un iterador asíncrono de filas en bloques de bytes para una
+StreamingResponse (transferencia chunked). Se agrupan `chunk_rows` filas por
+bloque para no enviar un mensaje ASGI por fila; en memoria solo está el
+bloque actual, sea cual sea el tamaño de la exportación.
+
+Autor: Ing. Daniel Issac Cañas
+Fecha: Enero 2026
+=============================================================================
+"""
+
+import csv
+import io
+from typing import AsyncIterator, Sequence
+from controllers.fastResponses import dumps
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8"
+}
+
+async def ndjson_chunks(rows: AsyncIterator[dict], chunk_rows: int) -> AsyncIterator[bytes]:
+    """Una línea JSON por fila"""
+
+    lines = []
+    async for row in rows:
+        lines.append(dumps(row))
+        if len(lines) >= chunk_rows:
+            yield b"\n".join(lines) + b"\n"
+            lines = []
+    if lines:
+        yield b"\n".join(lines) + b"\n"
+
+async def csv_chunks(rows: AsyncIterator[dict], fields: Sequence[str], chunk_rows: int,
+                     header: bool = True) -> AsyncIterator[bytes]:
+    """CSV con las columnas indicadas (cabecera opcional para reanudar una descarga)"""
+
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields, lineterminator="\n")
+    if header:
+        writer.writeheader()
+    pending = 0
+    async for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= chunk_rows:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
@@ -0,0 +1,47 @@
+"""
+=============================================================================
+RESPUESTAS JSON RÁPIDAS
+=============================================================================
+
+Clase de respuesta basada en orjson para los endpoints calientes. Los
+controladores devuelven directamente FastJSONResponse(dto): así FastAPI no
+vuelve a validar el DTO contra response_model (que se mantiene solo para la
+documentación) y la serialización la hace pydantic-core u orjson.
+
+Si orjson no está instalado se usa el módulo json estándar.
+
+Autor: Ing. Daniel Issac Cañas
+Fecha: Enero 2026
+=============================================================================
+"""
+
+import json
+from typing import Any
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependencia opcional
+    orjson = None
+
+def dumps(content: Any) -> bytes:
+    """Serializa a JSON (bytes) con orjson si está disponible"""
+
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse que serializa DTOs sin revalidarlos y el resto con orjson"""
+
+    def __init__(self, content: Any, *args, exclude_none: bool = False, **kwargs):
+        # Omitir los campos None (los opcionales no expandidos), igual que
+        # response_model_exclude_none: solo lo piden los endpoints de detalle
+        self.exclude_none = exclude_none
+        super().__init__(content, *args, **kwargs)
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.model_dump_json(exclude_none=self.exclude_none).encode("utf-8")
+        return dumps(content)
@@ -0,0 +1,233 @@
+"""
+=============================================================================
+CACHÉ HTTP Y COMPRESIÓN DE RESPUESTAS
+=============================================================================
+
+Caché de cuerpos ya serializados para los endpoints cuyo contenido solo
+cambia cuando cambia el catálogo (búsquedas, detalle, estados...):
+
+- ETag fuerte calculado una vez a partir del hash del cuerpo, con un sufijo
+  por codificación ("<hash>-gz", "<hash>-br") para que cada representación
+  tenga el suyo; si el cliente envía If-None-Match con el ETag de cualquiera
+  de ellas se responde 304 sin serializar nada.
+- Cache-Control por ruta (lo decide el controlador).
+- Compresión gzip/brotli negociada con Accept-Encoding a partir de un tamaño
+  mínimo. Las versiones comprimidas se guardan junto al cuerpo, así que una
+  respuesta caliente se comprime una sola vez.
+
+Las entradas se indexan por ruta, parámetros y versión del catálogo; cuando
+el catálogo se recarga cambia la versión y las entradas antiguas salen por
+LRU. Si no hay versión (sin snapshot) se sigue calculando el ETag y
+comprimiendo, pero no se guarda nada.
+
+is_not_modified() resuelve las peticiones condicionales de las respuestas que
+no pasan por esta caché (los avatares servidos desde disco).
+
+Brotli es opcional: si el paquete no está instalado solo se ofrece gzip.
+
+Autor: Ing. Daniel Issac Cañas
+Fecha: Enero 2026
+=============================================================================
+"""
+
+import gzip
+import hashlib
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+from fastapi import Request
+from fastapi.responses import Response
+from controllers.fastResponses import FastJSONResponse
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dependencia opcional
+    brotli = None
+
+# Sufijo del ETag de cada codificación (los ETag fuertes deben distinguir los bytes enviados)
+ETAG_SUFFIXES = {"gzip": "-gz", "br": "-br"}
+
+def make_etag(body: bytes) -> str:
+    """ETag fuerte a partir del hash del cuerpo"""
+
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+def encoded_etag(etag: str, encoding: Optional[str]) -> str:
+    """ETag de la representación con la codificación indicada (None = sin comprimir)"""
+
+    if encoding is None:
+        return etag
+    return etag[:-1] + ETAG_SUFFIXES[encoding] + '"'
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Comprueba If-None-Match (comparación débil, como indica la RFC 9110)
+
+    Coincide con el ETag del cuerpo sin comprimir o con el de cualquiera de
+    sus codificaciones: todas representan el mismo contenido.
+    """
+
+    if if_none_match.strip() == "*":
+        return True
+    candidates = {etag}
+    candidates.update(encoded_etag(etag, encoding) for encoding in ETAG_SUFFIXES)
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag in candidates:
+            return True
+    return False
+
+def is_not_modified(headers, etag: str, last_modified: Optional[str]) -> bool:
+    """Comprueba una petición condicional (If-None-Match tiene prioridad sobre If-Modified-Since)"""
+
+    if_none_match = headers.get("if-none-match")
+    if if_none_match:
+        return etag_matches(if_none_match, etag)
+    if_modified_since = headers.get("if-modified-since")
+    if not if_modified_since or not last_modified:
+        return False
+    try:
+        return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+
+def accepted_encodings(accept_encoding: str) -> Dict[str, float]:
+    """Codificaciones aceptadas por el cliente con su peso q"""
+
+    encodings = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        if name:
+            encodings[name.strip().lower()] = weight
+    return encodings
+
+class EncodedBody:
+    """Cuerpo JSON serializado con su ETag y sus versiones comprimidas"""
+
+    __slots__ = ("body", "etag", "variants")
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.etag = make_etag(body)
+        self.variants: Dict[str, bytes] = {}
+
+class HttpCache:
+    """Caché LRU de respuestas serializadas con ETag y compresión"""
+
+    def __init__(self, max_entries: int, compression: bool = True, min_size: int = 1024,
+                 gzip_level: int = 6, brotli_quality: int = 5):
+        self.max_entries = max_entries
+        self.compression = compression
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self._entries: "OrderedDict[str, EncodedBody]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.compressions = 0
+
+    @staticmethod
+    def make_key(request: Request, version: Any) -> str:
+        """Clave de una respuesta: ruta, parámetros ordenados y versión de los datos"""
+
+        query = "&".join(sorted(request.url.query.split("&"))) if request.url.query else ""
+        return f"{request.url.path}?{query}#{version}"
+
+    def _lookup(self, key: str) -> Optional[EncodedBody]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def _store(self, key: str, entry: EncodedBody):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _negotiate(self, request: Request, entry: EncodedBody) -> Optional[str]:
+        """Elige la codificación: brotli si el cliente la acepta y está disponible, si no gzip"""
+
+        if not self.compression or len(entry.body) < self.min_size:
+            return None
+        accepted = accepted_encodings(request.headers.get("accept-encoding", ""))
+        if brotli is not None and accepted.get("br", 0) > 0:
+            return "br"
+        if accepted.get("gzip", 0) > 0:
+            return "gzip"
+        return None
+
+    def _encode(self, entry: EncodedBody, encoding: str) -> bytes:
+        """Devuelve el cuerpo comprimido, comprimiéndolo solo la primera vez"""
+
+        variant = entry.variants.get(encoding)
+        if variant is None:
+            if encoding == "br":
+                variant = brotli.compress(entry.body, quality=self.brotli_quality)
+            else:
+                variant = gzip.compress(entry.body, compresslevel=self.gzip_level, mtime=0)
+            entry.variants[encoding] = variant
+            self.compressions += 1
+        return variant
+
+    async def respond(self, request: Request, version: Any, build: Callable[[], Awaitable[Any]],
+                      cache_control: str, exclude_none: bool = False) -> Response:
+        """Responde desde la caché o construye, serializa y guarda la respuesta
+
+        build() devuelve el DTO (o contenido JSON) y solo se llama si la
+        respuesta no está en caché. Con version=None no se guarda nada.
+        exclude_none debe coincidir con response_model_exclude_none de la ruta.
+        """
+
+        key = self.make_key(request, version) if version is not None else None
+        entry = self._lookup(key) if key is not None else None
+        if entry is None:
+            entry = EncodedBody(FastJSONResponse(await build(), exclude_none=exclude_none).body)
+            if key is not None:
+                self._store(key, entry)
+
+        encoding = self._negotiate(request, entry)
+        headers = {"ETag": encoded_etag(entry.etag, encoding), "Cache-Control": cache_control}
+        if self.compression:
+            headers["Vary"] = "Accept-Encoding"
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and etag_matches(if_none_match, entry.etag):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+
+        body = entry.body
+        if encoding is not None:
+            body = self._encode(entry, encoding)
+            headers["Content-Encoding"] = encoding
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        """Devuelve los contadores de la caché HTTP"""
+
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "not_modified": self.not_modified,
+            "compressions": self.compressions,
+            "brotli": brotli is not None
+        }
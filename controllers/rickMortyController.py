@@ -11,12 +11,42 @@ Fecha: Enero 2026
 """
 
 import httpx
-from fastapi import APIRouter, Query, Path
-from services.rickMortyServices import RickMortyService
-from DTOs.rickMortyDtos import CharacterResponseDTO, SearchResultDTO, StatusesResponseDTO
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Path, Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from appsettings import settings
+from services.rickMortyServices import EXPORT_FIELDS, RickMortyService
+from controllers.dependencies import get_http_cache, get_http_client, get_rick_service
+from controllers.exportFormats import MEDIA_TYPES, csv_chunks, ndjson_chunks
+from controllers.fastResponses import FastJSONResponse
+from controllers.httpCaching import HttpCache, is_not_modified
+from DTOs.rickMortyDtos import (
+    BatchResultDTO, CharacterDetailResponseDTO, CharacterPathDTO, CharacterResponseDTO, CharacterStatsDTO,
+    CostarsResultDTO, EpisodeResponseDTO, FilterResultDTO, LocationResponseDTO, SearchResultDTO,
+    StatusesResponseDTO
+)
 
 router = APIRouter(prefix="/api")
 
+# Políticas de Cache-Control por tipo de respuesta
+NO_STORE = "no-store"
+STATIC_CACHE_CONTROL = f"public, max-age={settings.HTTP_MAX_AGE_STATIC}"
+CATALOG_CACHE_CONTROL = f"public, max-age={settings.HTTP_MAX_AGE_CATALOG}"
+SEARCH_CACHE_CONTROL = f"public, max-age={settings.HTTP_MAX_AGE_SEARCH}"
+AVATAR_CACHE_CONTROL = f"public, max-age={settings.HTTP_MAX_AGE_AVATAR}"
+
+def parse_expand(expand: str, allowed: set) -> set:
+    """Convierte el parámetro expand (separado por comas) en un conjunto validado"""
+    
+    requested = {part.strip().lower() for part in expand.split(",") if part.strip()}
+    unknown = requested - allowed
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Valores de expand no válidos: {', '.join(sorted(unknown))}. Permitidos: {', '.join(sorted(allowed))}"
+        )
+    return requested
+
 @router.get("/test")
 async def test_endpoint():
     """Endpoint de prueba simple"""
@@ -49,41 +79,358 @@ async def get_mock_character():
     }
 
 @router.get("/character/random", response_model=CharacterResponseDTO)
-async def get_random_character():
+async def get_random_character(
+    http_client: httpx.AsyncClient = Depends(get_http_client),
+    rick_service: RickMortyService = Depends(get_rick_service)
+):
     """Obtiene un personaje aleatorio de Rick and Morty"""
     
-    async with httpx.AsyncClient() as http_client:
-        rick_service = RickMortyService()
-        character = await rick_service.get_random_character(http_client)
-        return character
+    character = await rick_service.get_random_character(http_client)
+    return FastJSONResponse(character, headers={"Cache-Control": NO_STORE})
 
 @router.get("/character/statuses", response_model=StatusesResponseDTO)
-async def get_character_statuses():
+async def get_character_statuses(
+    request: Request,
+    http_client: httpx.AsyncClient = Depends(get_http_client),
+    rick_service: RickMortyService = Depends(get_rick_service),
+    http_cache: HttpCache = Depends(get_http_cache)
+):
     """Obtiene todos los estados de personajes disponibles"""
     
-    async with httpx.AsyncClient() as http_client:
-        rick_service = RickMortyService()
-        statuses = await rick_service.get_character_statuses(http_client)
-        return statuses
+    # Los estados no cambian nunca: la respuesta se serializa una sola vez
+    return await http_cache.respond(
+        request, "static", lambda: rick_service.get_character_statuses(http_client), STATIC_CACHE_CONTROL
+    )
 
 @router.get("/character/status/{status}", response_model=CharacterResponseDTO)
 async def get_character_by_status(
-    status: str = Path(..., description="Estado del personaje (alive, dead, unknown)")
+    status: str = Path(..., description="Estado del personaje (alive, dead, unknown)"),
+    http_client: httpx.AsyncClient = Depends(get_http_client),
+    rick_service: RickMortyService = Depends(get_rick_service)
 ):
     """Obtiene un personaje aleatorio por estado"""
     
-    async with httpx.AsyncClient() as http_client:
-        rick_service = RickMortyService()
-        character = await rick_service.get_character_by_status(status, http_client)
-        return character
+    character = await rick_service.get_character_by_status(status, http_client)
+    return FastJSONResponse(character, headers={"Cache-Control": NO_STORE})
 
 @router.get("/character/search", response_model=SearchResultDTO)
 async def search_characters(
-    q: str = Query(..., min_length=2, description="Término de búsqueda (mínimo 2 caracteres)")
+    request: Request,
+    q: str = Query(..., min_length=2, description="Término de búsqueda (mínimo 2 caracteres)"),
+    all: bool = Query(False, description="Devolver los resultados de todas las páginas"),
+    limit: int = Query(20, ge=1, le=500, description="Máximo de resultados"),
+    offset: int = Query(0, ge=0, description="Resultados a saltar"),
+    fuzzy: bool = Query(False, description="Búsqueda tolerante a errores, ordenada por similitud (requiere el catálogo local)"),
+    http_client: httpx.AsyncClient = Depends(get_http_client),
+    rick_service: RickMortyService = Depends(get_rick_service),
+    http_cache: HttpCache = Depends(get_http_cache)
 ):
     """Busca personajes que contengan una palabra específica en el nombre"""
     
-    async with httpx.AsyncClient() as http_client:
-        rick_service = RickMortyService()
-        results = await rick_service.search_characters(q, http_client)
-        return results
\ No newline at end of file
+    return await http_cache.respond(
+        request,
+        rick_service.catalog_version,
+        lambda: rick_service.search_characters(
+            q, http_client, all_pages=all, limit=limit, offset=offset, fuzzy=fuzzy
+        ),
+        SEARCH_CACHE_CONTROL
+    )
+
+@router.get("/character/search/stream")
+async def stream_search_characters(
+    q: str = Query(..., min_length=2, description="Término de búsqueda (mínimo 2 caracteres)"),
+    fuzzy: bool = Query(False, description="Búsqueda tolerante a errores, ordenada por similitud (requiere el catálogo local)"),
+    http_client: httpx.AsyncClient = Depends(get_http_client),
+    rick_service: RickMortyService = Depends(get_rick_service)
+):
+    """Busca personajes en todas las páginas y los devuelve como NDJSON (un personaje por línea)"""
+    
+    characters = await rick_service.stream_search_characters(q, http_client, fuzzy=fuzzy)
+    
+    async def ndjson():
+        async for character in characters:
+            yield character.model_dump_json() + "\n"
+    
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+@router.get("/character/batch", response_model=BatchResultDTO)
+async def get_characters_batch(
+    request: Request,
+    ids: str = Query(..., description="IDs de personaje separados por comas (ej: 1,2,3)"),
+    http_client: httpx.AsyncClient = Depends(get_http_client),
+    rick_service: RickMortyService = Depends(get_rick_service),
+    http_cache: HttpCache = Depends(get_http_cache)
+):
+    """Obtiene varios personajes por ID en una sola llamada"""
+    
+    try:
+        character_ids = [int(part) for part in ids.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail="Los IDs deben ser números enteros separados por comas"
+        )
+    
+    if not character_ids:
+        raise HTTPException(
+            status_code=400,
+            detail="Debes indicar al menos un ID"
+        )
+    
+    return await http_cache.respond(
+        request,
+        rick_service.catalog_version,
+        lambda: rick_service.get_characters_batch(character_ids, http_client),
+        CATALOG_CACHE_CONTROL
+    )
+
+@router.get("/character/stats", response_model=CharacterStatsDTO)
+async def get_character_stats(
+    request: Request,
+    group_by: str = Query("status,species,gender", description="Campos por los que agrupar, separados por comas"),
+    status: str = Query(None, description="Filtrar por estado"),
+    species: str = Query(None, description="Filtrar por especie"),
+    gender: str = Query(None, description="Filtrar por género"),
+    type: str = Query(None, description="Filtrar por tipo"),
+    origin: str = Query(None, description="Filtrar por nombre de origen"),
+    location: str = Query(None, description="Filtrar por nombre de ubicación"),
+    top: int = Query(10, ge=1, le=100, description="Número de orígenes y ubicaciones más frecuentes"),
+    bins: int = Query(10, ge=1, le=100, description="Tramos del histograma de episodios"),
+    limit: int = Query(100, ge=1, le=5000, description="Máximo de grupos devueltos"),
+    rick_service: RickMortyService = Depends(get_rick_service),
+    http_cache: HttpCache = Depends(get_http_cache)
+):
+    """Estadísticas agregadas del catálogo de personajes, calculadas en local"""
+    
+    filters = {
+        name: value for name, value in (
+            ("status", status), ("species", species), ("gender", gender),
+            ("type", type), ("origin", origin), ("location", location)
+        ) if value is not None
+    }
+    fields = [part.strip().lower() for part in group_by.split(",") if part.strip()]
+    
+    async def build():
+        return rick_service.get_character_stats(filters, fields, top=top, bins=bins, limit=limit)
+    
+    return await http_cache.respond(request, rick_service.catalog_version, build, CATALOG_CACHE_CONTROL)
+
+@router.get("/character/filter", response_model=FilterResultDTO)
+async def filter_characters(
+    request: Request,
+    status: List[str] = Query(None, description="Estados (se puede repetir: cualquiera de ellos)"),
+    species: List[str] = Query(None, description="Especies (se puede repetir)"),
+    gender: List[str] = Query(None, description="Géneros (se puede repetir)"),
+    type: List[str] = Query(None, description="Tipos (se puede repetir)"),
+    origin: List[str] = Query(None, description="Nombres de origen (se puede repetir)"),
+    location: List[str] = Query(None, description="Nombres de ubicación (se puede repetir)"),
+    limit: int = Query(20, ge=1, le=500, description="Máximo de resultados"),
+    offset: int = Query(0, ge=0, description="Resultados a saltar"),
+    sample: int = Query(None, ge=1, le=500, description="Devolver una muestra aleatoria de este tamaño"),
+    facet_limit: int = Query(20, ge=1, le=1000, description="Máximo de valores por faceta"),
+    rick_service: RickMortyService = Depends(get_rick_service),
+    http_cache: HttpCache = Depends(get_http_cache)
+):
+    """Filtra personajes por cualquier combinación de campos, con facetas de los demás campos"""
+    
+    filters = {
+        name: values for name, values in (
+            ("status", status), ("species", species), ("gender", gender),
+            ("type", type), ("origin", origin), ("location", location)
+        ) if values
+    }
+    
+    # Las muestras aleatorias no se cachean
+    if sample is not None:
+        result = rick_service.filter_characters(filters, sample=sample, facet_limit=facet_limit)
+        return FastJSONResponse(result, headers={"Cache-Control": NO_STORE})
+    
+    async def build():
+        return rick_service.filter_characters(filters, limit=limit, offset=offset, facet_limit=facet_limit)
+    
+    return await http_cache.respond(request, rick_service.catalog_version, build, CATALOG_CACHE_CONTROL)
+
+@router.get("/character/{character_id:int}/costars", response_model=CostarsResultDTO)
+async def get_character_costars(
+    request: Request,
+    character_id: int = Path(..., description="ID del personaje"),
+    limit: int = Query(10, ge=1, le=500, description="Máximo de personajes devueltos"),
+    rick_service: RickMortyService = Depends(get_rick_service),
+    http_cache: HttpCache = Depends(get_http_cache)
+):
+    """Personajes que más episodios comparten con uno dado"""
+    
+    return await http_cache.respond(
+        request,
+        rick_service.catalog_version,
+        lambda: rick_service.get_costars(character_id, limit),
+        CATALOG_CACHE_CONTROL
+    )
+
+@router.get("/character/{character_id:int}/path/{target_id:int}", response_model=CharacterPathDTO)
+async def get_character_path(
+    request: Request,
+    character_id: int = Path(..., description="ID del personaje de origen"),
+    target_id: int = Path(..., description="ID del personaje de destino"),
+    rick_service: RickMortyService = Depends(get_rick_service),
+    http_cache: HttpCache = Depends(get_http_cache)
+):
+    """Conexión más corta entre dos personajes a través de episodios compartidos"""
+    
+    return await http_cache.respond(
+        request,
+        rick_service.catalog_version,
+        lambda: rick_service.get_character_path(character_id, target_id),
+        CATALOG_CACHE_CONTROL
+    )
+
+@router.get("/character/{character_id:int}/avatar", response_class=Response)
+async def get_character_avatar(
+    request: Request,
+    character_id: int = Path(..., description="ID del personaje"),
+    http_client: httpx.AsyncClient = Depends(get_http_client),
+    rick_service: RickMortyService = Depends(get_rick_service)
+):
+    """Sirve el avatar de un personaje a través de la caché en disco
+    
+    Las copias en disco se envían con FileResponse (sin copias en memoria si
+    el servidor ASGI soporta http.response.pathsend, y con soporte de Range);
+    los fallos se descargan antes a disco, una sola vez aunque lleguen varias
+    peticiones del mismo avatar. Sin caché en disco la imagen se reenvía en
+    streaming. La cabecera X-Avatar-Cache indica hit, revalidated, stale,
+    miss o bypass.
+    """
+    
+    result = await rick_service.get_avatar(character_id, http_client)
+    headers = {"Cache-Control": AVATAR_CACHE_CONTROL, "X-Avatar-Cache": result.status}
+    
+    if result.entry is None:
+        if result.last_modified:
+            headers["Last-Modified"] = result.last_modified
+        return StreamingResponse(result.body, media_type=result.content_type, headers=headers)
+    
+    headers["ETag"] = result.entry.etag
+    headers["Last-Modified"] = result.last_modified
+    if is_not_modified(request.headers, result.entry.etag, result.last_modified):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(result.path, media_type=result.content_type, headers=headers)
+
+@router.get("/character/{character_id:int}", response_model=CharacterDetailResponseDTO, response_model_exclude_none=True)
+async def get_character_detail(
+    request: Request,
+    character_id: int = Path(..., description="ID del personaje"),
+    expand: str = Query("", description="Recursos a expandir: episodes, origin, location"),
+    http_client: httpx.AsyncClient = Depends(get_http_client),
+    rick_service: RickMortyService = Depends(get_rick_service),
+    http_cache: HttpCache = Depends(get_http_cache)
+):
+    """Obtiene un personaje por ID, con sus episodios y ubicaciones expandidos si se piden"""
+    
+    expanded = parse_expand(expand, {"episodes", "origin", "location"})
+    return await http_cache.respond(
+        request,
+        rick_service.catalog_version,
+        lambda: rick_service.get_character_detail(character_id, expanded, http_client),
+        CATALOG_CACHE_CONTROL,
+        exclude_none=True
+    )
+
+@router.get("/location/{location_id:int}", response_model=LocationResponseDTO, response_model_exclude_none=True)
+async def get_location(
+    request: Request,
+    location_id: int = Path(..., description="ID de la ubicación"),
+    expand: str = Query("", description="Recursos a expandir: residents"),
+    http_client: httpx.AsyncClient = Depends(get_http_client),
+    rick_service: RickMortyService = Depends(get_rick_service),
+    http_cache: HttpCache = Depends(get_http_cache)
+):
+    """Obtiene una ubicación por ID, con sus residentes expandidos si se piden"""
+    
+    expanded = parse_expand(expand, {"residents"})
+    return await http_cache.respond(
+        request,
+        rick_service.catalog_version,
+        lambda: rick_service.get_location(location_id, expanded, http_client),
+        CATALOG_CACHE_CONTROL,
+        exclude_none=True
+    )
+
+@router.get("/episode/{episode_id:int}", response_model=EpisodeResponseDTO, response_model_exclude_none=True)
+async def get_episode(
+    request: Request,
+    episode_id: int = Path(..., description="ID del episodio"),
+    expand: str = Query("", description="Recursos a expandir: characters"),
+    http_client: httpx.AsyncClient = Depends(get_http_client),
+    rick_service: RickMortyService = Depends(get_rick_service),
+    http_cache: HttpCache = Depends(get_http_cache)
+):
+    """Obtiene un episodio por ID, con sus personajes expandidos si se piden"""
+    
+    expanded = parse_expand(expand, {"characters"})
+    return await http_cache.respond(
+        request,
+        rick_service.catalog_version,
+        lambda: rick_service.get_episode(episode_id, expanded, http_client),
+        CATALOG_CACHE_CONTROL,
+        exclude_none=True
+    )
+
+@router.get("/export/{resource}")
+async def export_resource(
+    resource: str = Path(..., description="Recurso a exportar (character, location, episode)"),
+    format: str = Query("ndjson", description="Formato de salida (ndjson, csv)"),
+    since_id: int = Query(0, ge=0, description="Exportar solo los recursos con ID mayor (reanudar)"),
+    http_client: httpx.AsyncClient = Depends(get_http_client),
+    rick_service: RickMortyService = Depends(get_rick_service)
+):
+    """Exporta todos los personajes, ubicaciones o episodios en streaming, ordenados por ID"""
+    
+    if resource not in EXPORT_FIELDS:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Recurso no válido: {resource}. Permitidos: {', '.join(EXPORT_FIELDS)}"
+        )
+    if format not in MEDIA_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Formato no válido: {format}. Permitidos: {', '.join(MEDIA_TYPES)}"
+        )
+    
+    source, rows = await rick_service.export_resource(resource, http_client, since_id)
+    chunk_rows = max(1, settings.EXPORT_CHUNK_ROWS)
+    if format == "csv":
+        # Al reanudar (since_id) no se repite la cabecera, para poder concatenar
+        body = csv_chunks(rows, EXPORT_FIELDS[resource], chunk_rows, header=since_id == 0)
+    else:
+        body = ndjson_chunks(rows, chunk_rows)
+    
+    return StreamingResponse(body, media_type=MEDIA_TYPES[format], headers={
+        "Cache-Control": NO_STORE,
+        "Content-Disposition": f'attachment; filename="{resource}s.{format}"',
+        "X-Export-Source": source
+    })
+
+@router.get("/cache/stats")
+async def get_cache_stats(
+    rick_service: RickMortyService = Depends(get_rick_service),
+    http_cache: HttpCache = Depends(get_http_cache)
+):
+    """Obtiene los contadores de la caché de respuestas (aciertos, fallos, expulsiones)"""
+    
+    return {**rick_service.get_cache_stats(), "http": http_cache.stats()}
+
+@router.get("/upstream/stats")
+async def get_upstream_stats(
+    rick_service: RickMortyService = Depends(get_rick_service)
+):
+    """Obtiene reintentos, hedging y estado del circuit breaker de la API externa"""
+    
+    return rick_service.get_upstream_stats()
+
+@router.get("/snapshot/stats")
+async def get_snapshot_stats(
+    rick_service: RickMortyService = Depends(get_rick_service)
+):
+    """Obtiene el estado del snapshot del catálogo en memoria"""
+    
+    return rick_service.get_snapshot_stats()
\ No newline at end of file
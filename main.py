@@ -10,18 +10,116 @@ Fecha: Enero 2026
 =============================================================================
 """
 
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from appsettings import settings
+from clients.httpClientFactory import create_http_client
+from controllers.fastResponses import FastJSONResponse
+from controllers.httpCaching import HttpCache
+from metrics.metricsMiddleware import MetricsMiddleware
+from metrics.metricsRegistry import CONTENT_TYPE, metrics
+from services.rickMortyServices import RickMortyService
 from controllers.rickMortyController import router as rick_router
 
+# Primera espera tras un fallo de descarga o sincronización (se duplica en cada fallo seguido)
+SNAPSHOT_RETRY_INITIAL = 5.0
+
+async def refresh_snapshot(app: FastAPI, delay: float):
+    """Mantiene el catálogo al día en segundo plano
+
+    Hace una descarga completa al arrancar (si no hay snapshot en disco) y
+    cada SNAPSHOT_REFRESH_INTERVAL; entre medias, cada SYNC_INTERVAL, una
+    sincronización incremental que solo pide los recursos nuevos.
+    Si una operación falla se reintenta con backoff exponencial, desde
+    SNAPSHOT_RETRY_INITIAL hasta el intervalo de esa operación.
+    """
+
+    service = app.state.rick_service
+    loop = asyncio.get_running_loop()
+    full_load_at = loop.time() + max(0.0, delay)
+    retry_delay = 0.0
+    while True:
+        full_load_due = (service.snapshot is None or service.sync_state["full_reload_required"]
+                         or (settings.SNAPSHOT_REFRESH_INTERVAL > 0 and loop.time() >= full_load_at))
+        try:
+            if full_load_due:
+                snapshot = await service.load_snapshot(app.state.http_client)
+                full_load_at = loop.time() + settings.SNAPSHOT_REFRESH_INTERVAL
+                if settings.DEBUG:
+                    print(f"📸 Snapshot cargado: {len(snapshot)} personajes")
+            elif settings.SYNC_INTERVAL > 0:
+                result = await service.sync_catalog(app.state.http_client)
+                if settings.DEBUG and (result["added"] or result["updated"]):
+                    print(f"🔄 Catálogo sincronizado: {result['added']} nuevos, {result['updated']} actualizados")
+            retry_delay = 0.0
+        except Exception as e:
+            interval = settings.SNAPSHOT_REFRESH_INTERVAL if full_load_due else settings.SYNC_INTERVAL
+            limit = interval if interval > 0 else 60.0
+            retry_delay = min(limit, retry_delay * 2 if retry_delay else SNAPSHOT_RETRY_INITIAL)
+            print(f"⚠️  No se pudo actualizar el snapshot del catálogo: {e} (reintento en {retry_delay:.0f}s)")
+            # Se reintenta la misma operación (la descarga completa sigue pendiente)
+            await asyncio.sleep(retry_delay)
+            continue
+
+        waits = []
+        if settings.SYNC_INTERVAL > 0:
+            waits.append(settings.SYNC_INTERVAL)
+        if settings.SNAPSHOT_REFRESH_INTERVAL > 0:
+            waits.append(max(0.0, full_load_at - loop.time()))
+        if not waits:
+            if service.snapshot is not None:
+                return
+            # Sin refrescos configurados pero sin catálogo: se reintenta la descarga inicial
+            waits.append(60.0)
+        await asyncio.sleep(min(waits))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Crea los recursos compartidos al arrancar y los libera al apagar"""
+
+    # Un único cliente HTTP con pool de conexiones para toda la aplicación
+    app.state.http_client = create_http_client()
+    app.state.rick_service = RickMortyService()
+    app.state.http_cache = HttpCache(
+        max_entries=settings.HTTP_CACHE_MAX_ENTRIES,
+        compression=settings.COMPRESSION_ENABLED,
+        min_size=settings.COMPRESSION_MIN_SIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY
+    )
+
+    # Arranque en caliente desde el snapshot en disco (si existe); la descarga
+    # desde la API externa se hace en segundo plano y mientras tanto se sirve
+    # lo que haya en disco o se consulta la API directamente
+    snapshot_task = None
+    if settings.SNAPSHOT_ENABLED:
+        catalog = app.state.rick_service.restore_snapshot()
+        if catalog is not None and settings.DEBUG:
+            print(f"💾 Snapshot restaurado de disco: {len(catalog.characters)} personajes")
+        if not settings.OFFLINE_MODE:
+            delay = 0 if catalog is None else settings.SNAPSHOT_REFRESH_INTERVAL - catalog.age
+            snapshot_task = asyncio.create_task(refresh_snapshot(app, delay))
+    try:
+        yield
+    finally:
+        if snapshot_task is not None:
+            snapshot_task.cancel()
+            await asyncio.gather(snapshot_task, return_exceptions=True)
+        await app.state.rick_service.aclose()
+        await app.state.http_client.aclose()
+
 # Crear aplicación FastAPI
 app = FastAPI(
     title=settings.API_TITLE,
     description=settings.API_DESCRIPTION,
     version=settings.API_VERSION,
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan
 )
 
 # Configurar CORS
@@ -33,6 +131,15 @@ app.add_middleware(
     allow_headers=settings.ALLOWED_HEADERS,
 )
 
+# Métricas de latencia, tamaño y peticiones en curso de todos los endpoints
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, registry=metrics, server_timing=settings.SERVER_TIMING_ENABLED)
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics_endpoint():
+        """Métricas en formato de texto de Prometheus"""
+        return PlainTextResponse(metrics.render(), media_type=CONTENT_TYPE)
+
 # Incluir rutas de Rick and Morty
 app.include_router(rick_router, tags=["Rick and Morty"])
 
@@ -0,0 +1,71 @@
+"""
+=============================================================================
+MIDDLEWARE DE MÉTRICAS HTTP
+=============================================================================
+
+Middleware ASGI puro (sin BaseHTTPMiddleware, para no añadir una tarea ni
+copiar el cuerpo de la respuesta) que registra por cada petición:
+
+- Latencia hasta el final de la respuesta, por ruta (plantilla, no la URL
+  concreta, para acotar la cardinalidad).
+- Número de peticiones por método, ruta y código de estado.
+- Tamaño de la respuesta y peticiones en curso.
+
+Si SERVER_TIMING_ENABLED está activado añade además la cabecera
+Server-Timing con el tiempo pasado en la API externa y el total.
+
+Autor: Ing. Daniel Issac Cañas
+Fecha: Enero 2026
+=============================================================================
+"""
+
+import time
+from metrics import serverTiming
+from metrics.metricsRegistry import SIZE_BUCKETS, MetricsRegistry
+
+class MetricsMiddleware:
+    """Instrumenta todas las peticiones HTTP de la aplicación"""
+
+    def __init__(self, app, registry: MetricsRegistry, server_timing: bool = False):
+        self.app = app
+        self.server_timing = server_timing
+        self.requests = registry.counter(
+            "http_requests_total", "Peticiones HTTP atendidas", ("method", "route", "status"))
+        self.duration = registry.histogram(
+            "http_request_duration_seconds", "Latencia de las peticiones HTTP", ("route",))
+        self.response_size = registry.histogram(
+            "http_response_size_bytes", "Tamaño del cuerpo de las respuestas HTTP", ("route",), SIZE_BUCKETS)
+        self.in_flight = registry.gauge("http_requests_in_flight", "Peticiones HTTP en curso")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        timings = serverTiming.start() if self.server_timing else None
+        status_code = 500
+        body_size = 0
+
+        async def send_wrapper(message):
+            nonlocal status_code, body_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if timings is not None:
+                    value = serverTiming.header(timings, time.perf_counter() - start)
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"server-timing", value.encode("latin-1"))]
+            elif message["type"] == "http.response.body":
+                body_size += len(message.get("body", b""))
+            await send(message)
+
+        self.in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.in_flight.dec()
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            self.requests.labels(scope["method"], route_path, str(status_code)).inc()
+            self.duration.labels(route_path).observe(time.perf_counter() - start)
+            self.response_size.labels(route_path).observe(body_size)
@@ -0,0 +1,248 @@
+"""
+=============================================================================
+REGISTRO DE MÉTRICAS (FORMATO PROMETHEUS)
+=============================================================================
+
+Contadores, gauges e histogramas en memoria que se exponen en formato de
+texto de Prometheus en /metrics.
+
+Están pensados para dejarse siempre activos en el camino caliente:
+
+- Sin locks: toda la aplicación corre en un único event loop, así que
+  actualizar un contador es una suma sobre un atributo con __slots__.
+- Histogramas con buckets fijos: observar un valor es una búsqueda binaria
+  y un incremento; los acumulados solo se calculan al renderizar.
+- Los hijos por etiquetas se crean una vez y el código que los usa puede
+  guardarlos para no repetir la búsqueda.
+
+Las métricas que ya se cuentan en otro sitio (caché, circuit breaker...) se
+registran como métricas calculadas: una función que se evalúa al renderizar.
+
+Autor: Ing. Daniel Issac Cañas
+Fecha: Enero 2026
+=============================================================================
+"""
+
+import math
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, Sequence, Tuple, Union
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Buckets de latencia en segundos (de 1ms a 10s) y de tamaño en bytes
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+def format_value(value: float) -> str:
+    """Formatea un número como lo espera Prometheus"""
+
+    if isinstance(value, int):
+        return str(value)
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+def format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """Formatea las etiquetas de una muestra: {a="1",b="2"}"""
+
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{escape_label(str(value))}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+def escape_label(value: str) -> str:
+    """Escapa barras, comillas y saltos de línea en el valor de una etiqueta"""
+
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+class CounterChild:
+    """Valor de un contador para una combinación de etiquetas"""
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+class GaugeChild:
+    """Valor de un gauge para una combinación de etiquetas"""
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+    def dec(self, amount: float = 1):
+        self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+class HistogramChild:
+    """Histograma con buckets fijos para una combinación de etiquetas"""
+
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        # Un contador por bucket más el de +Inf; no son acumulados
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+class Metric:
+    """Métrica con nombre, ayuda y etiquetas; cada combinación de etiquetas es un hijo"""
+
+    TYPE = "untyped"
+
+    def __init__(self, name: str, help: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        self._children: Dict[Tuple[str, ...], object] = {}
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        """Devuelve (creándolo si no existe) el hijo para esos valores de etiquetas"""
+
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.label_names):
+                raise ValueError(f"{self.name} espera las etiquetas {self.label_names}")
+            child = self._children[values] = self._new_child()
+        return child
+
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        """Muestras (sufijo, etiquetas formateadas, valor) de todos los hijos"""
+
+        for values, child in list(self._children.items()):
+            yield "", format_labels(self.label_names, values), child.value
+
+class Counter(Metric):
+    TYPE = "counter"
+
+    def _new_child(self) -> CounterChild:
+        return CounterChild()
+
+    def inc(self, amount: float = 1):
+        self.labels().inc(amount)
+
+class Gauge(Metric):
+    TYPE = "gauge"
+
+    def _new_child(self) -> GaugeChild:
+        return GaugeChild()
+
+    def inc(self, amount: float = 1):
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1):
+        self.labels().dec(amount)
+
+    def set(self, value: float):
+        self.labels().set(value)
+
+class Histogram(Metric):
+    TYPE = "histogram"
+
+    def __init__(self, name: str, help: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, label_names)
+        self.bounds = tuple(sorted(buckets))
+
+    def _new_child(self) -> HistogramChild:
+        return HistogramChild(self.bounds)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        bucket_names = self.label_names + ("le",)
+        for values, child in list(self._children.items()):
+            cumulative = 0
+            for bound, count in zip(self.bounds + (math.inf,), child.counts):
+                cumulative += count
+                yield "_bucket", format_labels(bucket_names, values + (format_value(float(bound)),)), cumulative
+            labels = format_labels(self.label_names, values)
+            yield "_sum", labels, child.sum
+            yield "_count", labels, cumulative
+
+class CallbackMetric(Metric):
+    """Métrica calculada al renderizar a partir de una función
+
+    La función devuelve un número, o un diccionario {valores de etiquetas: número}
+    si la métrica tiene etiquetas.
+    """
+
+    def __init__(self, name: str, help: str, function: Callable[[], Union[float, dict]],
+                 type: str = "gauge", label_names: Sequence[str] = ()):
+        super().__init__(name, help, label_names)
+        self.TYPE = type
+        self.function = function
+
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        result = self.function()
+        if result is None:
+            return
+        if not isinstance(result, dict):
+            result = {(): result}
+        for values, value in result.items():
+            values = values if isinstance(values, tuple) else (values,)
+            yield "", format_labels(self.label_names, values), value
+
+class MetricsRegistry:
+    """Conjunto de métricas de la aplicación"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def _get_or_create(self, cls, name: str, *args, **kwargs):
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = cls(name, *args, **kwargs)
+        elif not isinstance(metric, cls):
+            raise ValueError(f"La métrica {name} ya existe con otro tipo")
+        return metric
+
+    def counter(self, name: str, help: str, label_names: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, help, label_names)
+
+    def gauge(self, name: str, help: str, label_names: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, help, label_names)
+
+    def histogram(self, name: str, help: str, label_names: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, help, label_names, buckets)
+
+    def callback(self, name: str, help: str, function: Callable[[], Union[float, dict]],
+                 type: str = "gauge", label_names: Sequence[str] = ()) -> CallbackMetric:
+        """Registra (o sustituye) una métrica calculada"""
+
+        metric = self._metrics[name] = CallbackMetric(name, help, function, type, label_names)
+        return metric
+
+    def render(self) -> str:
+        """Genera el texto en formato de exposición de Prometheus"""
+
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.TYPE}")
+            for suffix, labels, value in metric.samples():
+                lines.append(f"{metric.name}{suffix}{labels} {format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+# Registro global de la aplicación
+metrics = MetricsRegistry()
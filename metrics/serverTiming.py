@@ -0,0 +1,53 @@
+"""
+=============================================================================
+DESGLOSE DE TIEMPOS POR PETICIÓN (SERVER-TIMING)
+=============================================================================
+
+Acumula, para la petición en curso, el tiempo pasado en cada fase (por
+ejemplo las llamadas a la API externa) y lo convierte en la cabecera
+Server-Timing que muestran las herramientas de desarrollo del navegador.
+
+El acumulador vive en una ContextVar: el middleware lo crea al empezar la
+petición y el cliente HTTP añade sus tiempos sin tener que recibirlo como
+parámetro. Si no hay acumulador (cabecera desactivada) registrar no hace nada.
+
+Autor: Ing. Daniel Issac Cañas
+Fecha: Enero 2026
+=============================================================================
+"""
+
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+# Fase -> [milisegundos acumulados, número de llamadas]
+_timings: ContextVar[Optional[Dict[str, List[float]]]] = ContextVar("server_timing", default=None)
+
+def start() -> Dict[str, List[float]]:
+    """Empieza a acumular tiempos para la petición actual"""
+
+    timings: Dict[str, List[float]] = {}
+    _timings.set(timings)
+    return timings
+
+def record(phase: str, seconds: float):
+    """Suma la duración de una fase a la petición actual (si se está midiendo)"""
+
+    timings = _timings.get()
+    if timings is None:
+        return
+    entry = timings.get(phase)
+    if entry is None:
+        timings[phase] = [seconds * 1000, 1]
+    else:
+        entry[0] += seconds * 1000
+        entry[1] += 1
+
+def header(timings: Dict[str, List[float]], total_seconds: float) -> str:
+    """Construye el valor de la cabecera Server-Timing"""
+
+    parts = [
+        f'{phase};dur={duration:.2f};desc="{int(count)} llamadas"' if count > 1 else f"{phase};dur={duration:.2f}"
+        for phase, (duration, count) in timings.items()
+    ]
+    parts.append(f"total;dur={total_seconds * 1000:.2f}")
+    return ", ".join(parts)
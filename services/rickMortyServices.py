@@ -10,15 +10,99 @@ Fecha: Enero 2026
 =============================================================================
 """
 
+import asyncio
+import time
 import httpx
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
+from fastapi import HTTPException
+from appsettings import settings
+from cache.avatarCache import AvatarCache, AvatarResult
+from catalog.bitmapIndex import FILTER_FIELDS, BitmapIndex, popcount
+from catalog.characterSnapshot import CharacterRecord, CharacterSnapshot, id_from_url
+from catalog.coAppearanceGraph import CoAppearanceGraph
+from catalog.columnarCatalog import CATEGORICAL_COLUMNS, ColumnarCatalog
+from catalog.searchIndex import TrigramIndex
+from catalog.snapshotStore import PersistedCatalog, SnapshotStore
 from clients.rickMortyClient import RickMortyClient
-from DTOs.rickMortyDtos import CharacterResponseDTO, SearchResultDTO, StatusesResponseDTO
+from clients.singleFlight import SingleFlight
+from metrics.metricsRegistry import metrics
+from DTOs.rickMortyDtos import (
+    BatchResultDTO, CharacterDetailResponseDTO, CharacterResponseDTO, CharacterStatsDTO,
+    CharacterPathDTO, CostarDTO, CostarsResultDTO, EpisodeCountStatsDTO, EpisodeResponseDTO, FilterResultDTO,
+    GroupCountDTO, LocationResponseDTO, PathLinkDTO, SearchResultDTO, StatusesResponseDTO, ValueCountDTO
+)
+
+# Columnas de la exportación masiva por recurso (las de su DTO, sin recursos expandidos)
+EXPORT_FIELDS = {
+    "character": CharacterRecord.DTO_FIELDS,
+    "location": ("id", "name", "type", "dimension", "resident_count"),
+    "episode": ("id", "name", "air_date", "episode", "character_count")
+}
 
 class RickMortyService:
     """Servicio para obtener personajes de Rick and Morty"""
 
     def __init__(self):
         self.client = RickMortyClient()
+        self.snapshot: Optional[CharacterSnapshot] = None
+        self.search_index = TrigramIndex(settings.SEARCH_FUZZY_MIN_SCORE)
+        self.locations: Dict[int, dict] = {}
+        self.episodes: Dict[int, dict] = {}
+        self.store = SnapshotStore(settings.SNAPSHOT_PATH) if settings.SNAPSHOT_PATH else None
+        self.snapshot_source: Optional[str] = None
+        # Cambia cada vez que se publica un catálogo nuevo (invalida la caché HTTP)
+        self.catalog_version: Optional[int] = None
+        # Estado de la sincronización incremental con la API externa
+        self.sync_state = {
+            "last_full_load_at": None,
+            "last_sync_at": None,
+            "last_sync_ms": None,
+            "syncs": 0,
+            "failures": 0,
+            "added": 0,
+            "updated": 0,
+            "full_reload_required": False
+        }
+        self._revalidate_cursor = 0
+        # Columnas y bitmaps del snapshot publicado (se reconstruyen cuando cambia el snapshot)
+        self._columns: Optional[ColumnarCatalog] = None
+        self._columns_snapshot: Optional[CharacterSnapshot] = None
+        self._bitmaps: Optional[BitmapIndex] = None
+        self._bitmaps_snapshot: Optional[CharacterSnapshot] = None
+        self._graph: Optional[CoAppearanceGraph] = None
+        self._graph_snapshot: Optional[CharacterSnapshot] = None
+        # Construcción completa en curso: (snapshot, futuro con el grafo)
+        self._graph_build: Optional[Tuple[CharacterSnapshot, asyncio.Future]] = None
+        self.avatar_cache = AvatarCache(
+            settings.AVATAR_CACHE_DIR, settings.AVATAR_CACHE_MAX_BYTES, settings.AVATAR_CACHE_TTL
+        ) if settings.AVATAR_CACHE_DIR else None
+        # Descargas y revalidaciones de avatares en curso (una por personaje)
+        self.avatar_flight = SingleFlight()
+        self._register_metrics()
+
+    def _register_metrics(self):
+        """Registra el retraso de la sincronización en el registro de métricas"""
+        
+        metrics.callback("rickmorty_catalog_sync_lag", "Recursos de la API externa que faltan en el catálogo local",
+                         lambda: {(resource,): lag for resource, lag in self._sync_lag().items()},
+                         label_names=("resource",))
+        metrics.callback("rickmorty_catalog_seconds_since_sync", "Segundos desde la última sincronización del catálogo",
+                         self._seconds_since_sync)
+
+    @staticmethod
+    def _image_url(character_id: int, image: str) -> str:
+        """URL del avatar que se devuelve al cliente (la del proxy si está activada la reescritura)"""
+        
+        if settings.AVATAR_PROXY_REWRITE:
+            return f"{settings.AVATAR_PUBLIC_BASE_URL}/api/character/{character_id}/avatar"
+        return image
+
+    def _record_row(self, record: CharacterRecord) -> dict:
+        """Campos del DTO de un registro del snapshot"""
+        
+        row = record.as_dict()
+        row["image"] = self._image_url(record.id, record.image)
+        return row
 
     def _transform_character(self, character_data: dict) -> CharacterResponseDTO:
         """Transforma un personaje de la API en DTO"""
@@ -32,39 +116,926 @@ class RickMortyService:
             gender=character_data["gender"],
             origin=character_data["origin"]["name"],
             location=character_data["location"]["name"],
-            image=character_data["image"],
+            image=self._image_url(character_data["id"], character_data["image"]),
             episode_count=len(character_data.get("episode", [])),
             created=character_data["created"]
         )
 
+    def _transform_location(self, location_data: dict, residents: Optional[List[CharacterResponseDTO]] = None) -> LocationResponseDTO:
+        """Transforma una ubicación de la API en DTO"""
+        
+        return LocationResponseDTO(
+            id=location_data["id"],
+            name=location_data["name"],
+            type=location_data.get("type", ""),
+            dimension=location_data.get("dimension", ""),
+            resident_count=len(location_data.get("residents", [])),
+            residents=residents
+        )
+
+    def _transform_episode(self, episode_data: dict, characters: Optional[List[CharacterResponseDTO]] = None) -> EpisodeResponseDTO:
+        """Transforma un episodio de la API en DTO"""
+        
+        return EpisodeResponseDTO(
+            id=episode_data["id"],
+            name=episode_data["name"],
+            air_date=episode_data.get("air_date", ""),
+            episode=episode_data.get("episode", ""),
+            character_count=len(episode_data.get("characters", [])),
+            characters=characters
+        )
+
+    def _record_to_dto(self, record: CharacterRecord) -> CharacterResponseDTO:
+        """Transforma un registro del snapshot en DTO
+        
+        Los registros del snapshot ya vienen de la API y no cambian, así que el
+        DTO se construye sin validar (model_construct) y se reutiliza.
+        """
+        
+        dto = record.dto
+        if dto is None:
+            dto = record.dto = CharacterResponseDTO.model_construct(**self._record_row(record))
+        return dto
+
+    def _publish_catalog(self, characters: List[dict], locations: List[dict], episodes: List[dict],
+                         source: str) -> CharacterSnapshot:
+        """Construye el snapshot en memoria y sus índices a partir del catálogo de la API"""
+        
+        snapshot = CharacterSnapshot(CharacterRecord.from_api(data) for data in characters)
+        # El índice solo reindexa los personajes nuevos o con nombre cambiado
+        self.search_index.add_many((record.id, record.name) for record in snapshot.records)
+        self.locations = {location["id"]: location for location in locations}
+        self.episodes = {episode["id"]: episode for episode in episodes}
+        self.snapshot = snapshot
+        self.snapshot_source = source
+        self.catalog_version = (self.catalog_version or 0) + 1
+        self._revalidate_cursor = 0
+        return snapshot
+
+    def restore_snapshot(self) -> Optional[PersistedCatalog]:
+        """Publica el snapshot guardado en disco (arranque en caliente)"""
+        
+        catalog = self.store.load() if self.store is not None else None
+        if catalog is not None:
+            self._publish_catalog(catalog.characters, catalog.locations, catalog.episodes, "disk")
+        return catalog
+
+    async def load_snapshot(self, http_client: httpx.AsyncClient) -> CharacterSnapshot:
+        """Descarga el catálogo completo, lo publica en memoria y lo guarda en disco"""
+        
+        concurrency = settings.SNAPSHOT_FETCH_CONCURRENCY
+        characters, locations, episodes = await asyncio.gather(
+            self.client.get_all_characters(http_client, concurrency),
+            self.client.get_all_resources(settings.RICK_MORTY_LOCATION_URL, http_client, concurrency),
+            self.client.get_all_resources(settings.RICK_MORTY_EPISODE_URL, http_client, concurrency)
+        )
+        snapshot = self._publish_catalog(characters, locations, episodes, "upstream")
+        self.sync_state["last_full_load_at"] = time.time()
+        self.sync_state["full_reload_required"] = False
+        
+        if self.store is not None:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self.store.save, characters, locations, episodes)
+        return snapshot
+
+    def _revalidation_window(self) -> List[int]:
+        """IDs ya conocidos que se vuelven a pedir en esta pasada (ventana rotatoria)"""
+        
+        size = min(settings.SYNC_REVALIDATE_BATCH, len(self.snapshot))
+        if size <= 0:
+            return []
+        records = self.snapshot.records
+        start = self._revalidate_cursor % len(records)
+        window = records[start:start + size] + records[:max(0, start + size - len(records))]
+        self._revalidate_cursor = (start + size) % len(records)
+        return [record.id for record in window]
+
+    @staticmethod
+    def _new_ids(known: Iterable[int], local_count: int, upstream_count: int) -> List[int]:
+        """IDs que faltan suponiendo que la API asigna IDs consecutivos a los recursos nuevos"""
+        
+        last_id = max(known, default=0)
+        return list(range(last_id + 1, last_id + 1 + max(0, upstream_count - local_count)))
+
+    async def sync_catalog(self, http_client: httpx.AsyncClient) -> dict:
+        """Sincronización incremental del catálogo con la API externa
+        
+        Consulta info.count de personajes, ubicaciones y episodios y pide solo
+        los IDs nuevos (más una ventana rotatoria de personajes ya conocidos
+        para detectar cambios) con peticiones multi-ID. Los cambios se publican
+        con un intercambio copy-on-write: se construyen el snapshot y los
+        diccionarios nuevos y se sustituyen de una vez. Si la API tiene menos
+        recursos que el catálogo local (borrados) se marca full_reload_required
+        para que la siguiente pasada haga una recarga completa.
+        """
+        
+        if self.snapshot is None:
+            raise RuntimeError("No hay snapshot que sincronizar")
+        
+        start = time.monotonic()
+        try:
+            result = await self._sync_catalog(http_client)
+        except BaseException:
+            self.sync_state["failures"] += 1
+            raise
+        
+        self.sync_state["syncs"] += 1
+        self.sync_state["last_sync_at"] = time.time()
+        self.sync_state["last_sync_ms"] = round((time.monotonic() - start) * 1000, 2)
+        self.sync_state["added"] += result["added"]
+        self.sync_state["updated"] += result["updated"]
+        return result
+
+    async def _sync_catalog(self, http_client: httpx.AsyncClient) -> dict:
+        snapshot = self.snapshot
+        character_count, location_count, episode_count = await asyncio.gather(*(
+            self.client.get_resource_count(url, http_client, fresh=True)
+            for url in (settings.RICK_MORTY_CHARACTER_URL, settings.RICK_MORTY_LOCATION_URL,
+                        settings.RICK_MORTY_EPISODE_URL)
+        ))
+        result = {"added": 0, "updated": 0, "locations": 0, "episodes": 0, "full_reload_required": False}
+        if (character_count < len(snapshot) or location_count < len(self.locations)
+                or episode_count < len(self.episodes)):
+            self.sync_state["full_reload_required"] = True
+            result["full_reload_required"] = True
+            return result
+        
+        chunk_size = settings.BATCH_CHUNK_SIZE
+        concurrency = settings.BATCH_FETCH_CONCURRENCY
+        character_ids = self._new_ids(snapshot.by_id, len(snapshot), character_count) + self._revalidation_window()
+        fetched = await self.client.get_characters_by_ids(
+            character_ids, http_client, chunk_size, concurrency, fresh=True
+        )
+        changed = self._diff_characters(snapshot, fetched, result)
+        
+        # Ubicaciones y episodios nuevos, más los que cita algún personaje cambiado
+        location_ids = set(self._new_ids(self.locations, len(self.locations), location_count))
+        episode_ids = set(self._new_ids(self.episodes, len(self.episodes), episode_count))
+        for record in changed:
+            location_ids.update(i for i in (record.origin_id, record.location_id) if i is not None)
+            episode_ids.update(record.episode_ids)
+        locations, episodes = await asyncio.gather(
+            self.client.get_locations_by_ids(sorted(location_ids), http_client, chunk_size, concurrency, fresh=True),
+            self.client.get_episodes_by_ids(sorted(episode_ids), http_client, chunk_size, concurrency, fresh=True)
+        )
+        result["locations"] = len(locations)
+        result["episodes"] = len(episodes)
+        
+        # Los personajes ya conocidos que salen en un episodio nuevo tienen su
+        # lista de episodios desactualizada: se vuelven a pedir
+        changed_ids = {record.id for record in changed}
+        stale_ids = sorted({
+            character_id
+            for episode in episodes.values()
+            for character_id in map(id_from_url, episode.get("characters", []))
+            if character_id is not None and character_id not in changed_ids
+            and character_id in snapshot.by_id and episode["id"] not in snapshot.by_id[character_id].episode_ids
+        })
+        if stale_ids:
+            stale = await self.client.get_characters_by_ids(stale_ids, http_client, chunk_size, concurrency, fresh=True)
+            fetched.update(stale)
+            changed.extend(self._diff_characters(snapshot, stale, result))
+        
+        if not changed and not locations and not episodes:
+            return result
+        
+        # Copy-on-write: todo se construye aparte y se publica sin await de por medio
+        if changed:
+            new_snapshot = snapshot.with_records(changed)
+            if self._graph is not None and self._graph_snapshot is snapshot:
+                # El grafo de coapariciones solo recalcula las filas afectadas
+                self._graph = self._graph.updated(new_snapshot.records, changed)
+                self._graph_snapshot = new_snapshot
+            self.snapshot = new_snapshot
+            self.search_index.add_many((record.id, record.name) for record in changed)
+        if locations:
+            self.locations = {**self.locations, **locations}
+        if episodes:
+            self.episodes = {**self.episodes, **episodes}
+        self.catalog_version = (self.catalog_version or 0) + 1
+        
+        if self.store is not None:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(
+                None, self.store.upsert, [fetched[record.id] for record in changed],
+                list(locations.values()), list(episodes.values())
+            )
+        return result
+
+    @staticmethod
+    def _diff_characters(snapshot: CharacterSnapshot, fetched: Dict[int, dict], result: dict) -> List[CharacterRecord]:
+        """Registros nuevos o con datos distintos a los del snapshot (actualiza los contadores)"""
+        
+        changed = []
+        for character_data in fetched.values():
+            record = CharacterRecord.from_api(character_data)
+            current = snapshot.get(record.id)
+            if current is None:
+                result["added"] += 1
+            elif current.same_data(record):
+                continue
+            else:
+                result["updated"] += 1
+            changed.append(record)
+        return changed
+
+    def _sync_lag(self) -> Dict[str, int]:
+        """Recursos que la API externa tiene y el catálogo local todavía no"""
+        
+        counts = self.client.resource_counts
+        local = {
+            "character": (settings.RICK_MORTY_CHARACTER_URL, len(self.snapshot) if self.snapshot is not None else 0),
+            "location": (settings.RICK_MORTY_LOCATION_URL, len(self.locations)),
+            "episode": (settings.RICK_MORTY_EPISODE_URL, len(self.episodes))
+        }
+        return {resource: max(0, counts[url] - count)
+                for resource, (url, count) in local.items() if url in counts}
+
+    def _seconds_since_sync(self) -> Optional[float]:
+        last = max(filter(None, (self.sync_state["last_sync_at"], self.sync_state["last_full_load_at"])), default=None)
+        return round(time.time() - last, 3) if last is not None else None
+
+    def get_upstream_stats(self) -> dict:
+        """Obtiene los contadores de la capa de resiliencia con la API externa"""
+        
+        return self.client.upstream_stats()
+
+    def get_snapshot_stats(self) -> dict:
+        """Obtiene el estado del snapshot en memoria"""
+        
+        if self.snapshot is None:
+            return {"loaded": False, "offline": settings.OFFLINE_MODE}
+        return {
+            "loaded": True,
+            "source": self.snapshot_source,
+            "offline": settings.OFFLINE_MODE,
+            **self.snapshot.stats(),
+            "locations": len(self.locations),
+            "episodes": len(self.episodes),
+            "indexed_names": len(self.search_index),
+            "sync": {
+                **self.sync_state,
+                "seconds_since_sync": self._seconds_since_sync(),
+                "upstream_counts": {
+                    resource: self.client.resource_counts.get(url)
+                    for resource, url in (("character", settings.RICK_MORTY_CHARACTER_URL),
+                                          ("location", settings.RICK_MORTY_LOCATION_URL),
+                                          ("episode", settings.RICK_MORTY_EPISODE_URL))
+                },
+                "lag": self._sync_lag()
+            }
+        }
+
+    def _local_search(self, query: str, fuzzy: bool) -> Optional[List[CharacterRecord]]:
+        """Busca en el índice local; devuelve None si el snapshot aún no está cargado
+        
+        La búsqueda aproximada solo existe en local: sin índice se responde 400.
+        """
+        
+        if self.snapshot is None or not len(self.search_index):
+            if fuzzy:
+                raise HTTPException(
+                    status_code=400,
+                    detail="La búsqueda aproximada (fuzzy) necesita el catálogo local, que no está disponible"
+                )
+            return None
+        
+        if fuzzy:
+            ids = [character_id for character_id, _ in self.search_index.fuzzy_search(query)]
+        else:
+            ids = self.search_index.search(query)
+        
+        records = [record for record in map(self.snapshot.get, ids) if record is not None]
+        if not records:
+            raise HTTPException(
+                status_code=404,
+                detail=f"No se encontraron personajes que coincidan con '{query}'"
+            )
+        return records
+
+    async def aclose(self):
+        """Libera los recursos del cliente (tareas en segundo plano) y guarda el orden LRU de los avatares"""
+        
+        await self.client.aclose()
+        await self.avatar_flight.cancel_all()
+        if self.avatar_cache is not None:
+            self.avatar_cache.save()
+
+    def get_cache_stats(self) -> dict:
+        """Obtiene los contadores de la caché de respuestas"""
+        
+        stats = self.client.cache_stats()
+        if self.avatar_cache is not None:
+            stats["avatars"] = self.avatar_cache.stats()
+        return stats
+
+    async def get_avatar(self, character_id: int, http_client: httpx.AsyncClient) -> AvatarResult:
+        """Obtiene el avatar de un personaje desde la caché en disco o la API externa
+        
+        - Fresco en disco: se sirve el fichero (hit).
+        - Caducado o sin copia: se revalida o descarga a disco (ver
+          _fetch_avatar) y se sirve el fichero. Las peticiones simultáneas
+          del mismo avatar comparten una sola descarga.
+        - Sin caché en disco (AVATAR_CACHE_DIR vacío): la descarga se
+          reenvía al cliente según llega (bypass).
+        """
+        
+        snapshot = self.snapshot
+        record = self._require_character(snapshot, character_id) if snapshot is not None else None
+        url = record.image if record is not None else f"{settings.RICK_MORTY_CHARACTER_URL}/avatar/{character_id}.jpeg"
+        
+        cache = self.avatar_cache
+        if cache is None:
+            response = await self.client.open_avatar(url, http_client)
+            
+            async def body():
+                try:
+                    async for chunk in response.aiter_bytes():
+                        yield chunk
+                finally:
+                    await response.aclose()
+            
+            return AvatarResult("bypass", body=body(), content_type=response.headers.get("content-type", "image/jpeg"),
+                                last_modified=response.headers.get("last-modified"))
+        
+        entry = cache.get(character_id)
+        if entry is not None and not entry.is_stale():
+            return AvatarResult("hit", entry, cache.path(entry))
+        return await self.avatar_flight.do(
+            str(character_id), lambda: self._fetch_avatar(character_id, url, entry, http_client)
+        )
+
+    async def _fetch_avatar(self, character_id: int, url: str, entry, http_client: httpx.AsyncClient) -> AvatarResult:
+        """Revalida o descarga a disco un avatar
+        
+        - Con copia caducada se pide con If-None-Match / If-Modified-Since:
+          con 304 se renueva (revalidated) y si la API externa falla se sirve
+          la que hay (stale).
+        - Con 200 el cuerpo se escribe en streaming a un fichero temporal que
+          solo se publica si llega completo (miss).
+        """
+        
+        cache = self.avatar_cache
+        headers = {}
+        if entry is not None:
+            if entry.upstream_etag:
+                headers["If-None-Match"] = entry.upstream_etag
+            headers["If-Modified-Since"] = entry.last_modified
+        
+        try:
+            response = await self.client.open_avatar(url, http_client, headers)
+        except HTTPException as e:
+            if entry is not None and e.status_code >= 500:
+                return AvatarResult("stale", entry, cache.path(entry))
+            raise
+        
+        try:
+            if response.status_code == 304:
+                if entry is None:
+                    raise HTTPException(status_code=502, detail="Respuesta 304 inesperada de la API externa")
+                cache.refresh(character_id, entry)
+                return AvatarResult("revalidated", entry, cache.path(entry))
+            
+            writer = cache.writer()
+            try:
+                async for chunk in response.aiter_bytes():
+                    writer.write(chunk)
+            except httpx.RequestError as e:
+                writer.discard()
+                if entry is not None:
+                    return AvatarResult("stale", entry, cache.path(entry))
+                raise HTTPException(
+                    status_code=503,
+                    detail=f"Error de conexión: {str(e)}"
+                )
+            except BaseException:
+                writer.discard()
+                raise
+            
+            entry = cache.commit(
+                character_id, writer, response.headers.get("content-type", "image/jpeg"),
+                response.headers.get("last-modified"), response.headers.get("etag")
+            )
+            return AvatarResult("miss", entry, cache.path(entry))
+        finally:
+            await response.aclose()
+
     async def get_random_character(self, http_client: httpx.AsyncClient) -> CharacterResponseDTO:
         """Obtiene un personaje aleatorio"""
         
+        if self.snapshot is not None and len(self.snapshot):
+            return self._record_to_dto(self.snapshot.random_character())
+        
         character_data = await self.client.get_random_character(http_client)
         return self._transform_character(character_data)
 
     async def get_character_by_status(self, status: str, http_client: httpx.AsyncClient) -> CharacterResponseDTO:
         """Obtiene un personaje aleatorio por estado (alive, dead, unknown)"""
         
+        if self.snapshot is not None and len(self.snapshot):
+            record = self.snapshot.random_by_status(status)
+            if record is None:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"No se encontraron personajes con estado {status}"
+                )
+            return self._record_to_dto(record)
+        
         character_data = await self.client.get_character_by_status(status, http_client)
         return self._transform_character(character_data)
 
+    async def _resolve_characters(self, ids: Iterable[int], http_client: httpx.AsyncClient) -> dict:
+        """Resuelve personajes por ID: primero el snapshot, el resto con peticiones multi-ID"""
+        
+        unique_ids = list(dict.fromkeys(ids))
+        characters = {}
+        if self.snapshot is not None:
+            for character_id in unique_ids:
+                record = self.snapshot.get(character_id)
+                if record is not None:
+                    characters[character_id] = self._record_to_dto(record)
+        
+        pending = [character_id for character_id in unique_ids if character_id not in characters]
+        if pending:
+            fetched = await self._resolve_raw_characters(pending, http_client)
+            for character_id, character_data in fetched.items():
+                characters[character_id] = self._transform_character(character_data)
+        
+        return characters
+
+    async def _resolve_raw_characters(self, ids: List[int], http_client: httpx.AsyncClient) -> Dict[int, dict]:
+        """Pide personajes a la API externa (nunca en modo offline)"""
+        
+        if settings.OFFLINE_MODE:
+            return {}
+        return await self.client.get_characters_by_ids(
+            ids, http_client, settings.BATCH_CHUNK_SIZE, settings.BATCH_FETCH_CONCURRENCY
+        )
+
+    def _require_snapshot(self) -> CharacterSnapshot:
+        """Snapshot actual para los endpoints que solo se resuelven en local
+        
+        - Snapshot desactivado: 501, no se va a cargar nunca.
+        - Modo offline sin snapshot en disco: 503 sin Retry-After (tampoco se
+          va a descargar).
+        - Carga inicial en curso: 503 con Retry-After.
+        """
+        
+        if self.snapshot is not None:
+            return self.snapshot
+        if not settings.SNAPSHOT_ENABLED:
+            raise HTTPException(
+                status_code=501,
+                detail="Este endpoint necesita el snapshot del catálogo en memoria (SNAPSHOT_ENABLED=false)"
+            )
+        if settings.OFFLINE_MODE:
+            raise HTTPException(
+                status_code=503,
+                detail="Modo offline sin snapshot del catálogo en disco: este endpoint no está disponible"
+            )
+        raise HTTPException(
+            status_code=503,
+            detail="El catálogo de personajes aún no está cargado, inténtalo en unos segundos",
+            headers={"Retry-After": "5"}
+        )
+
+    def _get_columns(self) -> ColumnarCatalog:
+        """Columnas del snapshot actual, construidas la primera vez que se piden"""
+        
+        snapshot = self._require_snapshot()
+        if self._columns_snapshot is not snapshot:
+            self._columns = ColumnarCatalog(snapshot.records)
+            self._columns_snapshot = snapshot
+        return self._columns
+
+    def get_character_stats(self, filters: Dict[str, str], group_by: List[str], top: int = 10,
+                            bins: int = 10, limit: int = 100) -> CharacterStatsDTO:
+        """Calcula estadísticas agregadas del catálogo (group-by, orígenes y ubicaciones, episodios)"""
+        
+        unknown = [name for name in [*filters, *group_by] if name not in CATEGORICAL_COLUMNS]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Campos no válidos: {', '.join(unknown)}. Permitidos: {', '.join(CATEGORICAL_COLUMNS)}"
+            )
+        
+        columns = self._get_columns()
+        selection = columns.select(filters)
+        groups = columns.group_by(group_by, selection)[:limit] if group_by else []
+        return CharacterStatsDTO(
+            total=columns.count(selection),
+            filters=filters,
+            group_by=group_by,
+            groups=[GroupCountDTO(values=dict(zip(group_by, values)), count=count) for values, count in groups],
+            top_origins=[ValueCountDTO(value=value, count=count)
+                         for value, count in columns.value_counts("origin", selection, top)],
+            top_locations=[ValueCountDTO(value=value, count=count)
+                           for value, count in columns.value_counts("location", selection, top)],
+            episode_counts=EpisodeCountStatsDTO(**columns.episode_histogram(selection, bins))
+        )
+
+    def _get_bitmaps(self) -> Tuple[CharacterSnapshot, BitmapIndex]:
+        """Bitmaps del snapshot actual, construidos la primera vez que se piden"""
+        
+        snapshot = self._require_snapshot()
+        if self._bitmaps_snapshot is not snapshot:
+            self._bitmaps = BitmapIndex(snapshot.records)
+            self._bitmaps_snapshot = snapshot
+        return snapshot, self._bitmaps
+
+    def filter_characters(self, filters: Dict[str, List[str]], limit: int = 20, offset: int = 0,
+                          sample: Optional[int] = None, facet_limit: int = 20) -> FilterResultDTO:
+        """Filtra el catálogo por cualquier combinación de campos usando los bitmaps
+        
+        Devuelve una página de resultados (o una muestra aleatoria uniforme si
+        se pide sample) y las facetas de los campos que no se han filtrado.
+        """
+        
+        unknown = [name for name in filters if name not in FILTER_FIELDS]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Campos no válidos: {', '.join(unknown)}. Permitidos: {', '.join(FILTER_FIELDS)}"
+            )
+        
+        snapshot, bitmaps = self._get_bitmaps()
+        selection = bitmaps.match(filters)
+        if sample is not None:
+            positions = bitmaps.sample(selection, sample)
+            offset, limit = 0, sample
+        else:
+            positions = bitmaps.positions(selection, offset, limit)
+        
+        facets = bitmaps.facets(selection, (field for field in FILTER_FIELDS if field not in filters), facet_limit)
+        return FilterResultDTO(
+            total=popcount(selection),
+            offset=offset,
+            limit=limit,
+            sample=sample is not None,
+            result=[self._record_to_dto(snapshot.records[position]) for position in positions],
+            facets={
+                field: [ValueCountDTO(value=value, count=count) for value, count in counts]
+                for field, counts in facets.items()
+            }
+        )
+
+    async def _get_graph(self) -> Tuple[CharacterSnapshot, CoAppearanceGraph]:
+        """Grafo de coapariciones del snapshot actual
+        
+        Tras una recarga completa se construye entero en un hilo aparte (una
+        sola vez aunque lleguen varias peticiones a la vez); tras una
+        sincronización lo actualiza _sync_catalog de forma incremental.
+        """
+        
+        snapshot = self._require_snapshot()
+        if self._graph_snapshot is snapshot:
+            return snapshot, self._graph
+        
+        if self._graph_build is None or self._graph_build[0] is not snapshot:
+            future = asyncio.get_running_loop().run_in_executor(None, CoAppearanceGraph.build, snapshot.records)
+            self._graph_build = (snapshot, future)
+            future.add_done_callback(lambda done: self._graph_built(snapshot, done))
+        return snapshot, await asyncio.shield(self._graph_build[1])
+
+    def _graph_built(self, snapshot: CharacterSnapshot, future: asyncio.Future):
+        """Publica el grafo construido si sigue correspondiendo al snapshot actual"""
+        
+        if self._graph_build is not None and self._graph_build[1] is future:
+            self._graph_build = None
+        if not future.cancelled() and future.exception() is None and self.snapshot is snapshot:
+            self._graph, self._graph_snapshot = future.result(), snapshot
+
+    def _require_character(self, snapshot: CharacterSnapshot, character_id: int) -> CharacterRecord:
+        record = snapshot.get(character_id)
+        if record is None:
+            raise HTTPException(
+                status_code=404,
+                detail=f"No se encontró el personaje con ID {character_id}"
+            )
+        return record
+
+    async def get_costars(self, character_id: int, limit: int = 10) -> CostarsResultDTO:
+        """Personajes que más episodios comparten con uno dado"""
+        
+        snapshot, graph = await self._get_graph()
+        self._require_character(snapshot, character_id)
+        costars = []
+        for neighbor_id, weight in graph.neighbors(character_id, limit):
+            record = snapshot.get(neighbor_id)
+            if record is not None:
+                costars.append(CostarDTO(character=self._record_to_dto(record), shared_episodes=weight))
+        return CostarsResultDTO(character_id=character_id, total=graph.degree(character_id), result=costars)
+
+    async def get_character_path(self, source_id: int, target_id: int) -> CharacterPathDTO:
+        """Conexión más corta entre dos personajes a través de episodios compartidos"""
+        
+        snapshot, graph = await self._get_graph()
+        self._require_character(snapshot, source_id)
+        self._require_character(snapshot, target_id)
+        path = graph.shortest_path(source_id, target_id)
+        if path is None:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Los personajes {source_id} y {target_id} no están conectados por ningún episodio"
+            )
+        
+        records = [snapshot.get(character_id) for character_id in path]
+        links = []
+        for current, following in zip(records, records[1:]):
+            # Se indica el primer episodio en el que coinciden
+            episode_id = min(set(current.episode_ids) & set(following.episode_ids))
+            episode = self.episodes.get(episode_id)
+            links.append(PathLinkDTO(
+                source_id=current.id,
+                target_id=following.id,
+                episode_id=episode_id,
+                episode=f"{episode.get('episode', '')} - {episode['name']}" if episode is not None else None
+            ))
+        return CharacterPathDTO(
+            source_id=source_id,
+            target_id=target_id,
+            degrees=len(path) - 1,
+            path=[self._record_to_dto(record) for record in records],
+            links=links
+        )
+
+    async def get_characters_batch(self, ids: List[int], http_client: httpx.AsyncClient) -> BatchResultDTO:
+        """Obtiene varios personajes por ID, en el orden pedido y sin duplicados"""
+        
+        unique_ids = list(dict.fromkeys(ids))
+        if len(unique_ids) > settings.BATCH_MAX_IDS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Se permiten como máximo {settings.BATCH_MAX_IDS} IDs por consulta"
+            )
+        
+        characters = await self._resolve_characters(unique_ids, http_client)
+        result = [characters[character_id] for character_id in unique_ids if character_id in characters]
+        missing = [character_id for character_id in unique_ids if character_id not in characters]
+        
+        return BatchResultDTO(
+            total=len(result),
+            result=result,
+            missing=missing
+        )
+
+    async def _get_locations(self, ids: List[int], http_client: httpx.AsyncClient) -> Dict[int, dict]:
+        """Resuelve ubicaciones por ID: primero el snapshot, el resto con peticiones multi-ID"""
+        
+        found = {i: self.locations[i] for i in ids if i in self.locations}
+        pending = [i for i in ids if i not in found]
+        if pending and not settings.OFFLINE_MODE:
+            found.update(await self.client.get_locations_by_ids(
+                pending, http_client, settings.BATCH_CHUNK_SIZE, settings.BATCH_FETCH_CONCURRENCY
+            ))
+        return found
+
+    async def _get_episodes(self, ids: List[int], http_client: httpx.AsyncClient) -> Dict[int, dict]:
+        """Resuelve episodios por ID: primero el snapshot, el resto con peticiones multi-ID"""
+        
+        found = {i: self.episodes[i] for i in ids if i in self.episodes}
+        pending = [i for i in ids if i not in found]
+        if pending and not settings.OFFLINE_MODE:
+            found.update(await self.client.get_episodes_by_ids(
+                pending, http_client, settings.BATCH_CHUNK_SIZE, settings.BATCH_FETCH_CONCURRENCY
+            ))
+        return found
+
+    async def _get_character_record(self, character_id: int, http_client: httpx.AsyncClient) -> CharacterRecord:
+        """Obtiene el registro de un personaje del snapshot o de la API externa"""
+        
+        record = self.snapshot.get(character_id) if self.snapshot is not None else None
+        if record is not None:
+            return record
+        
+        fetched = await self._resolve_raw_characters([character_id], http_client)
+        if character_id not in fetched:
+            raise HTTPException(
+                status_code=404,
+                detail=f"No existe el personaje {character_id}"
+            )
+        return CharacterRecord.from_api(fetched[character_id])
+
+    async def get_character_detail(self, character_id: int, expand: Set[str], http_client: httpx.AsyncClient) -> CharacterDetailResponseDTO:
+        """Obtiene un personaje y expande sus episodios y ubicaciones si se piden
+        
+        Los episodios y las ubicaciones se piden en paralelo con peticiones
+        multi-ID, así que la expansión cuesta una o dos llamadas y no N.
+        """
+        
+        record = await self._get_character_record(character_id, http_client)
+        
+        location_ids = []
+        if "origin" in expand and record.origin_id:
+            location_ids.append(record.origin_id)
+        if "location" in expand and record.location_id:
+            location_ids.append(record.location_id)
+        episode_ids = list(record.episode_ids) if "episodes" in expand else []
+        
+        episodes, locations = await asyncio.gather(
+            self._get_episodes(episode_ids, http_client),
+            self._get_locations(location_ids, http_client)
+        )
+        
+        detail = CharacterDetailResponseDTO(**self._record_row(record))
+        if "episodes" in expand:
+            detail.episodes = [self._transform_episode(episodes[i]) for i in episode_ids if i in episodes]
+        if record.origin_id in locations and "origin" in expand:
+            detail.origin_detail = self._transform_location(locations[record.origin_id])
+        if record.location_id in locations and "location" in expand:
+            detail.location_detail = self._transform_location(locations[record.location_id])
+        return detail
+
+    async def get_location(self, location_id: int, expand: Set[str], http_client: httpx.AsyncClient) -> LocationResponseDTO:
+        """Obtiene una ubicación y, si se pide, sus residentes"""
+        
+        fetched = await self._get_locations([location_id], http_client)
+        if location_id not in fetched:
+            raise HTTPException(
+                status_code=404,
+                detail=f"No existe la ubicación {location_id}"
+            )
+        
+        location_data = fetched[location_id]
+        residents = None
+        if "residents" in expand:
+            resident_ids = [i for i in map(id_from_url, location_data.get("residents", [])) if i]
+            characters = await self._resolve_characters(resident_ids, http_client)
+            residents = [characters[i] for i in resident_ids if i in characters]
+        return self._transform_location(location_data, residents)
+
+    async def get_episode(self, episode_id: int, expand: Set[str], http_client: httpx.AsyncClient) -> EpisodeResponseDTO:
+        """Obtiene un episodio y, si se pide, sus personajes"""
+        
+        fetched = await self._get_episodes([episode_id], http_client)
+        if episode_id not in fetched:
+            raise HTTPException(
+                status_code=404,
+                detail=f"No existe el episodio {episode_id}"
+            )
+        
+        episode_data = fetched[episode_id]
+        characters = None
+        if "characters" in expand:
+            character_ids = [i for i in map(id_from_url, episode_data.get("characters", [])) if i]
+            resolved = await self._resolve_characters(character_ids, http_client)
+            characters = [resolved[i] for i in character_ids if i in resolved]
+        return self._transform_episode(episode_data, characters)
+
     async def get_character_statuses(self, http_client: httpx.AsyncClient) -> StatusesResponseDTO:
         """Obtiene todos los estados disponibles"""
         
         statuses = await self.client.get_character_statuses(http_client)
         return StatusesResponseDTO(statuses=statuses)
 
-    async def search_characters(self, query: str, http_client: httpx.AsyncClient) -> SearchResultDTO:
-        """Busca personajes que contengan una palabra específica en el nombre"""
+    async def export_resource(self, resource: str, http_client: httpx.AsyncClient,
+                              since_id: int = 0) -> Tuple[str, AsyncIterator[dict]]:
+        """Exporta los recursos de un tipo con ID mayor que since_id, en orden de ID
+        
+        Con el snapshot cargado se sirve desde memoria (fijando al empezar la
+        versión del catálogo que se exporta); si no, se pagina la API externa
+        en paralelo conservando el orden. Devuelve el origen de los datos
+        ("snapshot" o "upstream") y un iterador de filas con EXPORT_FIELDS.
+        La primera página se descarga antes de devolver el iterador para que
+        los errores se reporten con su código HTTP.
+        """
+        
+        fields = EXPORT_FIELDS[resource]
+        transform = {
+            "character": self._transform_character,
+            "location": self._transform_location,
+            "episode": self._transform_episode
+        }[resource]
+        
+        snapshot = self.snapshot
+        if snapshot is not None:
+            if resource == "character":
+                records = snapshot.records
+                start = snapshot.position_after(since_id)
+                
+                async def generate_characters():
+                    for position in range(start, len(records)):
+                        yield self._record_row(records[position])
+                
+                return "snapshot", generate_characters()
+            
+            resources = self.locations if resource == "location" else self.episodes
+            
+            async def generate_resources():
+                for resource_id in sorted(i for i in resources if i > since_id):
+                    dto = transform(resources[resource_id])
+                    yield {field: getattr(dto, field) for field in fields}
+            
+            return "snapshot", generate_resources()
+        
+        url = {
+            "character": settings.RICK_MORTY_CHARACTER_URL,
+            "location": settings.RICK_MORTY_LOCATION_URL,
+            "episode": settings.RICK_MORTY_EPISODE_URL
+        }[resource]
+        first_page = await self.client.get_page(url, 1, http_client)
+        pages = first_page.get("info", {}).get("pages", 1)
+        page_size = max(1, len(first_page.get("results", [])))
+        # La API numera los recursos de forma consecutiva: se salta directamente
+        # a la página donde empieza since_id (y se filtra por si hubiera huecos)
+        start_page = min(pages, since_id // page_size + 1)
+        
+        async def generate_upstream():
+            pages_iter = self.client.iter_resource_pages(
+                url, range(max(2, start_page), pages + 1), http_client, settings.EXPORT_PAGE_CONCURRENCY
+            )
+            results = first_page.get("results", []) if start_page == 1 else []
+            try:
+                while True:
+                    for data in results:
+                        if data["id"] > since_id:
+                            dto = transform(data)
+                            yield {field: getattr(dto, field) for field in fields}
+                    try:
+                        results = await pages_iter.__anext__()
+                    except StopAsyncIteration:
+                        break
+            finally:
+                # Si el cliente corta la descarga se cancelan las páginas en vuelo
+                await pages_iter.aclose()
+        
+        return "upstream", generate_upstream()
+
+    async def stream_search_characters(self, query: str, http_client: httpx.AsyncClient,
+                                       fuzzy: bool = False) -> AsyncIterator[CharacterResponseDTO]:
+        """Busca personajes en todas las páginas y los entrega según llegan
+        
+        La primera página se descarga antes de devolver el iterador para que
+        los errores (400, 404, timeouts) se reporten con su código HTTP.
+        """
+        
+        records = self._local_search(query, fuzzy)
+        if records is not None:
+            async def generate_local():
+                for record in records:
+                    yield self._record_to_dto(record)
+            
+            return generate_local()
+        
+        first_page = await self.client.search_characters(query, http_client)
+        pages = first_page.get("info", {}).get("pages", 1)
+        
+        async def generate():
+            for character_data in first_page.get("results", []):
+                yield self._transform_character(character_data)
+            
+            async for results in self.client.iter_search_pages(
+                query, range(2, pages + 1), http_client, settings.SEARCH_PAGE_CONCURRENCY
+            ):
+                for character_data in results:
+                    yield self._transform_character(character_data)
+        
+        return generate()
+
+    async def search_characters(self, query: str, http_client: httpx.AsyncClient, all_pages: bool = False,
+                                limit: int = 20, offset: int = 0, fuzzy: bool = False) -> SearchResultDTO:
+        """Busca personajes que contengan una palabra específica en el nombre
+        
+        Con el snapshot cargado la búsqueda se resuelve en el índice local de
+        trigramas; si no, se consulta la API externa pidiendo solo las páginas
+        que cubren offset/limit. En ambos casos total cuenta todas las
+        coincidencias, no solo las devueltas.
+        """
+        
+        records = self._local_search(query, fuzzy)
+        if records is not None:
+            # total cuenta todas las coincidencias, no solo la página devuelta
+            total = len(records)
+            if not all_pages:
+                records = records[offset:offset + limit]
+            characters = [self._record_to_dto(record) for record in records]
+            return SearchResultDTO(
+                total=total,
+                result=characters
+            )
         
-        search_data = await self.client.search_characters(query, http_client)
+        if all_pages:
+            characters = [character async for character in await self.stream_search_characters(query, http_client)]
+            return SearchResultDTO(
+                total=len(characters),
+                result=characters
+            )
         
-        characters = []
-        for character_data in search_data.get("results", []):
-            characters.append(self._transform_character(character_data))
+        first_page = await self.client.search_characters(query, http_client)
+        results = first_page.get("results", [])
+        info = first_page.get("info", {})
+        page_size = max(1, len(results))
+        # Páginas de la API externa que contienen los resultados [offset, offset + limit)
+        first = offset // page_size + 1
+        last = min(info.get("pages", 1), (offset + limit - 1) // page_size + 1)
+        pages = await asyncio.gather(*(
+            self.client.search_characters(query, http_client, page)
+            for page in range(max(2, first), last + 1)
+        ))
+        window = (results if first == 1 else []) + [item for page in pages for item in page.get("results", [])]
+        start = offset - (first - 1) * page_size
         
         return SearchResultDTO(
-            total=len(characters),
-            result=characters
+            total=info.get("count", len(results)),
+            result=[self._transform_character(data) for data in window[start:start + limit]]
         )
\ No newline at end of file